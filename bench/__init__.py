@@ -0,0 +1,4 @@
+"""
+Benchmark Package: load tests for the webhook and the model helpers,
+with in-process stand-ins for OpenAI and Twilio
+"""
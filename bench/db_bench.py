@@ -0,0 +1,173 @@
+"""Time every models/* helper against the configured (seeded) database.
+
+    python manage.py bench-db --iterations 200 --output db_report.json --compare old.json
+
+Inputs (ids, phones, names) are sampled from the tables so lookups hit real
+rows. Write helpers only run with ``include_writes`` because they add rows.
+The JSON report is stable across runs so two reports can be compared.
+"""
+
+import json
+import random
+import subprocess
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bench.report import summarize
+from database.connection import connect
+from models import (
+    client, client_profile, client_search, employees, guest_context, history, notes, reservations,
+    restaurants,
+)
+
+
+def _sample(sql_range: str, sql_rows: str, n: int, rng: random.Random) -> List[Tuple]:
+    with closing(connect()) as conn:
+        cur = conn.cursor()
+        cur.execute(sql_range)
+        lo, hi = cur.fetchone()
+        if lo is None:
+            return []
+        ids = [rng.randint(lo, hi) for _ in range(n * 2)]
+        cur.execute(sql_rows, (ids,))
+        return cur.fetchall()[:n]
+
+
+def _row_counts() -> Dict[str, int]:
+    with closing(connect()) as conn:
+        cur = conn.cursor()
+        counts = {}
+        for table in ("Clients", "History", "Notes", "Reservations", "Employees", "Restaurants"):
+            # planner estimate: exact COUNT(*) would dominate the run at scale
+            cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                        (table.lower(),))
+            row = cur.fetchone()
+            counts[table] = row[0] if row else 0
+        return counts
+
+
+def _time_calls(fn: Callable, arg_sets: Sequence[Tuple]) -> Dict[str, Any]:
+    durations: List[float] = []
+    errors = 0
+    for args in arg_sets:
+        start = time.perf_counter()
+        try:
+            fn(*args)
+        except Exception as e:  # noqa: BLE001
+            errors += 1
+            if errors == 1:
+                print(f"  ⚠ {fn.__module__}.{fn.__name__}: {e}")
+            continue
+        durations.append(time.perf_counter() - start)
+    result = summarize(durations)
+    result["calls"] = len(durations)
+    result["errors"] = errors
+    return result
+
+
+def build_cases(iterations: int, heavy_iterations: int = 3, include_writes: bool = False,
+                rng: Optional[random.Random] = None) -> Dict[str, Tuple[Callable, Sequence[Tuple]]]:
+    """Map ``module.helper`` to (function, argument tuples sampled from the tables)."""
+    rng = rng or random.Random(7)
+    clients = _sample("SELECT MIN(client_id), MAX(client_id) FROM Clients",
+                      "SELECT client_id, first_name, last_name, phone_number FROM Clients "
+                      "WHERE client_id = ANY(%s)", iterations, rng)
+    visits = _sample("SELECT MIN(history_id), MAX(history_id) FROM History",
+                     "SELECT history_id FROM History WHERE history_id = ANY(%s)", iterations, rng)
+    note_rows = _sample("SELECT MIN(note_id), MAX(note_id) FROM Notes",
+                        "SELECT note_id FROM Notes WHERE note_id = ANY(%s)", iterations, rng)
+    staff = _sample("SELECT MIN(employee_id), MAX(employee_id) FROM Employees",
+                    "SELECT employee_id, first_name, last_name FROM Employees "
+                    "WHERE employee_id = ANY(%s)", iterations, rng)
+    places = _sample("SELECT MIN(restaurant_id), MAX(restaurant_id) FROM Restaurants",
+                     "SELECT restaurant_id FROM Restaurants WHERE restaurant_id = ANY(%s)",
+                     iterations, rng)
+
+    ids = [(c[0],) for c in clients]
+    cases: Dict[str, Tuple[Callable, Sequence[Tuple]]] = {
+        "client.get_client_by_id": (client.get_client_by_id, ids),
+        "client.get_client_by_phone": (client.get_client_by_phone, [(c[3],) for c in clients]),
+        "client.get_client_by_name": (client.get_client_by_name, [(c[1], c[2]) for c in clients]),
+        "client.list_clients": (client.list_clients, [()] * heavy_iterations),
+        "reservations.get_upcoming_reservation": (reservations.get_upcoming_reservation, ids),
+        "client_profile.get_client_profile": (client_profile.get_client_profile, ids),
+        # first name missing its last letter, like a typo
+        "client_search.search_clients": (client_search.search_clients,
+                                         [(f"{c[1][:-1]} {c[2]}",) for c in clients]),
+        "guest_context.get_guest_context": (guest_context.get_guest_context, [(c[3],) for c in clients]),
+        "history.get_client_history": (history.get_client_history, ids),
+        "notes.get_notes_by_client": (notes.get_notes_by_client, ids),
+        "notes.get_notes_by_history": (notes.get_notes_by_history, visits),
+        "notes.get_note": (notes.get_note, note_rows),
+        "employees.get_employee_by_id": (employees.get_employee_by_id, [(e[0],) for e in staff]),
+        "employees.get_employee_by_name": (employees.get_employee_by_name, [(e[1], e[2]) for e in staff]),
+        "employees.list_employees": (employees.list_employees, [()] * heavy_iterations),
+        "restaurants.get_restaurant_by_id": (restaurants.get_restaurant_by_id, places),
+        "restaurants.list_restaurants": (restaurants.list_restaurants, [()] * heavy_iterations),
+    }
+    if include_writes and clients and staff:
+        base = datetime.utcnow() + timedelta(days=400)
+        cases.update({
+            "history.add_visit": (history.add_visit, [
+                (c[0], rng.choice(staff)[0], "bench", "bench note") for c in clients]),
+            "notes.add_note": (notes.add_note, [(c[0], "bench note") for c in clients]),
+            "reservations.upsert_reservation": (reservations.upsert_reservation, [
+                (c[0], (base + timedelta(days=i)).strftime("%Y-%m-%d"), "20:00", 4)
+                for i, c in enumerate(clients)]),
+        })
+    return cases
+
+
+def run_db_benchmarks(iterations: int = 200, heavy_iterations: int = 3,
+                      include_writes: bool = False, seed: int = 7) -> Dict[str, Any]:
+    cases = build_cases(iterations, heavy_iterations, include_writes, random.Random(seed))
+
+    # the guest cache would turn repeat lookups into dict hits
+    guest_context.guest_cache.clear()
+
+    results = {}
+    for name, (fn, arg_sets) in cases.items():
+        print(f"⏱  {name} ({len(arg_sets)} calls)")
+        results[name] = _time_calls(fn, arg_sets)
+
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                  capture_output=True, text=True).stdout.strip()
+    except OSError:
+        revision = ""
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "revision": revision,
+            "iterations": iterations,
+            "row_counts": _row_counts(),
+        },
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 1.5) -> List[str]:
+    """Return the functions whose p95 got ``threshold`` times slower than the baseline."""
+    regressions = []
+    for name, current in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("p95_ms"):
+            continue
+        ratio = current["p95_ms"] / before["p95_ms"]
+        flag = "❌" if ratio >= threshold else "  "
+        print(f"{flag} {name:45s} p95 {before['p95_ms']:9.3f} → {current['p95_ms']:9.3f} ms ({ratio:.2f}x)")
+        if ratio >= threshold:
+            regressions.append(name)
+    return regressions
+
+
+def write_report(report: Dict[str, Any], path: str, baseline_path: Optional[str] = None) -> List[str]:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"📄 Report written to {path}")
+    if not baseline_path:
+        return []
+    with open(baseline_path) as f:
+        return compare(report, json.load(f))
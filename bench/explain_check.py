@@ -0,0 +1,143 @@
+"""EXPLAIN every models/* read query and fail on sequential scans.
+
+    python manage.py seed            # plans only mean something at scale
+    python manage.py explain-check
+
+Each read helper from ``bench.db_bench.build_cases`` is called a few times with
+sampled arguments while ``connect()`` in the model modules is swapped for a
+connection that runs ``EXPLAIN (FORMAT JSON)`` on every SELECT before
+executing it. So the check follows the SQL the helpers actually send instead of
+a copy of it.
+
+A plan fails when it has a ``Seq Scan`` on a table with at least ``min_rows``
+rows (planner estimate). Small tables (Employees, Restaurants) are legitimately
+scanned, as are the ``list_*`` helpers that read a whole table on purpose.
+"""
+
+import random
+from contextlib import closing
+from typing import Any, Dict, Iterator, List, Set
+
+from bench.db_bench import build_cases
+from database.connection import connect
+from models.reference_cache import reference_cache
+from models import (
+    client, client_profile, client_search, employees, guest_context, history, notes, reservations,
+    restaurants,
+)
+
+MODEL_MODULES = (client, client_profile, client_search, employees, guest_context, history, notes,
+                 reservations, restaurants)
+
+# helpers that read the whole table by design
+FULL_SCAN_OK = {"client.list_clients", "employees.list_employees", "restaurants.list_restaurants"}
+
+
+class _ExplainingCursor:
+    def __init__(self, cursor, conn, plans: List[Dict[str, Any]]):
+        self._cursor = cursor
+        self._conn = conn
+        self._plans = plans
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._cursor.close()
+
+    def execute(self, query, params=None, **kwargs):
+        text = query if isinstance(query, str) else query.as_string(self._conn)
+        if text.lstrip().upper().startswith(("SELECT", "WITH")):
+            with self._conn.cursor() as cur:
+                cur.execute("EXPLAIN (FORMAT JSON) " + text, params)
+                self._plans.append({"query": " ".join(text.split()), "plan": cur.fetchone()[0][0]["Plan"]})
+        return self._cursor.execute(query, params, **kwargs)
+
+
+class _ExplainingConnection:
+    def __init__(self, conn, plans: List[Dict[str, Any]]):
+        self._conn = conn
+        self._plans = plans
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def cursor(self, *args, **kwargs):
+        return _ExplainingCursor(self._conn.cursor(*args, **kwargs), self._conn, self._plans)
+
+
+def _seq_scans(plan: Dict[str, Any]) -> Iterator[str]:
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from _seq_scans(child)
+
+
+def _table_rows(tables: Set[str]) -> Dict[str, int]:
+    with closing(connect()) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(%s)",
+            (sorted(tables),),
+        )
+        return dict(cur.fetchall())
+
+
+def explain_models(samples: int = 5, min_rows: int = 10_000) -> Dict[str, Any]:
+    """Collect the plans of every read helper; return ``{"plans": ..., "failures": [...]}``."""
+    cases = build_cases(samples, heavy_iterations=1, rng=random.Random(11))
+    captured: Dict[str, List[Dict[str, Any]]] = {}
+    originals = {module: module.connect for module in MODEL_MODULES}
+    guest_context.guest_cache.clear()
+    try:
+        for name, (fn, arg_sets) in cases.items():
+            plans: List[Dict[str, Any]] = []
+            # a cached Employees/Restaurants lookup would send no query to explain
+            reference_cache.clear()
+            for module in MODEL_MODULES:
+                module.connect = lambda plans=plans: _ExplainingConnection(connect(), plans)
+            for args in arg_sets:
+                fn(*args)
+            captured[name] = plans
+    finally:
+        for module, original in originals.items():
+            module.connect = original
+
+    scanned = {rel for plans in captured.values() for p in plans for rel in _seq_scans(p["plan"])}
+    rows = _table_rows(scanned)
+    failures = []
+    for name, plans in captured.items():
+        if name in FULL_SCAN_OK:
+            continue
+        bad = sorted({rel for p in plans for rel in _seq_scans(p["plan"]) if rows.get(rel, 0) >= min_rows})
+        if bad:
+            failures.append({"helper": name, "tables": bad,
+                             "query": next(p["query"] for p in plans
+                                           if set(_seq_scans(p["plan"])) & set(bad))})
+    return {"plans": captured, "failures": failures}
+
+
+def run_explain_check(samples: int = 5, min_rows: int = 10_000) -> bool:
+    """Print a pass/fail line per helper; return ``True`` when no plan seq-scans a big table."""
+    result = explain_models(samples, min_rows)
+    failed = {f["helper"]: f for f in result["failures"]}
+    for name, plans in result["plans"].items():
+        if name in failed:
+            print(f"❌ {name}: Seq Scan on {', '.join(failed[name]['tables'])}")
+            print(f"     {failed[name]['query'][:160]}")
+        elif not plans:
+            print(f"⚠️  {name}: no query captured")
+        else:
+            note = " (full scan expected)" if name in FULL_SCAN_OK else ""
+            print(f"✅ {name}{note}")
+    return not failed
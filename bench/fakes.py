@@ -0,0 +1,111 @@
+"""In-process stand-ins for OpenAI and Twilio with tunable latency and error rates."""
+
+import asyncio
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import openai
+
+_OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+
+CANNED_REPLY = (
+    "Thank you for writing to Garufa! We would be delighted to host you. "
+    "Could you confirm the date, time and number of guests for your reservation? "
+    "We are open every evening from 6pm to 11pm."
+)
+
+
+def _latency(mean: float, jitter: float) -> float:
+    return max(0.0, random.gauss(mean, jitter)) if jitter else mean
+
+
+class _FakeStream:
+    def __init__(self, text: str, chunk_delay: float, usage: SimpleNamespace):
+        self._words = text.split(" ")
+        self._delay = chunk_delay
+        self._usage = usage
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for i, word in enumerate(self._words):
+            await asyncio.sleep(self._delay)
+            delta = SimpleNamespace(content=word if i == 0 else " " + word)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=self._usage)
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeAsyncOpenAI"):
+        self._owner = owner
+
+    async def create(self, model: str, messages: List[Dict[str, str]], stream: bool = False, **kwargs):
+        owner = self._owner
+        owner.calls += 1
+        delay = _latency(owner.latency, owner.jitter)
+        roll = random.random()
+        request = httpx.Request("POST", _OPENAI_URL)
+        if roll < owner.rate_limit_rate:
+            await asyncio.sleep(delay / 10)
+            raise openai.RateLimitError(
+                "fake rate limit", response=httpx.Response(429, request=request), body=None
+            )
+        if roll < owner.rate_limit_rate + owner.error_rate:
+            await asyncio.sleep(delay / 2)
+            raise openai.APIConnectionError(request=request)
+
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(owner.reply) // 4)
+        if stream:
+            return _FakeStream(owner.reply, delay / max(1, len(owner.reply.split(" "))), usage)
+        await asyncio.sleep(delay)
+        message = SimpleNamespace(content=owner.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+class FakeAsyncOpenAI:
+    """Looks enough like ``openai.AsyncOpenAI`` for ``services.llm``."""
+
+    def __init__(self, latency: float = 1.5, jitter: float = 0.5, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, reply: str = CANNED_REPLY):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.reply = reply
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+
+class FakeTwilioError(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"fake Twilio HTTP {status}")
+        self.status = status
+
+
+class FakeTwilio:
+    """Outbound transport for ``services.outbound.set_transport`` that records deliveries."""
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.deliveries: List[Tuple[float, str, str]] = []  # (monotonic time, to, body)
+        self.errors = 0
+        self._lock = threading.Lock()
+        self.delivered = threading.Condition(self._lock)
+
+    def __call__(self, from_number: Optional[str], to_number: str, body: str) -> None:
+        time.sleep(_latency(self.latency, self.jitter))
+        if random.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise FakeTwilioError(random.choice((429, 500, 503)))
+        with self._lock:
+            self.deliveries.append((time.monotonic(), to_number, body))
+            self.delivered.notify_all()
@@ -0,0 +1,145 @@
+"""Load test for POST /message with fake OpenAI and Twilio.
+
+    python -m bench.load_message --requests 2000 --concurrency 100 --llm-latency 1.5
+
+Drives ``webapp.app`` in-process via httpx's ASGI transport with synthetic
+Twilio form posts, then reports webhook latency (time until Twilio gets its
+answer), end-to-end latency (post to first reply delivered), throughput and
+error counts. The database is the one configured for the app.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from typing import Any, Deque, Dict, List
+
+import httpx
+
+from bench.fakes import FakeAsyncOpenAI, FakeTwilio
+from bench.report import summarize
+
+SAMPLE_BODIES = [
+    "What are your hours?",
+    "Do you have parking?",
+    "What is the dress code?",
+    "Hi! Table for 4 tomorrow at 8pm please",
+    "Can I bring a birthday cake?",
+    "Do you have vegetarian options?",
+    "I'd like to change my reservation to 9pm",
+    "Where are you located?",
+]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # import here so the app reads its settings (WEBHOOK_MODE, ...) from this process' env
+    import webapp
+    from services import llm
+    from services.outbound import get_dispatcher, set_transport
+
+    fake_llm = FakeAsyncOpenAI(args.llm_latency, args.llm_jitter, args.llm_error_rate,
+                               args.llm_rate_limit_rate)
+    fake_twilio = FakeTwilio(args.twilio_latency, args.twilio_jitter, args.twilio_error_rate)
+    llm._client = fake_llm
+    set_transport(fake_twilio)
+    get_dispatcher().backoff = args.twilio_backoff
+
+    senders = [f"+1555{i:07d}" for i in range(args.senders or args.requests)]
+    pending: Dict[str, Deque[float]] = defaultdict(deque)
+    webhook_latency: List[float] = []
+    statuses: Counter = Counter()
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+
+    await webapp.startup()
+    transport = httpx.ASGITransport(app=webapp.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+
+        async def worker() -> None:
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                sender = senders[i % len(senders)]
+                form = {
+                    "From": f"whatsapp:{sender}",
+                    "Body": SAMPLE_BODIES[i % len(SAMPLE_BODIES)],
+                    "MessageSid": f"SMbench{uuid.uuid4().hex}",
+                }
+                start = time.monotonic()
+                pending[sender].append(start)
+                try:
+                    response = await http.post("/message", data=form, timeout=args.timeout)
+                    body = response.json()
+                    status = "error" if "error" in body else body.get("status", str(response.status_code))
+                    statuses[f"{response.status_code}:{status}"] += 1
+                except Exception as e:  # noqa: BLE001
+                    statuses[f"exception:{type(e).__name__}"] += 1
+                webhook_latency.append(time.monotonic() - start)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        posted = time.monotonic()
+
+        # wait for replies still in the pool / outbound queue
+        deadline = time.monotonic() + args.drain_timeout
+        while len(fake_twilio.deliveries) < args.requests and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        await webapp.shutdown()
+        finished = time.monotonic()
+
+    # match each sender's first delivery per request in FIFO order
+    end_to_end: List[float] = []
+    for delivered_at, to_number, _ in sorted(fake_twilio.deliveries):
+        if pending[to_number]:
+            end_to_end.append(delivered_at - pending[to_number].popleft())
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "mode": webapp.inbound.WEBHOOK_MODE,
+        "webhook_latency": summarize(webhook_latency),
+        "end_to_end_latency": summarize(end_to_end),
+        "throughput_rps": round(args.requests / (posted - started), 1),
+        "completed_rps": round(len(end_to_end) / (finished - started), 1),
+        "statuses": dict(statuses),
+        "replies_delivered": len(fake_twilio.deliveries),
+        "replies_missing": max(0, args.requests - len(end_to_end)),
+        "openai_calls": fake_llm.calls,
+        "twilio_errors": fake_twilio.errors,
+        "stats": webapp.collect_stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test POST /message with fake OpenAI/Twilio.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--senders", type=int, default=0, help="distinct guests (default: one per request)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request HTTP timeout (s)")
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="wait for queued replies (s)")
+    parser.add_argument("--llm-latency", type=float, default=1.5)
+    parser.add_argument("--llm-jitter", type=float, default=0.5)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--twilio-latency", type=float, default=0.2)
+    parser.add_argument("--twilio-jitter", type=float, default=0.05)
+    parser.add_argument("--twilio-error-rate", type=float, default=0.0)
+    parser.add_argument("--twilio-backoff", type=float, default=0.05)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,18 @@
 import os
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 import psycopg
 from psycopg import connection as PGConnection
 from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+# psycopg_pool is optional: without it every connect() opens a fresh connection
+try:  # pragma: no cover - simple import guard
+    from psycopg_pool import AsyncConnectionPool, ConnectionPool
+except Exception:  # noqa: BLE001
+    AsyncConnectionPool = None  # type: ignore[assignment]
+    ConnectionPool = None  # type: ignore[assignment]
 
 #path() turn whats in the parentheses into a path object
 #os.getenv checks if there is a env variable MAITRED_DB that can be set outside of the code
@@ -9,7 +20,170 @@ from pathlib import Path
 
 DB_URL = os.getenv("MAITRED_DB", "dbname=maitred user=postgres password=postgres host=localhost port=5433")
 
+# Pooled mode settings. Set MAITRED_DB_POOL=0 to go back to one connection per call.
+POOL_ENABLED = os.getenv("MAITRED_DB_POOL", "1") not in ("0", "false", "False", "")
+POOL_MIN_SIZE = int(os.getenv("MAITRED_DB_POOL_MIN", "1"))
+POOL_MAX_SIZE = int(os.getenv("MAITRED_DB_POOL_MAX", "10"))
+POOL_MAX_IDLE = float(os.getenv("MAITRED_DB_POOL_MAX_IDLE", "300"))  # seconds before an idle extra conn is closed
+POOL_TIMEOUT = float(os.getenv("MAITRED_DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free conn
+
+_pool: Optional["ConnectionPool"] = None
+_pool_lock = threading.Lock()
+_async_pool: Optional["AsyncConnectionPool"] = None
+_async_pool_lock: Optional[asyncio.Lock] = None
+
+
+class _PooledConnection:
+    """A connection borrowed from the pool that behaves like a plain psycopg one.
+
+    ``with connect() as conn`` commits (or rolls back on error) just like psycopg,
+    but hands the connection back to the pool instead of closing the socket.
+    Calling ``close()`` also returns it to the pool.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn: PGConnection):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name: str) -> Any:
+        if self._conn is None:
+            raise psycopg.OperationalError("the connection was returned to the pool")
+        return getattr(self._conn, name)
+
+    @property
+    def closed(self) -> bool:
+        return self._conn is None or self._conn.closed
+
+    def __enter__(self) -> "_PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._conn is None:
+            return
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+
+def get_pool() -> Optional["ConnectionPool"]:
+    """Return the process-wide pool, creating it on first use (``None`` if disabled)."""
+    global _pool
+    if not POOL_ENABLED or ConnectionPool is None:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    DB_URL,
+                    min_size=POOL_MIN_SIZE,
+                    max_size=POOL_MAX_SIZE,
+                    max_idle=POOL_MAX_IDLE,
+                    timeout=POOL_TIMEOUT,
+                    # health check run on every checkout, broken conns get replaced
+                    check=ConnectionPool.check_connection,
+                    name="maitred",
+                    open=True,
+                )
+    return _pool
+
+
+def pool_stats() -> Dict[str, int]:
+    """Return psycopg_pool counters (pool_size, pool_available, requests_waiting, ...)."""
+    if _pool is None:
+        return {}
+    return _pool.get_stats()
+
+
+def close_pool() -> None:
+    """Close the pool (e.g. on app shutdown). It is re-created lazily if needed again."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
 #This is a type hint, indicating that this function is expected to return an object of type sqlite3.Connection.
 def connect() -> PGConnection:
-    """Return a connection to the PostgreSQL database using environment variable or default config (port 5433)."""
-    return psycopg.connect(DB_URL)
\ No newline at end of file
+    """Return a connection to the PostgreSQL database using environment variable or default config (port 5433).
+
+    When pooled mode is on (default if ``psycopg_pool`` is installed) the connection
+    comes from a shared pool and goes back to it on ``close()`` / end of ``with``.
+    """
+    pool = get_pool()
+    if pool is None:
+        return psycopg.connect(DB_URL)
+    return _PooledConnection(pool, pool.getconn())
+
+
+# --------------------------------------------------------------------------- #
+# Async variant used by models.aio (FastAPI / MCP hot path)                    #
+# --------------------------------------------------------------------------- #
+
+async def get_async_pool() -> Optional["AsyncConnectionPool"]:
+    """Return the async pool for the running event loop (``None`` if disabled).
+
+    Same settings as the sync pool. It is opened on first use because an
+    ``AsyncConnectionPool`` has to be opened from inside the event loop.
+    """
+    global _async_pool, _async_pool_lock
+    if not POOL_ENABLED or AsyncConnectionPool is None:
+        return None
+    if _async_pool is None:
+        if _async_pool_lock is None:
+            _async_pool_lock = asyncio.Lock()
+        async with _async_pool_lock:
+            if _async_pool is None:
+                pool = AsyncConnectionPool(
+                    DB_URL,
+                    min_size=POOL_MIN_SIZE,
+                    max_size=POOL_MAX_SIZE,
+                    max_idle=POOL_MAX_IDLE,
+                    timeout=POOL_TIMEOUT,
+                    check=AsyncConnectionPool.check_connection,
+                    name="maitred-async",
+                    open=False,
+                )
+                await pool.open()
+                _async_pool = pool
+    return _async_pool
+
+
+def async_pool_stats() -> Dict[str, int]:
+    """Same as ``pool_stats()`` for the async pool."""
+    if _async_pool is None:
+        return {}
+    return _async_pool.get_stats()
+
+
+async def close_async_pool() -> None:
+    """Close the async pool (call from the app shutdown hook)."""
+    global _async_pool
+    if _async_pool is not None:
+        pool, _async_pool = _async_pool, None
+        await pool.close()
+
+
+@asynccontextmanager
+async def async_connect() -> AsyncIterator[psycopg.AsyncConnection]:
+    """Async twin of ``connect()``: ``async with async_connect() as conn: ...``
+
+    Commits on success and rolls back on error, then returns the connection to
+    the async pool (or closes it when pooled mode is off).
+    """
+    pool = await get_async_pool()
+    if pool is None:
+        async with await psycopg.AsyncConnection.connect(DB_URL) as conn:
+            yield conn
+    else:
+        async with pool.connection() as conn:
+            yield conn
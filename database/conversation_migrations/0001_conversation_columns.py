@@ -0,0 +1,19 @@
+"""Columns and index that conversations tables created before them lack.
+
+``create_all`` in models/conversation.py never alters an existing table; this
+used to run as import-time DDL in every worker. The ADD COLUMNs are no-ops on
+tables that already have them, and the index is built concurrently (per
+partition once the table is partitioned) so the webhook keeps writing.
+"""
+
+TRANSACTIONAL = False
+
+
+def migrate(ctx):
+    ctx.execute(
+        "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS created_at TIMESTAMP NOT NULL DEFAULT now()"
+    )
+    ctx.execute("ALTER TABLE conversations ADD COLUMN IF NOT EXISTS message_sid VARCHAR")
+    ctx.create_partitioned_index_concurrently(
+        "ix_conversations_sender_created_at", "conversations", "(sender, created_at)"
+    )
@@ -0,0 +1,335 @@
+"""Versioned schema migrations.
+
+    python manage.py migrate            # apply pending migrations
+    python manage.py migrate --status   # list applied / pending / changed
+
+Migrations live in ``database/migrations`` as ``NNNN_description.sql`` or
+``NNNN_description.py`` and run in version order. Each applied one is recorded
+in ``schema_migrations`` with a checksum of its file; editing a migration after
+it was applied is an error, so write a new one instead.
+
+* ``.sql`` files run in one transaction. A first line of
+  ``-- migrate: no-transaction`` runs them statement by statement in autocommit
+  instead (needed for ``CREATE INDEX CONCURRENTLY``); statements are split on
+  lines ending in ``;``.
+* ``.py`` files define ``migrate(ctx)`` (see ``MigrationContext``) and may set
+  ``TRANSACTIONAL = False`` to use the lock-light helpers
+  ``create_index_concurrently``, ``create_partitioned_index_concurrently``
+  and ``backfill``.
+
+Non-transactional migrations can stop half way, so keep them re-runnable
+(``IF NOT EXISTS``, backfills with a ``WHERE`` that skips done rows).
+
+The conversations database (models/conversation.py) has its migrations in
+``database/conversation_migrations``, recorded in
+``conversation_schema_migrations`` so the two version sequences stay apart
+even when both point at the same database; pass ``db="conversations"``.
+
+Every session sets ``lock_timeout`` (MAITRED_MIGRATION_LOCK_TIMEOUT): DDL that
+can't get its lock fails fast instead of queueing the webhook's writes behind
+it. A Postgres advisory lock keeps two deploys from migrating at once.
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import psycopg
+
+from .connection import DB_URL
+
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+CONVERSATION_MIGRATIONS_DIR = Path(__file__).with_name("conversation_migrations")
+# db -> (migrations directory, table recording the applied ones)
+_LOCATIONS = {
+    "main": (MIGRATIONS_DIR, "schema_migrations"),
+    "conversations": (CONVERSATION_MIGRATIONS_DIR, "conversation_schema_migrations"),
+}
+DATABASES = tuple(_LOCATIONS)
+LOCK_TIMEOUT = os.getenv("MAITRED_MIGRATION_LOCK_TIMEOUT", "5s")
+ADVISORY_LOCK_ID = 7_283_114  # arbitrary, shared by every migrate() caller
+NO_TRANSACTION = "-- migrate: no-transaction"
+
+_FILE_RE = re.compile(r"^(\d+)_(\w+)\.(sql|py)$")
+
+
+class MigrationError(Exception):
+    pass
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    path: Path
+    checksum: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Return the migrations on disk in version order."""
+    found: Dict[int, Migration] = {}
+    for path in sorted(directory.iterdir()):
+        match = _FILE_RE.match(path.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in found:
+            raise MigrationError(f"Duplicate migration version {version}: {found[version].path.name}, {path.name}")
+        found[version] = Migration(version, match.group(2), path,
+                                   hashlib.sha256(path.read_bytes()).hexdigest())
+    return [found[v] for v in sorted(found)]
+
+
+class MigrationContext:
+    """Handed to ``migrate(ctx)`` in Python migrations."""
+
+    def __init__(self, conn: psycopg.Connection, transactional: bool):
+        self.conn = conn
+        self.transactional = transactional
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None) -> int:
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.rowcount
+
+    def create_index_concurrently(self, name: str, definition: str, unique: bool = False) -> None:
+        """``CREATE [UNIQUE] INDEX CONCURRENTLY name ON <definition>``.
+
+        A failed concurrent build leaves an INVALID index behind that
+        ``IF NOT EXISTS`` would happily skip, so that one is dropped first.
+        """
+        self._require_autocommit("create_index_concurrently")
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT i.indisvalid FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s
+                """,
+                (name.lower(),),
+            )
+            row = cur.fetchone()
+            if row and row[0]:
+                return
+            if row:
+                print(f"   dropping invalid index {name} from an earlier failed build")
+                cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            cur.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY {name} ON {definition}")
+
+    def create_partitioned_index_concurrently(self, name: str, table: str, definition: str) -> None:
+        """Like ``create_index_concurrently`` for a partitioned ``table``.
+
+        Postgres can't build an index CONCURRENTLY on a partitioned table, so
+        the parent index is created ``ON ONLY`` (instant, invalid), each
+        partition's index is built concurrently and attached, and the parent
+        becomes valid once all are. Partitions created later inherit it.
+        ``definition`` is what follows the table name, e.g. ``USING gin (...)``.
+        """
+        self._require_autocommit("create_partitioned_index_concurrently")
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table.lower(),))
+            row = cur.fetchone()
+            if not row or row[0] != "p":
+                self.create_index_concurrently(name, f"{table} {definition}")
+                return
+            # already built (or created with the table, which covers its partitions)
+            cur.execute(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = %s",
+                (name.lower(),),
+            )
+            existing = cur.fetchone()
+            if existing and existing[0]:
+                return
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} {definition}")
+            cur.execute(
+                """
+                SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(%s)
+                """,
+                (table.lower(),),
+            )
+            for (partition,) in cur.fetchall():
+                child = f"{partition}_{name}"[:63]
+                self.create_index_concurrently(child, f"{partition} {definition}")
+                cur.execute(
+                    "SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(%s) AND inhparent = to_regclass(%s)",
+                    (child, name),
+                )
+                if not cur.fetchone():
+                    cur.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+    def backfill(self, table: str, assignments: str, where: str, key: str,
+                 batch_size: int = 5000, pause: float = 0.0,
+                 params: Optional[Sequence[Any]] = None) -> int:
+        """Run ``UPDATE table SET assignments WHERE where`` in committed batches.
+
+        ``where`` must stop matching rows once they are updated, otherwise the
+        loop never ends. Rows locked by live traffic are skipped and picked up
+        by a later batch. Returns the number of rows updated.
+        """
+        self._require_autocommit("backfill")
+        sql = f"""
+            UPDATE {table} SET {assignments}
+            WHERE {key} IN (
+                SELECT {key} FROM {table} WHERE {where}
+                LIMIT {int(batch_size)} FOR UPDATE SKIP LOCKED
+            )
+        """
+        total = 0
+        while True:
+            updated = self.execute(sql, params)
+            total += updated
+            if updated == 0:
+                return total
+            if pause:
+                time.sleep(pause)
+
+    def _require_autocommit(self, what: str) -> None:
+        if self.transactional:
+            raise MigrationError(f"{what} needs TRANSACTIONAL = False in the migration")
+
+
+def _location(db: str) -> Tuple[Path, str]:
+    if db not in _LOCATIONS:
+        raise MigrationError(f"Unknown database {db!r}, expected one of {', '.join(DATABASES)}")
+    return _LOCATIONS[db]
+
+
+def _connect(db: str = "main") -> psycopg.Connection:
+    # a dedicated connection: migrations flip autocommit and hold a session lock
+    _, table = _location(db)
+    if db == "main":
+        conn = psycopg.connect(DB_URL, autocommit=True)
+    else:
+        from models.conversation import engine
+
+        args = engine.url.translate_connect_args(username="user", database="dbname")
+        conn = psycopg.connect(autocommit=True, **args)
+    conn.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            version     INTEGER PRIMARY KEY,
+            name        TEXT NOT NULL,
+            checksum    TEXT NOT NULL,
+            applied_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            duration_ms INTEGER
+        )
+    """)
+    return conn
+
+
+def _applied(conn: psycopg.Connection, table: str) -> Dict[int, Dict[str, Any]]:
+    rows = conn.execute(f"SELECT version, name, checksum, applied_at FROM {table}").fetchall()
+    return {r[0]: {"name": r[1], "checksum": r[2], "applied_at": r[3]} for r in rows}
+
+
+def _split_statements(sql: str) -> List[str]:
+    statements, current = [], []
+    for line in sql.splitlines():
+        if not current and (not line.strip() or line.strip().startswith("--")):
+            continue
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            statements.append("\n".join(current))
+            current = []
+    if current:
+        statements.append("\n".join(current))
+    return statements
+
+
+def _run(conn: psycopg.Connection, migration: Migration) -> None:
+    if migration.path.suffix == ".sql":
+        sql = migration.path.read_text()
+        if sql.lstrip().startswith(NO_TRANSACTION):
+            for statement in _split_statements(sql):
+                conn.execute(statement)
+        else:
+            with conn.transaction():
+                conn.execute(sql)
+        return
+
+    spec = importlib.util.spec_from_file_location(f"migration_{migration.label}", migration.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if getattr(module, "TRANSACTIONAL", True):
+        with conn.transaction():
+            module.migrate(MigrationContext(conn, transactional=True))
+    else:
+        module.migrate(MigrationContext(conn, transactional=False))
+
+
+def _check_checksums(migrations: List[Migration], applied: Dict[int, Dict[str, Any]],
+                     directory: Path = MIGRATIONS_DIR) -> None:
+    on_disk = {m.version: m for m in migrations}
+    for version, row in applied.items():
+        migration = on_disk.get(version)
+        if migration is None:
+            print(f"⚠️  Applied migration {version:04d}_{row['name']} is missing from {directory}")
+        elif migration.checksum != row["checksum"]:
+            raise MigrationError(
+                f"{migration.path.name} changed after it was applied "
+                f"(checksum {row['checksum'][:12]} → {migration.checksum[:12]}); add a new migration instead"
+            )
+
+
+def status(db: str = "main") -> List[Dict[str, Any]]:
+    """One entry per migration: version, name, state (applied / pending / changed), applied_at."""
+    directory, table = _location(db)
+    migrations = discover(directory)
+    with _connect(db) as conn:
+        applied = _applied(conn, table)
+    result = []
+    for m in migrations:
+        row = applied.get(m.version)
+        state = "pending" if row is None else ("applied" if row["checksum"] == m.checksum else "changed")
+        result.append({"version": m.version, "name": m.name, "state": state,
+                       "applied_at": row["applied_at"] if row else None})
+    return result
+
+
+def pending(db: str = "main") -> List[Migration]:
+    directory, table = _location(db)
+    with _connect(db) as conn:
+        applied = _applied(conn, table)
+    return [m for m in discover(directory) if m.version not in applied]
+
+
+def migrate(target: Optional[int] = None, db: str = "main") -> List[str]:
+    """Apply pending migrations up to ``target`` (default: all). Returns the labels applied."""
+    directory, table = _location(db)
+    migrations = discover(directory)
+    done = []
+    with _connect(db) as conn:
+        conn.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_ID,))
+        try:
+            applied = _applied(conn, table)
+            _check_checksums(migrations, applied, directory)
+            for m in migrations:
+                if m.version in applied or (target is not None and m.version > target):
+                    continue
+                print(f"⏩ Applying {m.label} …")
+                start = time.perf_counter()
+                try:
+                    _run(conn, m)
+                except Exception as exc:
+                    raise MigrationError(f"{m.label} failed: {exc}") from exc
+                elapsed = int((time.perf_counter() - start) * 1000)
+                conn.execute(
+                    f"INSERT INTO {table} (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s)",
+                    (m.version, m.name, m.checksum, elapsed),
+                )
+                print(f"✅ {m.label} ({elapsed} ms)")
+                done.append(m.label)
+        finally:
+            conn.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_ID,))
+    return done
@@ -0,0 +1,21 @@
+"""Indexes for the hot read paths in models/*.
+
+`python manage.py explain-check` fails if any of those queries falls back to a
+sequential scan. Built CONCURRENTLY so the webhook keeps writing meanwhile.
+"""
+
+TRANSACTIONAL = False
+
+
+def migrate(ctx):
+    ctx.create_index_concurrently("idx_clients_name", "Clients (last_name, first_name)")
+    # covers get_client_history (history_id is the heap key, employee_id rides along)
+    ctx.create_index_concurrently(
+        "idx_history_client_visit", "History (client_id, visit_date DESC) INCLUDE (employee_id)"
+    )
+    ctx.create_index_concurrently("idx_notes_client_created", "Notes (client_id, created_at DESC)")
+    # also serves the History -> Notes join
+    ctx.create_index_concurrently("idx_notes_history_created", "Notes (history_id, created_at DESC)")
+    # per-client lookups use unique_reservation (client_id, reservation_time);
+    # this one is for scans over a time window across all clients
+    ctx.create_index_concurrently("idx_reservations_time", "Reservations (reservation_time)")
@@ -0,0 +1,18 @@
+"""Monthly range partitions for History (visit_date) and Notes (created_at).
+
+See database/partitions.py for how the conversion avoids long locks. The
+primary keys become (history_id, visit_date) and (note_id, created_at).
+Notes.history_id can no longer be a foreign key: it would need a unique
+History(history_id), which a partitioned table can't have without the
+partition column. add_visit() still writes both rows in one transaction.
+"""
+
+from database.partitions import convert_to_partitioned
+
+TRANSACTIONAL = False
+
+
+def migrate(ctx):
+    ctx.execute("ALTER TABLE Notes DROP CONSTRAINT IF EXISTS notes_history_id_fkey")
+    convert_to_partitioned(ctx.conn, "history", "visit_date", "history_id")
+    convert_to_partitioned(ctx.conn, "notes", "created_at", "note_id")
@@ -0,0 +1,193 @@
+"""Denormalized client_profile, one row per client, kept current by triggers.
+
+Statement-level AFTER triggers on History, Notes and Reservations collect the
+affected client_ids from their transition tables and re-derive only the
+matching section of those clients' profiles (visits, notes or next
+reservation) with per-client index lookups. A COPY of a million rows therefore
+fires one set-based refresh instead of a million row triggers.
+
+Each refresh first locks the profile rows, and only then reads the source
+tables in a new statement, so two writers touching the same client can't
+overwrite each other with stale aggregates.
+
+Existing clients are backfilled in batches after the triggers exist.
+"""
+
+TRANSACTIONAL = False
+BACKFILL_BATCH = 5000
+
+DDL = r"""
+CREATE TABLE IF NOT EXISTS client_profile (
+    client_id         INTEGER PRIMARY KEY REFERENCES Clients(client_id) ON DELETE CASCADE,
+    visit_count       INTEGER NOT NULL DEFAULT 0,
+    last_visit        TIMESTAMP,
+    last_employee_id  INTEGER,
+    last_server       TEXT,
+    top_items         JSONB NOT NULL DEFAULT '[]',   -- [{"item", "count"}], 5 most ordered
+    recent_notes      JSONB NOT NULL DEFAULT '[]',   -- 5 latest notes, newest first
+    next_reservation  JSONB,                         -- soonest reservation from now on
+    updated_at        TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create missing rows (skipping clients being deleted) and lock them in id order.
+CREATE OR REPLACE FUNCTION client_profile_lock(ids INTEGER[]) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO client_profile (client_id)
+    SELECT client_id FROM Clients WHERE client_id = ANY(ids)
+    ON CONFLICT (client_id) DO NOTHING;
+    PERFORM 1 FROM client_profile WHERE client_id = ANY(ids) ORDER BY client_id FOR UPDATE;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION client_profile_refresh_visits(ids INTEGER[]) RETURNS VOID AS $$
+BEGIN
+    PERFORM client_profile_lock(ids);
+    UPDATE client_profile p
+    SET visit_count = v.visits,
+        last_visit = v.last_visit,
+        last_employee_id = l.employee_id,
+        last_server = l.server,
+        top_items = COALESCE(t.items, '[]'::jsonb),
+        updated_at = CURRENT_TIMESTAMP
+    FROM unnest(ids) AS c(client_id)
+    CROSS JOIN LATERAL (
+        SELECT count(*)::int AS visits, max(visit_date) AS last_visit
+        FROM History h WHERE h.client_id = c.client_id
+    ) v
+    LEFT JOIN LATERAL (
+        SELECT h.employee_id, e.first_name || ' ' || e.last_name AS server
+        FROM History h LEFT JOIN Employees e ON e.employee_id = h.employee_id
+        WHERE h.client_id = c.client_id
+        ORDER BY h.visit_date DESC
+        LIMIT 1
+    ) l ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT jsonb_agg(jsonb_build_object('item', item, 'count', n) ORDER BY n DESC, item) AS items
+        FROM (
+            SELECT lower(item) AS item, count(*)::int AS n
+            FROM History h, regexp_split_to_table(h.items_ordered, '\s*,\s*') AS item
+            WHERE h.client_id = c.client_id AND item <> ''
+            GROUP BY 1
+            ORDER BY n DESC, item
+            LIMIT 5
+        ) counted
+    ) t ON TRUE
+    WHERE p.client_id = c.client_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION client_profile_refresh_notes(ids INTEGER[]) RETURNS VOID AS $$
+BEGIN
+    PERFORM client_profile_lock(ids);
+    UPDATE client_profile p
+    SET recent_notes = COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'note_id', n.note_id, 'note_text', n.note_text,
+                       'employee_id', n.employee_id, 'created_at', n.created_at)
+                   ORDER BY n.created_at DESC)
+            FROM (
+                SELECT * FROM Notes
+                WHERE client_id = p.client_id
+                ORDER BY created_at DESC
+                LIMIT 5
+            ) n
+        ), '[]'::jsonb),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE p.client_id = ANY(ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reservation times are naive UTC (see models/reservations.upcoming_window).
+CREATE OR REPLACE FUNCTION client_profile_refresh_reservation(ids INTEGER[]) RETURNS VOID AS $$
+BEGIN
+    PERFORM client_profile_lock(ids);
+    UPDATE client_profile p
+    SET next_reservation = (
+            SELECT jsonb_build_object(
+                       'reservation_id', r.reservation_id, 'reservation_time', r.reservation_time,
+                       'covers', r.covers, 'notes_json', r.notes_json)
+            FROM Reservations r
+            WHERE r.client_id = p.client_id
+              AND r.reservation_time >= (now() AT TIME ZONE 'UTC')
+            ORDER BY r.reservation_time
+            LIMIT 1
+        ),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE p.client_id = ANY(ids);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION client_profile_refresh(ids INTEGER[]) RETURNS VOID AS $$
+BEGIN
+    PERFORM client_profile_refresh_visits(ids);
+    PERFORM client_profile_refresh_notes(ids);
+    PERFORM client_profile_refresh_reservation(ids);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION client_profile_on_change() RETURNS TRIGGER AS $$
+DECLARE
+    ids INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        ids := ARRAY(SELECT DISTINCT client_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        ids := ARRAY(SELECT DISTINCT client_id FROM old_rows);
+    ELSE
+        ids := ARRAY(SELECT client_id FROM new_rows UNION SELECT client_id FROM old_rows);
+    END IF;
+    IF cardinality(ids) = 0 THEN
+        RETURN NULL;
+    END IF;
+    IF TG_TABLE_NAME = 'history' THEN
+        PERFORM client_profile_refresh_visits(ids);
+    ELSIF TG_TABLE_NAME = 'notes' THEN
+        PERFORM client_profile_refresh_notes(ids);
+    ELSE
+        PERFORM client_profile_refresh_reservation(ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- transition tables need one trigger per event
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['history', 'notes', 'reservations'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS client_profile_ins ON %I', tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS client_profile_upd ON %I', tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS client_profile_del ON %I', tbl);
+        EXECUTE format('CREATE TRIGGER client_profile_ins AFTER INSERT ON %I '
+                       'REFERENCING NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION client_profile_on_change()', tbl);
+        EXECUTE format('CREATE TRIGGER client_profile_upd AFTER UPDATE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION client_profile_on_change()', tbl);
+        EXECUTE format('CREATE TRIGGER client_profile_del AFTER DELETE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION client_profile_on_change()', tbl);
+    END LOOP;
+END;
+$$;
+"""
+
+
+def migrate(ctx):
+    # creating the triggers takes a short lock on the three tables
+    with ctx.conn.transaction():
+        ctx.execute(DDL)
+
+    last_id = 0
+    while True:
+        with ctx.conn.transaction():
+            rows = ctx.conn.execute(
+                "SELECT client_id FROM Clients WHERE client_id > %s ORDER BY client_id LIMIT %s",
+                (last_id, BACKFILL_BATCH),
+            ).fetchall()
+            if not rows:
+                return
+            ids = [r[0] for r in rows]
+            ctx.execute("SELECT client_profile_refresh(%s)", (ids,))
+        last_id = ids[-1]
@@ -0,0 +1,42 @@
+"""Trigram and full-text indexes behind models/client_search.py.
+
+The expressions must match the ones in CLIENT_SEARCH_SQL exactly, otherwise
+the planner can't use them.
+
+Note text is searched and ranked through a stored ``Notes.note_tsv``, so a
+common word doesn't re-parse every matching note. It is a plain column kept
+by a trigger rather than a generated one, which would rewrite Notes under an
+exclusive lock; existing notes are backfilled in batches.
+"""
+
+TRANSACTIONAL = False
+
+NOTE_TSV_DDL = r"""
+CREATE OR REPLACE FUNCTION notes_tsv_fill() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.note_tsv := to_tsvector('simple', NEW.note_text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS notes_tsv ON Notes;
+CREATE TRIGGER notes_tsv BEFORE INSERT OR UPDATE OF note_text ON Notes
+    FOR EACH ROW EXECUTE FUNCTION notes_tsv_fill();
+"""
+
+
+def migrate(ctx):
+    ctx.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    ctx.create_index_concurrently(
+        "idx_clients_name_trgm",
+        "Clients USING gin ((lower(first_name || ' ' || last_name)) gin_trgm_ops)",
+    )
+    ctx.create_index_concurrently(
+        "idx_clients_phone_digits_trgm",
+        "Clients USING gin ((regexp_replace(phone_number, '\\D', '', 'g')) gin_trgm_ops)",
+    )
+    ctx.execute("ALTER TABLE Notes ADD COLUMN IF NOT EXISTS note_tsv tsvector")
+    ctx.execute(NOTE_TSV_DDL)
+    ctx.backfill("Notes", "note_tsv = to_tsvector('simple', note_text)", "note_tsv IS NULL", "note_id")
+    # Notes is partitioned by month (0003): built partition by partition
+    ctx.create_partitioned_index_concurrently("idx_notes_tsv", "Notes", "USING gin (note_tsv)")
@@ -0,0 +1,41 @@
+"""Service periods (lunch, dinner, ...) with their capacity, and a restaurant
+on each reservation, for services/availability.py.
+
+Reservations.restaurant_id stays nullable: existing rows (and upserts that
+don't say) belong to DEFAULT_RESTAURANT_ID.
+"""
+
+TRANSACTIONAL = False
+
+
+def migrate(ctx):
+    ctx.execute("""
+        CREATE TABLE IF NOT EXISTS ServicePeriods (
+            service_id     SERIAL PRIMARY KEY,
+            restaurant_id  INTEGER NOT NULL REFERENCES Restaurants(restaurant_id) ON DELETE CASCADE,
+            name           TEXT NOT NULL,
+            -- Python weekday numbers, Monday = 0
+            weekdays       SMALLINT[] NOT NULL DEFAULT '{0,1,2,3,4,5,6}',
+            first_seating  TIME NOT NULL,
+            last_seating   TIME NOT NULL,
+            turn_minutes   INTEGER NOT NULL DEFAULT 120 CHECK (turn_minutes > 0),
+            max_covers     INTEGER NOT NULL CHECK (max_covers > 0),   -- seated at the same time
+            max_party      INTEGER NOT NULL DEFAULT 12 CHECK (max_party > 0),
+            active         BOOLEAN NOT NULL DEFAULT TRUE,
+            CHECK (first_seating <= last_seating)
+        )
+    """)
+    ctx.execute("ALTER TABLE Reservations ADD COLUMN IF NOT EXISTS restaurant_id INTEGER")
+    ctx.execute("""
+        DO $$ BEGIN
+            ALTER TABLE Reservations ADD CONSTRAINT reservations_restaurant_id_fkey
+                FOREIGN KEY (restaurant_id) REFERENCES Restaurants(restaurant_id)
+                ON DELETE SET NULL NOT VALID;
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+    """)
+    # validating separately only takes a SHARE UPDATE EXCLUSIVE lock
+    ctx.execute("ALTER TABLE Reservations VALIDATE CONSTRAINT reservations_restaurant_id_fkey")
+    ctx.create_index_concurrently(
+        "idx_reservations_restaurant_time", "Reservations (restaurant_id, reservation_time)"
+    )
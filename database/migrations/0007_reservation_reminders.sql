@@ -0,0 +1,9 @@
+-- Reminders already sent (or being sent) by services/reminders.py, one row per
+-- reservation and offset. The scheduler inserts the row before sending, so a
+-- restart never reminds a guest twice.
+CREATE TABLE IF NOT EXISTS ReservationReminders (
+    reservation_id  INTEGER NOT NULL REFERENCES Reservations(reservation_id) ON DELETE CASCADE,
+    offset_minutes  INTEGER NOT NULL,   -- how long before reservation_time it was due
+    sent_at         TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (reservation_id, offset_minutes)
+);
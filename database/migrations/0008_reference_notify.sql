@@ -0,0 +1,20 @@
+-- NOTIFY maitred_reference with the table name whenever Employees or
+-- Restaurants change, so every process drops its cached copy
+-- (models/reference_cache.py). Statement-level: a bulk change sends one
+-- notification, and Postgres only delivers it once the transaction commits.
+CREATE OR REPLACE FUNCTION reference_notify() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('maitred_reference', lower(TG_TABLE_NAME));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS employees_reference_notify ON Employees;
+CREATE TRIGGER employees_reference_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Employees
+    FOR EACH STATEMENT EXECUTE FUNCTION reference_notify();
+
+DROP TRIGGER IF EXISTS restaurants_reference_notify ON Restaurants;
+CREATE TRIGGER restaurants_reference_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Restaurants
+    FOR EACH STATEMENT EXECUTE FUNCTION reference_notify();
@@ -0,0 +1,102 @@
+-- NOTIFY maitred_reference with 'guests:{"clients": [...], "phones": [...]}'
+-- whenever what the guest context cache holds changes: Clients, Reservations
+-- and client_profile (which the History and Notes triggers keep current).
+-- Every process drops those guests' cached context (models/guest_cache.py).
+-- Statement-level with transition tables, so a bulk import sends one
+-- notification per statement; past 300 ids it sends a bare 'guests' and the
+-- caches are cleared instead, to stay well under the 8000 byte payload limit.
+CREATE OR REPLACE FUNCTION guest_notify(client_ids INTEGER[], phones TEXT[]) RETURNS VOID AS $$
+DECLARE
+    guest_notify_max CONSTANT INTEGER := 300;
+BEGIN
+    client_ids := array_remove(client_ids, NULL);
+    phones := COALESCE(array_remove(phones, NULL), '{}');
+    IF cardinality(client_ids) + cardinality(phones) = 0 THEN
+        RETURN;
+    ELSIF cardinality(client_ids) + cardinality(phones) > guest_notify_max THEN
+        PERFORM pg_notify('maitred_reference', 'guests');
+    ELSE
+        PERFORM pg_notify('maitred_reference', 'guests:' ||
+                          json_build_object('clients', client_ids, 'phones', phones)::text);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- an update notifies the old and the new phone number (a cached "unknown guest")
+CREATE OR REPLACE FUNCTION clients_guest_notify() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        PERFORM guest_notify(array_agg(DISTINCT client_id), array_agg(DISTINCT phone_number))
+        FROM (SELECT client_id, phone_number FROM old_rows
+              UNION ALL
+              SELECT client_id, phone_number FROM changed) c;
+    ELSE
+        PERFORM guest_notify(array_agg(DISTINCT client_id), array_agg(DISTINCT phone_number))
+        FROM changed;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- shared by Reservations and client_profile: both only carry client_id (an
+-- update notifies the old and the new one, a reservation may change hands)
+CREATE OR REPLACE FUNCTION client_rows_guest_notify() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        PERFORM guest_notify(array_agg(DISTINCT client_id), NULL)
+        FROM (SELECT client_id FROM old_rows UNION ALL SELECT client_id FROM changed) c;
+    ELSE
+        PERFORM guest_notify(array_agg(DISTINCT client_id), NULL) FROM changed;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION guests_truncate_notify() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('maitred_reference', 'guests');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- transition tables need one trigger per event
+DROP TRIGGER IF EXISTS clients_guest_notify_ins ON Clients;
+CREATE TRIGGER clients_guest_notify_ins AFTER INSERT ON Clients
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION clients_guest_notify();
+DROP TRIGGER IF EXISTS clients_guest_notify_upd ON Clients;
+CREATE TRIGGER clients_guest_notify_upd AFTER UPDATE ON Clients
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION clients_guest_notify();
+DROP TRIGGER IF EXISTS clients_guest_notify_del ON Clients;
+CREATE TRIGGER clients_guest_notify_del AFTER DELETE ON Clients
+    REFERENCING OLD TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION clients_guest_notify();
+DROP TRIGGER IF EXISTS clients_guest_notify_trunc ON Clients;
+CREATE TRIGGER clients_guest_notify_trunc AFTER TRUNCATE ON Clients
+    FOR EACH STATEMENT EXECUTE FUNCTION guests_truncate_notify();
+
+DROP TRIGGER IF EXISTS reservations_guest_notify_ins ON Reservations;
+CREATE TRIGGER reservations_guest_notify_ins AFTER INSERT ON Reservations
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION client_rows_guest_notify();
+DROP TRIGGER IF EXISTS reservations_guest_notify_upd ON Reservations;
+CREATE TRIGGER reservations_guest_notify_upd AFTER UPDATE ON Reservations
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION client_rows_guest_notify();
+DROP TRIGGER IF EXISTS reservations_guest_notify_del ON Reservations;
+CREATE TRIGGER reservations_guest_notify_del AFTER DELETE ON Reservations
+    REFERENCING OLD TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION client_rows_guest_notify();
+DROP TRIGGER IF EXISTS reservations_guest_notify_trunc ON Reservations;
+CREATE TRIGGER reservations_guest_notify_trunc AFTER TRUNCATE ON Reservations
+    FOR EACH STATEMENT EXECUTE FUNCTION guests_truncate_notify();
+
+DROP TRIGGER IF EXISTS client_profile_guest_notify_ins ON client_profile;
+CREATE TRIGGER client_profile_guest_notify_ins AFTER INSERT ON client_profile
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION client_rows_guest_notify();
+DROP TRIGGER IF EXISTS client_profile_guest_notify_upd ON client_profile;
+CREATE TRIGGER client_profile_guest_notify_upd AFTER UPDATE ON client_profile
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION client_rows_guest_notify();
@@ -0,0 +1,303 @@
+"""Monthly range partitions for the append-only tables, plus retention.
+
+    python manage.py partitions                          # create upcoming months
+    python manage.py partitions --archive                # ... and archive expired ones
+    python manage.py partitions --convert-conversations  # one-off, see below
+
+``History`` (``visit_date``) and ``Notes`` (``created_at``) are converted by
+migration 0003. ``conversations`` lives in the SQLAlchemy database and is
+created partitioned on fresh installs; older ones convert it once from
+manage.py rather than in database/conversation_migrations.
+
+Converting keeps the existing table as the partition ``<table>_legacy`` for
+everything before the first monthly partition, so no rows are copied. The
+slow parts (a validated bound CHECK, the unique index on key + partition
+column) are built beforehand without blocking writes, and the swap itself
+is one short transaction under ``lock_timeout``. Rows dated after the
+boundary would be rejected while the conversion runs; nothing here writes
+future-dated visits, notes or messages.
+
+Partitions are named ``<table>_pYYYYMM``. ``ensure_partitions`` keeps
+PARTITION_MONTHS_AHEAD months ready (the app also runs it daily); with no
+partition for a month, inserts into that month fail. ``archive_partitions``
+exports each partition that is entirely older than the retention period to
+``<MAITRED_ARCHIVE_DIR>/<partition>.csv.gz``, detaches it concurrently, and
+drops it.
+
+All functions expect a psycopg connection in autocommit mode.
+"""
+
+import gzip
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psycopg
+
+from .connection import DB_URL
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("MAITRED_PARTITION_MONTHS_AHEAD", "3"))
+# an empty table gets monthly partitions this far back (older rows go to _legacy)
+PARTITION_MONTHS_BACK = int(os.getenv("MAITRED_PARTITION_MONTHS_BACK", "24"))
+ARCHIVE_DIR = Path(os.getenv("MAITRED_ARCHIVE_DIR", "archive"))
+LOCK_TIMEOUT = os.getenv("MAITRED_MIGRATION_LOCK_TIMEOUT", "5s")
+
+# table -> (partition column, months to keep; 0 keeps everything)
+MAIN_TABLES: Dict[str, Tuple[str, int]] = {
+    "history": ("visit_date", int(os.getenv("MAITRED_RETAIN_HISTORY_MONTHS", "0"))),
+    "notes": ("created_at", int(os.getenv("MAITRED_RETAIN_NOTES_MONTHS", "0"))),
+}
+CONVERSATION_TABLES: Dict[str, Tuple[str, int]] = {
+    "conversations": ("created_at", int(os.getenv("MAITRED_RETAIN_CONVERSATIONS_MONTHS", "12"))),
+}
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+Partition = Tuple[str, Optional[datetime], Optional[datetime]]
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _parse_bound(text: str) -> Optional[datetime]:
+    text = text.strip()
+    if text in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(text.strip("'"))
+
+
+def is_partitioned(conn: psycopg.Connection, table: str) -> bool:
+    row = conn.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,)).fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(conn: psycopg.Connection, table: str) -> List[Partition]:
+    """(name, lower, upper) for each partition of ``table``; ``None`` means unbounded."""
+    rows = conn.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        (table,),
+    ).fetchall()
+    parts = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            parts.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return sorted(parts, key=lambda p: p[2] or datetime.max)
+
+
+def ensure_partitions(conn: psycopg.Connection, table: str,
+                      months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Create the monthly partitions up to ``months_ahead`` past the current month."""
+    if not is_partitioned(conn, table):
+        return []
+    # every worker runs this at startup; one at a time per table
+    conn.execute("SELECT pg_advisory_lock(hashtext(%s))", (f"maitred_partitions:{table}",))
+    try:
+        return _create_partitions(conn, table, months_ahead)
+    finally:
+        conn.execute("SELECT pg_advisory_unlock(hashtext(%s))", (f"maitred_partitions:{table}",))
+
+
+def _create_partitions(conn: psycopg.Connection, table: str, months_ahead: int) -> List[str]:
+    parts = list_partitions(conn, table)
+    existing = {name for name, _, _ in parts}
+    uppers = [upper for _, _, upper in parts if upper]
+    current = month_start(datetime.utcnow())
+    start = max(uppers) if uppers else current
+    end = add_months(current, months_ahead + 1)
+    created = []
+    while start < end:
+        nxt = add_months(start, 1)
+        name = f"{table}_p{start:%Y%m}"
+        if name not in existing:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{nxt:%Y-%m-%d}')"
+            )
+            created.append(name)
+        start = nxt
+    return created
+
+
+def archive_partitions(conn: psycopg.Connection, table: str, retain_months: int,
+                       archive_dir: Path = ARCHIVE_DIR, drop: bool = True) -> List[str]:
+    """Export, detach and drop the partitions that end before the retention cutoff."""
+    if retain_months <= 0 or not is_partitioned(conn, table):
+        return []
+    cutoff = add_months(month_start(datetime.utcnow()), -retain_months)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archived = []
+    for name, _, upper in list_partitions(conn, table):
+        if upper is None or upper > cutoff:
+            continue
+        path = archive_dir / f"{name}.csv.gz"
+        with gzip.open(path, "wb") as out, conn.cursor() as cur:
+            with cur.copy(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)") as copy:
+                for chunk in copy:
+                    out.write(chunk)
+        # CONCURRENTLY (PG 14+) leaves reads/writes on the parent unblocked
+        conn.execute(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY")
+        if drop:
+            conn.execute(f"DROP TABLE {name}")
+        archived.append(name)
+    return archived
+
+
+def _drop_invalid_index(conn: psycopg.Connection, name: str) -> bool:
+    """Drop ``name`` if a failed concurrent build left it INVALID; True if a valid one exists."""
+    row = conn.execute(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+        (name,),
+    ).fetchone()
+    if row and not row[0]:
+        conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        return False
+    return bool(row)
+
+
+def convert_to_partitioned(conn: psycopg.Connection, table: str, column: str, key: str) -> bool:
+    """Turn ``table`` into a monthly range-partitioned table on ``column``.
+
+    ``key`` is the serial id column; the primary key becomes ``(key, column)``
+    because a partitioned table's unique constraints must contain the
+    partition column; the old primary key on ``key`` alone is dropped. Other
+    unique indexes without the partition column stay on ``<table>_legacy``
+    only. Tables with foreign keys pointing *at* ``table`` must drop them
+    first. Returns ``False`` if the table is already partitioned.
+    """
+    table = table.lower()
+    if is_partitioned(conn, table):
+        return False
+    referenced = conn.execute(
+        "SELECT conname, conrelid::regclass FROM pg_constraint WHERE contype = 'f' AND confrelid = to_regclass(%s)",
+        (table,),
+    ).fetchall()
+    if referenced:
+        raise RuntimeError(f"drop the foreign keys referencing {table} first: {referenced}")
+    conn.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+
+    latest = conn.execute(f"SELECT max({column}) FROM {table}").fetchone()[0]
+    empty = latest is None
+    now = datetime.utcnow()
+    if empty:
+        boundary = add_months(month_start(now), -PARTITION_MONTHS_BACK)
+    else:
+        boundary = add_months(month_start(max(now, latest)), 1)
+        # slow steps first, none of them blocks writes for long
+        not_null = conn.execute(
+            "SELECT attnotnull FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = %s",
+            (table, column),
+        ).fetchone()[0]
+        if not not_null:
+            conn.execute(f"UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE {column} IS NULL")
+        conn.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_partition_bound")
+        conn.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_partition_bound "
+            f"CHECK ({column} IS NOT NULL AND {column} < '{boundary:%Y-%m-%d}') NOT VALID"
+        )
+        conn.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_partition_bound")
+        if not _drop_invalid_index(conn, f"{table}_{key}_{column}_key"):
+            conn.execute(f"CREATE UNIQUE INDEX CONCURRENTLY {table}_{key}_{column}_key ON {table} ({key}, {column})")
+
+    legacy = f"{table}_legacy"
+    with conn.transaction():
+        conn.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        if empty and conn.execute(f"SELECT EXISTS (SELECT 1 FROM {table})").fetchone()[0]:
+            raise RuntimeError(f"{table} got rows while converting; run it again")
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_{key}_{column}_key ON {table} ({key}, {column})")
+        conn.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        # the new parent's primary key is (key, column). ATTACH only adopts a
+        # constraint-backed index for it, so the prebuilt unique index becomes
+        # the legacy table's primary key instead of a second one being built
+        # under this lock.
+        pkey = conn.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            (table,),
+        ).fetchone()
+        if pkey:
+            conn.execute(f"ALTER TABLE {table} DROP CONSTRAINT {pkey[0]}")
+        conn.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey "
+                     f"PRIMARY KEY USING INDEX {table}_{key}_{column}_key")
+
+        indexes = conn.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisunique
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = to_regclass(%s)
+            """,
+            (table,),
+        ).fetchall()
+        foreign_keys = conn.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            (table,),
+        ).fetchall()
+        sequence = conn.execute("SELECT pg_get_serial_sequence(%s, %s)", (table, key)).fetchone()[0]
+
+        conn.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        for name, _, _ in indexes:
+            conn.execute(f"ALTER INDEX {name} RENAME TO {name}_legacy")
+
+        conn.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+            f"INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({column})"
+        )
+        conn.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_partition_bound")
+        conn.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({key}, {column})")
+        for name, definition in foreign_keys:
+            conn.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        for name, definition, unique in indexes:
+            if unique:
+                continue
+            # the parent has no partitions yet, so this builds nothing; ATTACH
+            # below picks up the matching {name}_legacy index
+            conn.execute(definition)
+        if sequence:
+            # otherwise archiving the legacy partition would drop the id sequence
+            conn.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{key}")
+        conn.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{boundary:%Y-%m-%d}')"
+        )
+    ensure_partitions(conn, table)
+    return True
+
+
+def connect_main() -> psycopg.Connection:
+    return psycopg.connect(DB_URL, autocommit=True)
+
+
+def connect_conversations() -> psycopg.Connection:
+    from models.conversation import engine
+
+    args = engine.url.translate_connect_args(username="user", database="dbname")
+    return psycopg.connect(autocommit=True, **args)
+
+
+def _targets() -> List[Tuple[Callable[[], psycopg.Connection], Dict[str, Tuple[str, int]]]]:
+    return [(connect_main, MAIN_TABLES), (connect_conversations, CONVERSATION_TABLES)]
+
+
+def maintain(archive: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """Create upcoming partitions for every table and, with ``archive``, expire old ones."""
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for connect_fn, tables in _targets():
+        with connect_fn() as conn:
+            for table, (_, retain) in tables.items():
+                report[table] = {
+                    "created": ensure_partitions(conn, table),
+                    "archived": archive_partitions(conn, table, retain) if archive else [],
+                }
+    return report
@@ -1,6 +1,7 @@
 import argparse
 from contextlib import closing
 from database.connection import connect
+from database.migrate import DATABASES, MigrationError, migrate, pending, status
 from database.schema import initialize_database
 
 # .venv/bin/python main.py --reset
@@ -41,6 +42,10 @@ def run_basic_tests() -> None:
         "models.client module import",
         lambda: importlib.import_module("models.client")
     ))
+    tests.append((
+        "models.aio.client module import",
+        lambda: importlib.import_module("models.aio.client")
+    ))
     # -------------------------------------------------------------
 
     passed, failed = 0, 0
@@ -75,8 +80,53 @@ def main():
     parser.add_argument(
         "--reset",
         action="store_true",
-        help="Wipe existing schema and re‑initialize.",
+        help="Wipe existing schema and re‑initialize (development only: drops all data).",
     )
+    commands = parser.add_subparsers(dest="command")
+
+    seed = commands.add_parser("seed", help="Bulk-load synthetic rows for benchmarks.")
+    seed.add_argument("--clients", type=int, default=500_000)
+    seed.add_argument("--history", type=int, default=5_000_000)
+    seed.add_argument("--notes", type=int, default=2_000_000)
+    seed.add_argument("--reservations", type=int, default=1_000_000)
+    seed.add_argument("--truncate", action="store_true", help="Empty the tables first.")
+
+    bench_db = commands.add_parser("bench-db", help="Time every models/* helper and write a JSON report.")
+    bench_db.add_argument("--iterations", type=int, default=200)
+    bench_db.add_argument("--writes", action="store_true", help="Also time insert/upsert helpers.")
+    bench_db.add_argument("--output", default="db_bench_report.json")
+    bench_db.add_argument("--compare", help="Previous report to compare p95 latencies against.")
+
+    importer = commands.add_parser("import-clients", help="Bulk-import clients from CSV / NDJSON.")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=("csv", "ndjson"), help="Default: from the file extension.")
+    importer.add_argument("--no-update", action="store_true", help="Leave existing clients untouched.")
+    importer.add_argument("--rejects", help="Write rejected rows to this CSV.")
+
+    res_importer = commands.add_parser("import-reservations",
+                                       help="Bulk-upsert reservations from a booking platform CSV / NDJSON.")
+    res_importer.add_argument("path")
+    res_importer.add_argument("--format", choices=("csv", "ndjson"), help="Default: from the file extension.")
+    res_importer.add_argument("--restaurant", type=int, help="restaurant_id for rows without one.")
+    res_importer.add_argument("--source", help="notes_json source for rows without one (e.g. the platform).")
+    res_importer.add_argument("--rejects", help="Write rejected rows to this CSV.")
+
+    migrate_cmd = commands.add_parser("migrate", help="Apply pending schema migrations.")
+    migrate_cmd.add_argument("--status", action="store_true", help="List migrations and their state only.")
+    migrate_cmd.add_argument("--target", type=int, help="Stop after this migration version.")
+    migrate_cmd.add_argument("--db", choices=DATABASES, help="Only this database (default: all).")
+
+    parts = commands.add_parser("partitions", help="Create upcoming monthly partitions, optionally archive old ones.")
+    parts.add_argument("--archive", action="store_true",
+                       help="Export, detach and drop partitions past their MAITRED_RETAIN_*_MONTHS.")
+    parts.add_argument("--convert-conversations", action="store_true",
+                       help="One-off: partition the existing conversations table.")
+
+    explain = commands.add_parser("explain-check", help="Fail if a models/* query plan seq-scans a big table.")
+    explain.add_argument("--samples", type=int, default=5, help="Calls per helper.")
+    explain.add_argument("--min-rows", type=int, default=10_000,
+                         help="Seq scans on tables smaller than this are allowed.")
+
     args = parser.parse_args()
     # ------------------------------------------------------------
 
@@ -93,13 +143,80 @@ def main():
             if not is_initialized(conn):
                 initialize_database()
                 print("✅ Database initialized successfully.")
+            elif args.command != "migrate":
+                waiting = [f"{db}:{m.label}" for db in DATABASES for m in pending(db)]
+                if waiting:
+                    print(f"⚠️  {len(waiting)} pending migration(s): "
+                          f"{', '.join(waiting)} — run `python manage.py migrate`.")
+                else:
+                    print("ℹ️  Database already initialized and up to date.")
+
+        if args.command == "migrate":
+            for db in ([args.db] if args.db else DATABASES):
+                if args.status:
+                    for m in status(db):
+                        when = f"  {m['applied_at']:%Y-%m-%d %H:%M}" if m["applied_at"] else ""
+                        print(f"{db:13s} {m['version']:04d}_{m['name']:40s} {m['state']}{when}")
+                else:
+                    applied = migrate(args.target, db)
+                    print(f"✅ {db}: {len(applied)} migration(s) applied." if applied
+                          else f"ℹ️  {db}: nothing to migrate.")
+        elif args.command == "seed":
+            from database.seed import seed_database
+            seed_database(args.clients, args.history, args.notes, args.reservations,
+                          truncate=args.truncate)
+        elif args.command == "bench-db":
+            from bench.db_bench import run_db_benchmarks, write_report
+            report = run_db_benchmarks(args.iterations, include_writes=args.writes)
+            regressions = write_report(report, args.output, args.compare)
+            if regressions:
+                print(f"❌ {len(regressions)} helper(s) regressed: {', '.join(regressions)}")
+                raise SystemExit(1)
+        elif args.command == "partitions":
+            from database import partitions
+            if args.convert_conversations:
+                with partitions.connect_conversations() as conv:
+                    if partitions.convert_to_partitioned(conv, "conversations", "created_at", "id"):
+                        print("✅ conversations is now partitioned by month.")
+                    else:
+                        print("ℹ️  conversations is already partitioned.")
+            for table, result in partitions.maintain(archive=args.archive).items():
+                print(f"📦 {table}: {len(result['created'])} partition(s) created"
+                      + (f", archived {', '.join(result['archived'])}" if result["archived"] else ""))
+        elif args.command == "explain-check":
+            from bench.explain_check import run_explain_check
+            if run_explain_check(args.samples, args.min_rows):
+                print("✅ No sequential scans on large tables.")
             else:
-                print("ℹ️  Database already initialized — skipping schema setup.")
-
-        # Run quick model sanity tests
-        run_basic_tests()
+                print("❌ Query plan regression: see the Seq Scan lines above.")
+                raise SystemExit(1)
+        elif args.command == "import-clients":
+            from models.client_import import import_clients, write_rejects
+            result = import_clients(args.path, args.format, update_existing=not args.no_update)
+            print(f"✅ Imported {result['total']:,} rows in {result['seconds']}s — "
+                  f"{result['inserted']:,} new, {result['updated']:,} updated, "
+                  f"{result['skipped_existing']:,} skipped, {result['rejected']:,} rejected.")
+            if args.rejects and result["rejects"]:
+                write_rejects(result["rejects"], args.rejects)
+                print(f"📄 Rejected rows written to {args.rejects}")
+        elif args.command == "import-reservations":
+            from models.client_import import write_rejects
+            from models.reservation_import import import_reservations
+            result = import_reservations(args.path, args.format, args.restaurant, args.source)
+            print(f"✅ Merged {result['total']:,} rows in {result['seconds']}s — "
+                  f"{result['inserted']:,} new, {result['updated']:,} updated, "
+                  f"{result['unchanged']:,} unchanged, {result['rejected']:,} rejected.")
+            if args.rejects and result["rejects"]:
+                write_rejects(result["rejects"], args.rejects)
+                print(f"📄 Rejected rows written to {args.rejects}")
+        else:
+            # Run quick model sanity tests
+            run_basic_tests()
 
         conn.close()
+    except MigrationError as e:
+        print(f"❌ Migration failed: {e}")
+        raise SystemExit(1)
     except Exception as e:
         print(f"❌ Error: {e}")
 
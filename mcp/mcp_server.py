@@ -4,8 +4,10 @@ from agents.mcp import mcp_server_fastapi
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
-from models import client as client_model
-from models import reservations as reservation_model
+from models.aio import client as client_model
+from models.aio import client_profile as profile_model
+from models.aio import client_search as search_model
+from services import availability
 
 server = mcp_server_fastapi(app, name="maitred-mcp")
 
@@ -13,6 +15,7 @@ class UpsertReservationIn(BaseModel):
     date: str
     time: str
     covers: int
+    restaurant_id: int | None = None
     # Either an existing client_id OR a client_name for new/unknown clients
     client_id: int | None = None
     client_name: str | None = None
@@ -36,8 +39,9 @@ class UpsertReservationIn(BaseModel):
 @server.tool(
     name="upsert_reservation",
     description=(
-        "Create or modify a reservation. "
-        "Use client_id for existing clients or client_name to create/find a new client."
+        "Create or modify a reservation if the service has room for the party. "
+        "Use client_id for existing clients or client_name to create/find a new client. "
+        "When it can't be booked, returns the reason and the nearest available times."
     ),
     input_model=UpsertReservationIn
 )
@@ -47,7 +51,62 @@ async def upsert_reservation(
 ):
     # Resolve or create client when only a name is supplied
     if data.client_id is None:
-        data.client_id = client_model.get_or_create_client_id(data.client_name)
+        data.client_id = await client_model.get_or_create_client_id(data.client_name)
 
     payload = data.dict(exclude={"client_name"})
-    return reservation_model.upsert_reservation(**payload)
\ No newline at end of file
+    return await availability.book_reservation(**payload)
+
+
+class CheckAvailabilityIn(BaseModel):
+    date: str
+    time: str
+    covers: int
+    restaurant_id: int | None = None
+
+
+@server.tool(
+    name="check_availability",
+    description=(
+        "Check whether a party of `covers` can be seated at date (YYYY-MM-DD) and time (HH:MM). "
+        "If not, returns why (closed, party_too_large, full) and the nearest available times that day."
+    ),
+    input_model=CheckAvailabilityIn
+)
+async def check_availability(data: CheckAvailabilityIn):
+    return await availability.check_availability(data.date, data.time, data.covers, data.restaurant_id)
+
+
+class ClientProfileIn(BaseModel):
+    client_id: int
+
+
+@server.tool(
+    name="get_client_profile",
+    description=(
+        "Look up a guest: contact details, visit count, last visit and server, "
+        "most ordered items, latest staff notes and next reservation."
+    ),
+    input_model=ClientProfileIn
+)
+async def get_client_profile(data: ClientProfileIn):
+    profile = await profile_model.get_client_profile(data.client_id)
+    if profile is None:
+        return {"error": f"No client with id {data.client_id}"}
+    return profile
+
+
+class SearchClientsIn(BaseModel):
+    query: str
+    limit: int = 10
+
+
+@server.tool(
+    name="search_clients",
+    description=(
+        "Fuzzy guest search by (misspelled) name, part of a phone number or words in staff notes. "
+        "Returns ranked matches; use it before creating a client by name to avoid duplicates."
+    ),
+    input_model=SearchClientsIn
+)
+async def search_clients(data: SearchClientsIn):
+    return await search_model.search_clients(data.query, data.limit)
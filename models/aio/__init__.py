@@ -0,0 +1,4 @@
+"""
+Async twin of the models package: same function names and return shapes,
+but every helper is a coroutine running on database.connection.async_connect().
+"""
@@ -0,0 +1,43 @@
+from typing import List, Tuple
+from database.connection import async_connect
+from utils import normalize_question
+
+# Async twin of models/canned_answers.py - keep the two in sync.
+
+
+async def list_active_canned_answers() -> List[Tuple]:
+    """Return (question, answer) for every active canned answer."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("SELECT question, answer FROM CannedAnswers WHERE active")
+        return await cur.fetchall()
+
+
+async def upsert_canned_answer(question: str, answer: str, active: bool = True) -> int:
+    """Create or replace the answer for a question (stored normalized). Returns its id."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            """
+            INSERT INTO CannedAnswers (question, answer, active)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (question)
+            DO UPDATE SET answer = EXCLUDED.answer,
+                          active = EXCLUDED.active,
+                          updated_at = CURRENT_TIMESTAMP
+            RETURNING canned_answer_id
+            """,
+            (normalize_question(question), answer, active),
+        )
+        canned_answer_id = (await cur.fetchone())[0]
+        await conn.commit()
+        return canned_answer_id
+
+
+async def delete_canned_answer(question: str) -> bool:
+    """Remove a canned answer by its question."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("DELETE FROM CannedAnswers WHERE question = %s", (normalize_question(question),))
+        await conn.commit()
+        return cur.rowcount > 0
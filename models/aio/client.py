@@ -0,0 +1,113 @@
+from typing import List, Tuple, Optional
+from database.connection import async_connect
+from models.guest_cache import guest_cache
+from models.client import split_full_name
+
+# Async twin of models/client.py - keep the two in sync.
+
+
+async def list_clients() -> List[Tuple]:
+    # return a list of all clients
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("""
+            SELECT client_id, first_name, last_name, phone_number
+            FROM Clients
+            ORDER BY last_name, first_name
+        """)
+        return await cur.fetchall()
+
+async def get_client_by_id(client_id_in: int) -> Optional[Tuple]:
+    # return client by id
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("SELECT * FROM Clients WHERE client_id = %s", (client_id_in,))
+        return await cur.fetchone()
+
+async def get_client_by_name(first_name: str, last_name: str) -> Optional[Tuple]:
+    # return a client row by first and last name
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("""
+            SELECT *
+            FROM Clients
+            WHERE first_name = %s AND last_name = %s
+        """, (first_name, last_name))
+        return await cur.fetchone()
+
+async def get_client_by_phone(phone_number: str) -> Optional[Tuple]:
+    # return client row by phone number
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("SELECT * FROM Clients WHERE phone_number = %s", (phone_number,))
+        return await cur.fetchone()
+
+async def create_client(
+        first_name: str,
+        last_name: str,
+        phone_number: str,
+        email: Optional[str] = None,
+        birthday: Optional[str] = None,
+        preferred_seating: Optional[str] = None,
+        preferred_server: Optional[str] = None,
+        allow_marketing: bool = True
+) -> int:
+    # create a client and return their client_id
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("""
+            INSERT INTO Clients (
+                first_name, last_name, phone_number,
+                email, birthday, preferred_seating,
+                preferred_server, allow_marketing
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING client_id
+        """, (
+            first_name, last_name, phone_number,
+            email, birthday, preferred_seating, preferred_server,
+            allow_marketing
+        ))
+        client_id = (await cur.fetchone())[0]
+        await conn.commit()
+        guest_cache.invalidate_phone(phone_number)
+        return client_id
+
+async def update_client_summary(client_id: int, summary: str) -> bool:
+    # updates the summary note for a client.
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("""
+            UPDATE Clients
+            SET client_summary = %s
+            WHERE client_id = %s
+        """, (summary, client_id))
+        await conn.commit()
+        guest_cache.invalidate_client(client_id)
+        return cur.rowcount > 0
+
+async def update_last_visit(client_id: int) -> bool:
+    # updates the last visit
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("""
+            UPDATE Clients
+            SET last_visit = CURRENT_TIMESTAMP
+            WHERE client_id = %s
+        """, (client_id,))
+        await conn.commit()
+        guest_cache.invalidate_client(client_id)
+        return cur.rowcount > 0
+
+
+async def get_or_create_client_id(full_name: str) -> int:
+    """Retrieve a client_id for ``full_name`` or create a placeholder client."""
+    first_name, last_name = split_full_name(full_name)
+
+    existing = await get_client_by_name(first_name, last_name)
+    if existing:
+        return existing[0]
+
+    # Create a placeholder client with an unknown phone number
+    placeholder_phone = "unknown"
+    return await create_client(first_name, last_name, placeholder_phone)
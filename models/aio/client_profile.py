@@ -0,0 +1,14 @@
+from typing import Any, Dict, Optional
+
+from database.connection import async_connect
+from models.client_profile import CLIENT_PROFILE_SQL, split_profile_row
+
+# Async twin of models/client_profile.py - keep the two in sync.
+
+
+async def get_client_profile(client_id: int) -> Optional[Dict[str, Any]]:
+    """Everything staff and the prompt need about a guest in one indexed lookup."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(CLIENT_PROFILE_SQL, (client_id,))
+        return split_profile_row(await cur.fetchone())
@@ -0,0 +1,19 @@
+from typing import Any, Dict, List
+
+from database.connection import async_connect
+from models.client_search import (
+    CLIENT_SEARCH_SQL, NAME_SIMILARITY, SET_SIMILARITY_SQL, row_to_hit, search_params,
+)
+
+# Async twin of models/client_search.py - keep the two in sync.
+
+
+async def search_clients(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Find guests by approximate name, part of a phone number or note text."""
+    if not query or not query.strip():
+        return []
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(SET_SIMILARITY_SQL, (str(NAME_SIMILARITY),))
+        await cur.execute(CLIENT_SEARCH_SQL, search_params(query, limit))
+        return [row_to_hit(row) for row in await cur.fetchall()]
@@ -0,0 +1,97 @@
+from typing import List, Tuple, Optional
+from database.connection import async_connect
+from models.employees import ROLE_MAP, new_employee_fields
+from models.reference_cache import cached_async, reference_cache
+
+# Async twin of models/employees.py - keep the two in sync.
+
+
+async def list_employees() -> List[Tuple]:
+    # Return a list of all employees
+    async def load():
+        async with async_connect() as conn:
+            cur = conn.cursor()
+            await cur.execute("""
+                SELECT employee_id,
+                       first_name,
+                       last_name,
+                       role,
+                       access_code,
+                       username
+                FROM Employees
+                ORDER BY last_name
+            """)
+            return await cur.fetchall()
+    return await cached_async("employees", "list", load)
+
+async def get_employee_by_id(employee_id) -> Optional[Tuple]:
+    # return an employee by id
+    async def load():
+        async with async_connect() as conn:
+            cur = conn.cursor()
+            await cur.execute("""
+                SELECT *
+                FROM Employees
+                WHERE employee_id = %s
+            """, (employee_id,))
+            return await cur.fetchone()
+    return await cached_async("employees", ("id", employee_id), load)
+
+async def get_employee_by_name(employee_first_name, employee_last_name) -> Optional[tuple]:
+    # return an employee by name
+    async def load():
+        async with async_connect() as conn:
+            cur = conn.cursor()
+            await cur.execute("""
+                SELECT * FROM Employees
+                WHERE first_name = %s AND last_name = %s
+            """, (employee_first_name, employee_last_name))
+            return await cur.fetchone()
+    return await cached_async("employees", ("name", employee_first_name, employee_last_name), load)
+
+
+# Update an employee's role based on an integer code (1=server, 2=manager, 3=owner)
+async def update_employee_role(employee_id: int, role_code: int) -> None:
+    if role_code not in ROLE_MAP:
+        raise ValueError("Invalid role code. Must be 1 (server), 2 (manager), or 3 (owner).")
+    new_role = ROLE_MAP[role_code]
+
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("""
+            UPDATE Employees
+            SET role = %s
+            WHERE employee_id = %s
+        """, (new_role, employee_id))
+        await conn.commit()
+    reference_cache.invalidate("employees")
+
+async def delete_employee(employee_id) -> bool:
+    # delete the employee by id
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("DELETE FROM Employees WHERE employee_id = %s", (employee_id,))
+        await conn.commit()
+        deleted = cur.rowcount > 0
+    reference_cache.invalidate("employees")
+    return deleted
+
+async def create_employee(
+        first_name: str,
+        last_name: str,
+        role: int,
+        password: str,
+) -> int:
+    access_code, username, role_text = new_employee_fields(first_name, last_name, role)
+
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("""
+            INSERT INTO Employees (first_name, last_name, role, access_code, username, password)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            returning employee_id
+        """, (first_name, last_name, role_text, access_code, username, password))
+        employee_id = (await cur.fetchone())[0]
+        await conn.commit()
+    reference_cache.invalidate("employees")
+    return employee_id
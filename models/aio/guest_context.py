@@ -0,0 +1,24 @@
+from typing import Any, Dict
+
+from database.connection import async_connect
+from models.guest_cache import guest_cache
+from models.guest_context import GUEST_CONTEXT_SQL, split_guest_row
+from models.reservations import upcoming_window
+
+# Async twin of models/guest_context.py - both share the same cache.
+
+
+async def get_guest_context(phone_number: str) -> Dict[str, Any]:
+    """Return the cached guest context for a phone, querying on a miss."""
+    cached = guest_cache.get(phone_number)
+    if cached is not None:
+        return cached
+
+    version = guest_cache.version
+    now, window_end = upcoming_window()
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(GUEST_CONTEXT_SQL, (now, window_end, phone_number))
+        context = split_guest_row(await cur.fetchone())
+    guest_cache.put(phone_number, context, version)
+    return context
@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import List, Tuple, Optional
+from database.connection import async_connect
+from models.guest_cache import guest_cache
+
+# Async twin of models/history.py - keep the two in sync.
+
+
+async def get_client_history(client_id: int, since: Optional[datetime] = None) -> List[Tuple]:
+    """Visits (with their notes) for a client, newest first.
+
+    ``since`` limits it to visits on or after that time. History and Notes
+    are partitioned by month, so a recent window only reads recent partitions
+    (a visit's notes are written after the visit, hence the Notes bound).
+    """
+    window = "AND History.visit_date >= %(since)s" if since else ""
+    notes_window = "AND Notes.created_at >= %(since)s" if since else ""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(f"""
+            SELECT
+                History.history_id,
+                History.visit_date,
+                History.employee_id,
+                Notes.note_text,
+                Notes.created_at
+            FROM History
+            LEFT JOIN Notes ON History.history_id = Notes.history_id {notes_window}
+            WHERE History.client_id = %(client_id)s {window}
+            ORDER BY History.visit_date DESC
+        """, {"client_id": client_id, "since": since})
+        return await cur.fetchall()
+
+async def add_visit(client_id: int, employee_id: int, items_ordered: str, note_text: Optional[str] = None):
+    async with async_connect() as conn:
+        cur = conn.cursor()
+
+        # Insert into History table
+        await cur.execute("""
+            INSERT INTO History (client_id, employee_id, items_ordered)
+            VALUES (%s, %s, %s)
+            RETURNING history_id
+        """, (client_id, employee_id, items_ordered))
+        history_id = (await cur.fetchone())[0]
+
+        # If note text is provided, insert into Notes table
+        if note_text:
+            await cur.execute("""
+                INSERT INTO Notes (client_id, history_id, employee_id, note_text)
+                VALUES (%s, %s, %s, %s)
+            """, (client_id, history_id, employee_id, note_text))
+
+        await conn.commit()
+        # client_profile changed (trigger), so drop the cached guest context
+        guest_cache.invalidate_client(client_id)
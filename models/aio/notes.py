@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import List, Tuple, Optional
+from database.connection import async_connect
+from models.guest_cache import guest_cache
+
+# Async twin of models/notes.py - keep the two in sync.
+
+
+async def add_note(
+    client_id: int,
+    note_text: str,
+    history_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+) -> int:
+    """
+    Create a new note. Returns the newly created note_id.
+    """
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            """
+            INSERT INTO Notes (client_id, history_id, employee_id, note_text)
+            VALUES (%s, %s, %s, %s)
+            RETURNING note_id
+            """,
+            (client_id, history_id, employee_id, note_text),
+        )
+        note_id = (await cur.fetchone())[0]
+        await conn.commit()
+        # the note shows up in client_profile.recent_notes
+        guest_cache.invalidate_client(client_id)
+        return note_id
+
+
+async def get_note(note_id: int) -> Optional[Tuple]:
+    """Retrieve a single note by its primary key."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("SELECT * FROM Notes WHERE note_id = %s", (note_id,))
+        return await cur.fetchone()
+
+
+async def get_notes_by_client(client_id: int, since: Optional[datetime] = None) -> List[Tuple]:
+    """Return every note that belongs to a given client (only those written
+    on or after ``since`` if given, which skips older Notes partitions)."""
+    window = "AND created_at >= %s" if since else ""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            f"SELECT * FROM Notes WHERE client_id = %s {window} ORDER BY created_at DESC",
+            (client_id, since) if since else (client_id,),
+        )
+        return await cur.fetchall()
+
+
+async def get_notes_by_history(history_id: int, visit_date: Optional[datetime] = None) -> List[Tuple]:
+    """Return every note attached to a specific visit (history record).
+
+    Pass the visit's ``visit_date`` when known: notes are written after the
+    visit, so Notes partitions before it are skipped.
+    """
+    window = "AND created_at >= %s" if visit_date else ""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            f"SELECT * FROM Notes WHERE history_id = %s {window} ORDER BY created_at DESC",
+            (history_id, visit_date) if visit_date else (history_id,),
+        )
+        return await cur.fetchall()
+
+
+async def update_note(note_id: int, new_text: str) -> None:
+    """Update the body of an existing note."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            """
+            UPDATE Notes
+            SET note_text = %s,
+                created_at = CURRENT_TIMESTAMP
+            WHERE note_id = %s
+            RETURNING client_id
+            """,
+            (new_text, note_id),
+        )
+        row = await cur.fetchone()
+        await conn.commit()
+        if row:
+            guest_cache.invalidate_client(row[0])
+
+
+async def delete_note(note_id: int) -> None:
+    """Remove a note permanently."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("DELETE FROM Notes WHERE note_id = %s RETURNING client_id", (note_id,))
+        row = await cur.fetchone()
+        await conn.commit()
+        if row:
+            guest_cache.invalidate_client(row[0])
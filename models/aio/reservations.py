@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Optional, Dict, Any
+import json
+
+from database.connection import async_connect
+from models.guest_cache import guest_cache
+from models.reservations import (
+    UPSERT_RESERVATION_SQL,
+    build_notes_json,
+    notify_reservation_saved,
+    parse_reservation_time,
+    row_to_reservation,
+    upcoming_window,
+)
+
+# Async twin of models/reservations.py - keep the two in sync.
+
+
+async def upsert_reservation(
+    client_id: int,
+    date: str,
+    time: str,
+    covers: int,
+    occasion: Optional[str] = None,
+    seating: Optional[str] = None,
+    dietary: Optional[str] = None,
+    special_requests: Optional[str] = None,
+    source: Optional[str] = None,
+    language_guess: Optional[str] = None,
+    parsed_party_size: Optional[int] = None,
+    parsed_date: Optional[str] = None,
+    parsed_time: Optional[str] = None,
+    created_by_bot: bool = False,
+    restaurant_id: Optional[int] = None,
+) -> int:
+    """Insert or update a reservation record (see ``models.reservations``)."""
+    reservation_time = parse_reservation_time(date, time)
+    notes_json = build_notes_json(
+        occasion, seating, dietary, special_requests, source,
+        language_guess, parsed_party_size, parsed_date, parsed_time, created_by_bot,
+    )
+
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            UPSERT_RESERVATION_SQL,
+            (client_id, reservation_time, covers, json.dumps(notes_json), restaurant_id),
+        )
+        reservation_id, saved_restaurant_id = await cur.fetchone()
+        await conn.commit()
+        guest_cache.invalidate_client(client_id)
+    notify_reservation_saved({
+        "reservation_id": reservation_id, "client_id": client_id, "restaurant_id": saved_restaurant_id,
+        "reservation_time": reservation_time, "covers": covers,
+    })
+    return reservation_id
+
+
+async def get_upcoming_reservation(client_id: int) -> Optional[Dict[str, Any]]:
+    """Return the soonest reservation within the upcoming window, or ``None``."""
+    now, window_end = upcoming_window()
+
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            """
+            SELECT reservation_id, client_id, reservation_time, covers, notes_json
+            FROM Reservations
+            WHERE client_id = %s
+              AND reservation_time BETWEEN %s AND %s
+            ORDER BY reservation_time ASC
+            LIMIT 1
+            """,
+            (client_id, now, window_end),
+        )
+        row = await cur.fetchone()
+        if not row:
+            return None
+        return row_to_reservation(row)
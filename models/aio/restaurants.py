@@ -0,0 +1,64 @@
+from typing import List, Tuple, Optional
+from database.connection import async_connect
+from models.reference_cache import cached_async, reference_cache
+
+# Async twin of models/restaurants.py - keep the two in sync.
+
+
+async def list_restaurants() -> List[Tuple]:
+    """Return a list of all restaurants (cached until Restaurants changes)."""
+    async def load():
+        async with async_connect() as conn:
+            cur = conn.cursor()
+            await cur.execute("SELECT restaurant_id, name, location FROM Restaurants ORDER BY name")
+            return await cur.fetchall()
+    return await cached_async("restaurants", "list", load)
+
+
+async def get_restaurant_by_id(restaurant_id: int) -> Optional[Tuple]:
+    """Return a restaurant by ID (cached until Restaurants changes)."""
+    async def load():
+        async with async_connect() as conn:
+            cur = conn.cursor()
+            await cur.execute("SELECT * FROM Restaurants WHERE restaurant_id = %s", (restaurant_id,))
+            return await cur.fetchone()
+    return await cached_async("restaurants", ("id", restaurant_id), load)
+
+
+async def create_restaurant(name: str, location: Optional[str] = None) -> int:
+    """Create a new restaurant and return its ID."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            "INSERT INTO Restaurants (name, location) VALUES (%s, %s) RETURNING restaurant_id",
+            (name, location)
+        )
+        new_id = (await cur.fetchone())[0]
+        await conn.commit()
+    reference_cache.invalidate("restaurants")
+    return new_id
+
+
+async def update_restaurant(restaurant_id: int, name: str, location: Optional[str]) -> bool:
+    """Update the name and/or location of a restaurant."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(
+            "UPDATE Restaurants SET name = %s, location = %s WHERE restaurant_id = %s",
+            (name, location, restaurant_id)
+        )
+        await conn.commit()
+        changed = cur.rowcount > 0
+    reference_cache.invalidate("restaurants")
+    return changed
+
+
+async def delete_restaurant(restaurant_id: int) -> bool:
+    """Delete a restaurant by ID."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute("DELETE FROM Restaurants WHERE restaurant_id = %s", (restaurant_id,))
+        await conn.commit()
+        changed = cur.rowcount > 0
+    reference_cache.invalidate("restaurants")
+    return changed
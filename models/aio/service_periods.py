@@ -0,0 +1,14 @@
+from typing import List, Optional, Tuple
+
+from database.connection import async_connect
+from models.service_periods import LIST_SERVICE_PERIODS_SQL
+
+# Async twin of models/service_periods.py (read side; services are set up by staff).
+
+
+async def list_service_periods(restaurant_id: Optional[int] = None) -> List[Tuple]:
+    """Active service periods, for one restaurant or all of them."""
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(LIST_SERVICE_PERIODS_SQL, {"rid": restaurant_id})
+        return await cur.fetchall()
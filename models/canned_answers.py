@@ -0,0 +1,54 @@
+from typing import List, Tuple
+from database.connection import connect
+from utils import normalize_question
+
+"""
+Canned answers - staff-maintained replies served by services/answer_cache.py
+without calling the model.
+
+CREATE TABLE IF NOT EXISTS CannedAnswers (
+    canned_answer_id  SERIAL PRIMARY KEY,
+    question          TEXT UNIQUE NOT NULL,
+    answer            TEXT NOT NULL,
+    active            BOOLEAN NOT NULL DEFAULT TRUE,
+    updated_at        TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def list_active_canned_answers() -> List[Tuple]:
+    """Return (question, answer) for every active canned answer."""
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT question, answer FROM CannedAnswers WHERE active")
+        return cur.fetchall()
+
+
+def upsert_canned_answer(question: str, answer: str, active: bool = True) -> int:
+    """Create or replace the answer for a question (stored normalized). Returns its id."""
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO CannedAnswers (question, answer, active)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (question)
+            DO UPDATE SET answer = EXCLUDED.answer,
+                          active = EXCLUDED.active,
+                          updated_at = CURRENT_TIMESTAMP
+            RETURNING canned_answer_id
+            """,
+            (normalize_question(question), answer, active),
+        )
+        canned_answer_id = cur.fetchone()[0]
+        conn.commit()
+        return canned_answer_id
+
+
+def delete_canned_answer(question: str) -> bool:
+    """Remove a canned answer by its question."""
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM CannedAnswers WHERE question = %s", (normalize_question(question),))
+        conn.commit()
+        return cur.rowcount > 0
@@ -1,5 +1,6 @@
 from typing import List, Tuple, Optional
 from database.connection import connect
+from models.guest_cache import guest_cache
 
 """
 CREATE TABLE IF NOT EXISTS Clients (
@@ -83,6 +84,7 @@ def create_client(
         ))
         client_id = cur.fetchone()[0]
         conn.commit()
+        guest_cache.invalidate_phone(phone_number)
         return client_id
     
 def update_client_summary(client_id: int, summary: str) -> bool:
@@ -95,6 +97,7 @@ def update_client_summary(client_id: int, summary: str) -> bool:
             WHERE client_id = %s
         """, (summary, client_id))
         conn.commit()
+        guest_cache.invalidate_client(client_id)
         return cur.rowcount > 0
     
 def update_last_visit(client_id: int) -> bool:
@@ -107,14 +110,21 @@ def update_last_visit(client_id: int) -> bool:
             WHERE client_id = %s
         """, (client_id,))
         conn.commit()
+        guest_cache.invalidate_client(client_id)
         return cur.rowcount > 0
 
 
-def get_or_create_client_id(full_name: str) -> int:
-    """Retrieve a client_id for ``full_name`` or create a placeholder client."""
+def split_full_name(full_name: str) -> Tuple[str, str]:
+    """Split "First Last Name" into ("First", "Last Name")."""
     parts = full_name.strip().split(" ", 1)
     first_name = parts[0]
     last_name = parts[1] if len(parts) > 1 else ""
+    return first_name, last_name
+
+
+def get_or_create_client_id(full_name: str) -> int:
+    """Retrieve a client_id for ``full_name`` or create a placeholder client."""
+    first_name, last_name = split_full_name(full_name)
 
     existing = get_client_by_name(first_name, last_name)
     if existing:
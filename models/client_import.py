@@ -0,0 +1,190 @@
+import csv
+import json
+import time
+from contextlib import closing
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from database.connection import connect
+from models.guest_cache import guest_cache
+from utils import normalize_phones
+
+"""
+Bulk client import (old CRM export -> Clients).
+
+Rows are read from CSV or NDJSON, validated and phone-normalized in batches,
+streamed with COPY into a temp staging table and merged into Clients with a
+single INSERT ... ON CONFLICT (phone_number). Rejected rows are reported with
+their line number and reason instead of failing the import.
+"""
+
+IMPORT_COLUMNS = (
+    "first_name", "last_name", "phone_number", "email", "birthday",
+    "preferred_seating", "preferred_server", "allow_marketing",
+)
+# accepted spellings in CRM exports
+COLUMN_ALIASES = {"phone": "phone_number", "mobile": "phone_number", "first": "first_name",
+                  "last": "last_name", "dob": "birthday", "marketing": "allow_marketing"}
+_TRUE = {"1", "true", "t", "yes", "y"}
+_FALSE = {"0", "false", "f", "no", "n"}
+
+Reject = Tuple[int, str, Dict[str, Any]]  # (line number, reason, raw record)
+
+
+def _read_records(path: str, fmt: Optional[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    fmt = fmt or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for line_no, record in enumerate(csv.DictReader(f), start=2):
+                yield line_no, record
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+
+
+def _clean(record: Dict[str, Any]) -> Dict[str, Any]:
+    out = {}
+    for key, value in record.items():
+        key = (key or "").strip().lower()
+        key = COLUMN_ALIASES.get(key, key)
+        if isinstance(value, str):
+            value = value.strip() or None
+        out[key] = value
+    return out
+
+
+def _prepare_batch(batch: List[Tuple[int, Dict[str, Any]]], seen_phones: set, seen_emails: set,
+                   rejects: List[Reject]) -> List[Tuple]:
+    """Validate one batch and return COPY rows (line_no + IMPORT_COLUMNS)."""
+    records = [(line_no, _clean(raw), raw) for line_no, raw in batch]
+    phones = normalize_phones([str(r.get("phone_number") or "") for _, r, _ in records])
+    rows = []
+    for (line_no, rec, raw), phone in zip(records, phones):
+        if not rec.get("first_name") or not rec.get("last_name"):
+            rejects.append((line_no, "missing first or last name", raw))
+            continue
+        if not phone:
+            rejects.append((line_no, "invalid phone number", raw))
+            continue
+        if phone in seen_phones:
+            rejects.append((line_no, "duplicate phone in file", raw))
+            continue
+        # stored as given, like create_client
+        email = rec.get("email")
+        if email and email in seen_emails:
+            rejects.append((line_no, "duplicate email in file", raw))
+            continue
+        birthday = rec.get("birthday")
+        if birthday:
+            try:
+                birthday = date.fromisoformat(str(birthday)[:10])
+            except ValueError:
+                rejects.append((line_no, "invalid birthday", raw))
+                continue
+        marketing = rec.get("allow_marketing")
+        if isinstance(marketing, str):
+            marketing = True if marketing.lower() in _TRUE else False if marketing.lower() in _FALSE else None
+        seen_phones.add(phone)
+        if email:
+            seen_emails.add(email)
+        rows.append((line_no, rec["first_name"], rec["last_name"], phone, email, birthday or None,
+                     rec.get("preferred_seating"), rec.get("preferred_server"),
+                     True if marketing is None else bool(marketing)))
+    return rows
+
+
+def import_clients(path: str, fmt: Optional[str] = None, update_existing: bool = True,
+                   batch_size: int = 5000) -> Dict[str, Any]:
+    """Import clients from a CSV / NDJSON file in one transaction.
+
+    Existing clients (same normalized phone) get their non-empty fields
+    updated, or are left alone with ``update_existing=False``. Returns counts
+    plus the list of rejected rows as (line number, reason, record).
+    """
+    start = time.monotonic()
+    rejects: List[Reject] = []
+    seen_phones: set = set()
+    seen_emails: set = set()
+    total = 0
+
+    with closing(connect()) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            CREATE TEMP TABLE clients_import (
+                line_no           INTEGER,
+                first_name        TEXT,
+                last_name         TEXT,
+                phone_number      TEXT,
+                email             TEXT,
+                birthday          DATE,
+                preferred_seating TEXT,
+                preferred_server  TEXT,
+                allow_marketing   BOOLEAN
+            ) ON COMMIT DROP
+        """)
+        with cur.copy(f"COPY clients_import (line_no, {', '.join(IMPORT_COLUMNS)}) FROM STDIN") as copy:
+            batch: List[Tuple[int, Dict[str, Any]]] = []
+            for item in _read_records(path, fmt):
+                total += 1
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    for row in _prepare_batch(batch, seen_phones, seen_emails, rejects):
+                        copy.write_row(row)
+                    batch = []
+            for row in _prepare_batch(batch, seen_phones, seen_emails, rejects):
+                copy.write_row(row)
+
+        # an email already used by a *different* client would abort the whole merge
+        cur.execute("""
+            DELETE FROM clients_import s
+            USING Clients c
+            WHERE s.email = c.email AND s.phone_number <> c.phone_number
+            RETURNING s.line_no, s.phone_number, s.email
+        """)
+        for line_no, phone, email in cur.fetchall():
+            rejects.append((line_no, "email belongs to another client",
+                            {"phone_number": phone, "email": email}))
+
+        conflict = """
+            DO UPDATE SET first_name = EXCLUDED.first_name,
+                          last_name = EXCLUDED.last_name,
+                          email = COALESCE(EXCLUDED.email, Clients.email),
+                          birthday = COALESCE(EXCLUDED.birthday, Clients.birthday),
+                          preferred_seating = COALESCE(EXCLUDED.preferred_seating, Clients.preferred_seating),
+                          preferred_server = COALESCE(EXCLUDED.preferred_server, Clients.preferred_server),
+                          allow_marketing = EXCLUDED.allow_marketing
+        """ if update_existing else "DO NOTHING"
+        cur.execute(f"""
+            INSERT INTO Clients ({', '.join(IMPORT_COLUMNS)})
+            SELECT {', '.join(IMPORT_COLUMNS)} FROM clients_import
+            ON CONFLICT (phone_number) {conflict}
+            RETURNING (xmax = 0) AS inserted
+        """)
+        outcomes = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT COUNT(*) FROM clients_import")
+        staged = cur.fetchone()[0]
+        conn.commit()
+
+    guest_cache.clear()
+    inserted = sum(1 for o in outcomes if o)
+    updated = len(outcomes) - inserted
+    rejects.sort(key=lambda r: r[0])
+    return {
+        "total": total,
+        "inserted": inserted,
+        "updated": updated,
+        "skipped_existing": staged - len(outcomes),
+        "rejected": len(rejects),
+        "rejects": rejects,
+        "seconds": round(time.monotonic() - start, 2),
+    }
+
+
+def write_rejects(rejects: List[Reject], path: str) -> None:
+    """Write rejected rows to a CSV (line, reason, original record as JSON)."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["line", "reason", "record"])
+        for line_no, reason, raw in rejects:
+            writer.writerow([line_no, reason, json.dumps(raw, default=str)])
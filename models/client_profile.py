@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from database.connection import connect
+
+# client_profile is maintained by triggers (database/migrations/0004_client_profile.py).
+# Shared with models/aio/client_profile.py and models/guest_context.py.
+
+# next_reservation is only rewritten on Reservations writes, so once the stored
+# one has passed fall back to the (indexed) next one.
+PROFILE_COLUMNS = """
+    COALESCE(p.visit_count, 0), p.last_visit, p.last_employee_id, p.last_server,
+    COALESCE(p.top_items, '[]'::jsonb), COALESCE(p.recent_notes, '[]'::jsonb),
+    CASE WHEN (p.next_reservation->>'reservation_time')::timestamp >= (now() AT TIME ZONE 'UTC')
+         THEN p.next_reservation
+         ELSE (
+             SELECT jsonb_build_object(
+                        'reservation_id', r.reservation_id, 'reservation_time', r.reservation_time,
+                        'covers', r.covers, 'notes_json', r.notes_json)
+             FROM Reservations r
+             WHERE r.client_id = c.client_id
+               AND r.reservation_time >= (now() AT TIME ZONE 'UTC')
+             ORDER BY r.reservation_time
+             LIMIT 1
+         )
+    END
+"""
+PROFILE_WIDTH = 7
+
+CLIENT_PROFILE_SQL = f"""
+    SELECT c.*, {PROFILE_COLUMNS}
+    FROM Clients c
+    LEFT JOIN client_profile p ON p.client_id = c.client_id
+    WHERE c.client_id = %s
+"""
+
+
+def row_to_profile(columns: Tuple) -> Dict[str, Any]:
+    """Turn the PROFILE_COLUMNS part of a row into a dict."""
+    visit_count, last_visit, last_employee_id, last_server, top_items, recent_notes, upcoming = columns
+    if upcoming:
+        upcoming = dict(upcoming, reservation_time=datetime.fromisoformat(upcoming["reservation_time"]))
+    return {
+        "visit_count": visit_count,
+        "last_visit": last_visit,
+        "last_employee_id": last_employee_id,
+        "last_server": last_server,
+        "top_items": top_items,
+        "recent_notes": recent_notes,
+        "next_reservation": upcoming,
+    }
+
+
+def split_profile_row(row: Optional[Tuple]) -> Optional[Dict[str, Any]]:
+    """CLIENT_PROFILE_SQL row -> profile dict with the Clients tuple under ``client``."""
+    if not row:
+        return None
+    profile = row_to_profile(tuple(row[-PROFILE_WIDTH:]))
+    profile["client"] = tuple(row[:-PROFILE_WIDTH])
+    return profile
+
+
+def get_client_profile(client_id: int) -> Optional[Dict[str, Any]]:
+    """Everything staff and the prompt need about a guest in one indexed lookup.
+
+    Returns ``None`` for an unknown client. ``client`` is the same tuple
+    ``get_client_by_id`` returns; visits, top items, the 5 latest notes and
+    the next reservation come from ``client_profile``.
+    """
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute(CLIENT_PROFILE_SQL, (client_id,))
+        return split_profile_row(cur.fetchone())
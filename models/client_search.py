@@ -0,0 +1,100 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+from database.connection import connect
+
+# Fuzzy guest search. Indexes: database/migrations/0005_search_indexes.py -
+# the expressions below must stay identical to the indexed ones.
+# Shared with the async twin in models/aio/client_search.py.
+
+SEARCH_LIMIT_MAX = 100
+# pg_trgm's default (0.6) misses "jon" -> "john smith"
+NAME_SIMILARITY = 0.4
+# A very common word can match a large share of all notes. Only the first
+# NOTE_CANDIDATES matches are ranked, which bounds the work for any query;
+# rarer words (the useful ones) are ranked in full. Ranking reads the stored
+# Notes.note_tsv, so each candidate costs a rank, not a parse.
+NOTE_CANDIDATES = 1000
+
+# Scores: phone digit match 1.0, name word_similarity 0..1, note ts_rank
+# scaled into 0..0.5 so a decent name match outranks a note mention.
+CLIENT_SEARCH_SQL = f"""
+    WITH name_hits AS (
+        SELECT client_id,
+               word_similarity(%(q)s, lower(first_name || ' ' || last_name)) AS score,
+               'name' AS matched, NULL AS snippet
+        FROM Clients
+        WHERE %(q)s <%% lower(first_name || ' ' || last_name)
+        ORDER BY score DESC
+        LIMIT %(limit)s
+    ), phone_hits AS (
+        SELECT client_id, 1.0 AS score, 'phone' AS matched, NULL AS snippet
+        FROM Clients
+        WHERE %(digits)s <> ''
+          AND regexp_replace(phone_number, '\\D', '', 'g') LIKE '%%' || %(digits)s || '%%'
+        LIMIT %(limit)s
+    ), note_candidates AS (
+        SELECT client_id, note_text, ts_rank(note_tsv, q, 32) AS rank
+        FROM (SELECT client_id, note_text, note_tsv, q
+              FROM Notes, websearch_to_tsquery('simple', %(q)s) AS q
+              WHERE note_tsv @@ q
+              LIMIT {NOTE_CANDIDATES}) capped
+    ), note_hits AS (
+        SELECT DISTINCT ON (client_id)
+               client_id, 0.5 * rank AS score, 'note' AS matched, note_text AS snippet
+        FROM note_candidates
+        ORDER BY client_id, rank DESC
+    ), hits AS (
+        SELECT DISTINCT ON (client_id) *
+        FROM (SELECT * FROM name_hits UNION ALL SELECT * FROM phone_hits
+              UNION ALL SELECT * FROM note_hits) all_hits
+        ORDER BY client_id, score DESC
+    )
+    SELECT c.client_id, c.first_name, c.last_name, c.phone_number,
+           h.score, h.matched, h.snippet
+    FROM hits h JOIN Clients c ON c.client_id = h.client_id
+    ORDER BY h.score DESC, c.last_name, c.first_name
+    LIMIT %(limit)s
+"""
+
+SET_SIMILARITY_SQL = "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)"
+
+
+def search_params(query: str, limit: int) -> Dict[str, Any]:
+    """Normalize the free-text query into CLIENT_SEARCH_SQL parameters."""
+    digits = re.sub(r"\D", "", query)
+    return {
+        "q": query.strip().lower(),
+        # trigram LIKE needs 3+ characters to use the index
+        "digits": digits if len(digits) >= 3 else "",
+        "limit": max(1, min(limit, SEARCH_LIMIT_MAX)),
+    }
+
+
+def row_to_hit(row: Tuple) -> Dict[str, Any]:
+    client_id, first_name, last_name, phone_number, score, matched, snippet = row
+    return {
+        "client_id": client_id,
+        "first_name": first_name,
+        "last_name": last_name,
+        "phone_number": phone_number,
+        "score": round(float(score), 3),
+        "matched": matched,
+        "snippet": snippet,
+    }
+
+
+def search_clients(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Find guests by approximate name, part of a phone number or note text.
+
+    Results are ranked best first (``score``); ``matched`` says which of
+    name / phone / note hit, and ``snippet`` holds the matching note.
+    """
+    if not query or not query.strip():
+        return []
+    with connect() as conn:
+        cur = conn.cursor()
+        # transaction-local, so pooled connections keep the default
+        cur.execute(SET_SIMILARITY_SQL, (str(NAME_SIMILARITY),))
+        cur.execute(CLIENT_SEARCH_SQL, search_params(query, limit))
+        return [row_to_hit(row) for row in cur.fetchall()]
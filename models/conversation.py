@@ -1,4 +1,7 @@
-from sqlalchemy import create_engine, Column, Integer, String
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import create_engine, inspect, Column, DateTime, Index, Integer, String, func
 from sqlalchemy.engine import URL
 from sqlalchemy.orm import declarative_base, sessionmaker
 from decouple import config
@@ -16,13 +19,57 @@ engine = create_engine(url)
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
+# claimed rows are filled in within seconds; this bound lets id lookups skip old partitions
+CLAIM_WINDOW = timedelta(days=1)
+
+
 class Conversation(Base):
     __tablename__ = "conversations"
+    # conversation memory reads "last N turns of this sender".
+    # Monthly range partitions on created_at (database/partitions.py), so the
+    # primary key has to include it.
+    __table_args__ = (
+        Index("ix_conversations_sender_created_at", "sender", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     sender = Column(String)
     message = Column(String)
     response = Column(String)
+    created_at = Column(DateTime, primary_key=True, nullable=False, server_default=func.now())
+    # Twilio MessageSid of the inbound message; uniqueness lives in conversation_sids
+    message_sid = Column(String, nullable=True)
+
+
+class ConversationSid(Base):
+    """Claimed MessageSids. A separate table because a unique index on the
+    partitioned conversations table would have to include created_at."""
+
+    __tablename__ = "conversation_sids"
+
+    message_sid = Column(String, primary_key=True)
+    conversation_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+def get_recent_conversation(db, conversation_id: int) -> Optional[Conversation]:
+    """Look up a just-claimed row by id without probing every partition."""
+    return (
+        db.query(Conversation)
+        .filter(Conversation.id == conversation_id,
+                Conversation.created_at >= datetime.utcnow() - CLAIM_WINDOW)
+        .first()
+    )
+
 
+# New tables only: changes to existing ones are migrations in
+# database/conversation_migrations (`python manage.py migrate`).
+_fresh = not inspect(engine).has_table(Conversation.__tablename__)
+Base.metadata.create_all(engine)
+if _fresh:
+    # a new partitioned table takes no rows until its monthly partitions exist
+    from database.partitions import connect_conversations, ensure_partitions
 
-Base.metadata.create_all(engine)
\ No newline at end of file
+    with connect_conversations() as _conn:
+        ensure_partitions(_conn, Conversation.__tablename__)
@@ -1,5 +1,6 @@
 from typing import List, Tuple, Optional
 from database.connection import connect
+from models.reference_cache import cached, reference_cache
 
 """
 Employee model - CRUD helpers for the Employees table.
@@ -18,54 +19,65 @@ CREATE TABLE IF NOT EXISTS Employees (
 );
 """
 
+# Reads go through the reference cache (models/reference_cache.py); a trigger
+# NOTIFYs every process when Employees changes.
+
 def list_employees() -> List[Tuple]:
     # Return a list of all employees
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT employee_id,
-                   first_name,
-                   last_name,
-                   role,
-                   access_code,
-                   username
-            FROM Employees
-            ORDER BY last_name
-        """)
-        return cur.fetchall()
+    def load():
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT employee_id,
+                       first_name,
+                       last_name,
+                       role,
+                       access_code,
+                       username
+                FROM Employees
+                ORDER BY last_name
+            """)
+            return cur.fetchall()
+    return cached("employees", "list", load)
 
 def get_employee_by_id(employee_id) -> Optional[Tuple]:
-    # return a list of all employees
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT *
-            FROM Employees
-            WHERE employee_id = %s
-        """, (employee_id,))
-        return cur.fetchone()
+    # return an employee by id
+    def load():
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT *
+                FROM Employees
+                WHERE employee_id = %s
+            """, (employee_id,))
+            return cur.fetchone()
+    return cached("employees", ("id", employee_id), load)
 
 def get_employee_by_name(employee_first_name, employee_last_name) -> Optional[tuple]:
-     # return an employee by name
-     with connect() as conn:
-         cur = conn.cursor()
-         cur.execute("""
-            SELECT * FROM Employees 
-            WHERE first_name = %s AND last_name = %s
-        """,(employee_first_name, employee_last_name))
-         return cur.fetchone()
+    # return an employee by name
+    def load():
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT * FROM Employees
+                WHERE first_name = %s AND last_name = %s
+            """, (employee_first_name, employee_last_name))
+            return cur.fetchone()
+    return cached("employees", ("name", employee_first_name, employee_last_name), load)
+
+
+ROLE_MAP = {
+    1: 'server',
+    2: 'manager',
+    3: 'owner'
+}
 
 
 # Update an employee's role based on an integer code (1=server, 2=manager, 3=owner)
 def update_employee_role(employee_id: int, role_code: int) -> None:
-    role_map = {
-        1: 'server',
-        2: 'manager',
-        3: 'owner'
-    }
-    if role_code not in role_map:
+    if role_code not in ROLE_MAP:
         raise ValueError("Invalid role code. Must be 1 (server), 2 (manager), or 3 (owner).")
-    new_role = role_map[role_code]
+    new_role = ROLE_MAP[role_code]
 
     with connect() as conn:
         cur = conn.cursor()
@@ -75,6 +87,8 @@ def update_employee_role(employee_id: int, role_code: int) -> None:
             WHERE employee_id = %s
         """, (new_role, employee_id))
         conn.commit()
+    # the NOTIFY reaches the other workers; don't wait for it here
+    reference_cache.invalidate("employees")
 
 def delete_employee(employee_id) -> bool:
     # delete the employee by id
@@ -82,24 +96,30 @@ def delete_employee(employee_id) -> bool:
         cur = conn.cursor()
         cur.execute("DELETE FROM Employees WHERE employee_id = %s", (employee_id,))
         conn.commit()
-        return cur.rowcount > 0
+        deleted = cur.rowcount > 0
+    reference_cache.invalidate("employees")
+    return deleted
     
+def new_employee_fields(first_name: str, last_name: str, role: int) -> Tuple[int, str, str]:
+    """Return (access_code, username, role_text) for a new employee."""
+    import secrets  # cryptographically secure random numbers
+    access_code = secrets.randbelow(9000) + 1000  # range 1000–9999
+
+    if role not in ROLE_MAP:
+        raise ValueError("Invalid role code. Must be 1, 2, 3")
+
+    username = f"{first_name[0].lower()}{last_name.lower()}{access_code}"
+    return access_code, username, ROLE_MAP[role]
+
+
 def create_employee(
         first_name: str,
         last_name: str,
         role: int,
         password: str,
 ) -> int:
-    import secrets  # cryptographically secure random numbers
-    role_map = {1: 'server', 2: 'manager', 3: 'owner'}
     # TODO: consider hashing/storing passwords securely (e.g., bcrypt)
-    access_code = secrets.randbelow(9000) + 1000  # range 1000–9999
-    
-    if role not in role_map:
-        raise ValueError("Invalid role code. Must be 1, 2, 3")
-
-    username = f"{first_name[0].lower()}{last_name.lower()}{access_code}"
-    role_text = role_map[role]
+    access_code, username, role_text = new_employee_fields(first_name, last_name, role)
 
     with connect() as conn:
         cur = conn.cursor()
@@ -110,4 +130,5 @@ def create_employee(
         """,(first_name, last_name, role_text, access_code, username, password))
         employee_id = cur.fetchone()[0]
         conn.commit()
-        return employee_id
\ No newline at end of file
+    reference_cache.invalidate("employees")
+    return employee_id
@@ -0,0 +1,144 @@
+"""
+Bounded LRU + TTL cache of per-phone guest context (client row + upcoming reservation).
+
+Filled by models/guest_context.py (and its async twin) and invalidated by the
+client/reservation write helpers. Writes from other processes (or straight
+SQL) arrive as ``guests`` notifications from the triggers of migration 0009,
+through the reference cache's LISTEN thread. While that listener is not
+running, other processes' writes are only seen once the entry's TTL runs out.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from models.reference_cache import reference_cache
+from utils import normalize_phone
+
+GUEST_CACHE_SIZE = int(os.getenv("GUEST_CACHE_SIZE", "10000"))
+GUEST_CACHE_TTL = float(os.getenv("GUEST_CACHE_TTL", "120"))  # seconds
+
+
+def phone_key(phone_number: str) -> str:
+    return normalize_phone(phone_number) or phone_number
+
+
+class GuestContextCache:
+    def __init__(self, maxsize: int = GUEST_CACHE_SIZE, ttl: float = GUEST_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._phone_by_client: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        # ticks on every invalidation; each invalidated phone / client keeps the
+        # tick it was last invalidated at, so a lookup that started before a
+        # write to that guest does not put its (now stale) result back, while
+        # lookups of other guests are unaffected. Only the latest ``maxsize``
+        # stamps are kept: lookups older than an evicted stamp are not cached.
+        self._clock = 0
+        self._stamps: "OrderedDict[Tuple[str, Hashable], int]" = OrderedDict()
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def version(self) -> int:
+        """Take before a lookup and pass to ``put`` with its result."""
+        return self._clock
+
+    def get(self, phone_number: str) -> Optional[Dict[str, Any]]:
+        key = phone_key(phone_number)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, phone_number: str, context: Dict[str, Any], version: int) -> None:
+        key = phone_key(phone_number)
+        client = context.get("client")
+        with self._lock:
+            if (version < self._floor or self._stamps.get(("phone", key), 0) > version
+                    or (client and self._stamps.get(("client", client[0]), 0) > version)):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, context)
+            self._entries.move_to_end(key)
+            if client:
+                self._phone_by_client[client[0]] = key
+            while len(self._entries) > self.maxsize:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._forget_client(old_key, old_entry)
+
+    def invalidate_phone(self, phone_number: str) -> None:
+        key = phone_key(phone_number)
+        with self._lock:
+            self._stamp(("phone", key))
+            self.invalidations += 1
+            self._drop(key)
+
+    def invalidate_client(self, client_id: int) -> None:
+        with self._lock:
+            self._stamp(("client", client_id))
+            self.invalidations += 1
+            key = self._phone_by_client.pop(client_id, None)
+            if key is not None:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clock += 1
+            self._floor = self._clock
+            self._stamps.clear()
+            self._entries.clear()
+            self._phone_by_client.clear()
+
+    def apply_notification(self, data: str) -> None:
+        """Reference listener: ``{"clients": [...], "phones": [...]}``, or empty to drop everything."""
+        if not data:
+            self.clear()
+            return
+        changed = json.loads(data)
+        for client_id in changed.get("clients") or ():
+            self.invalidate_client(client_id)
+        for phone_number in changed.get("phones") or ():
+            self.invalidate_phone(phone_number)
+
+    def _stamp(self, what: Tuple[str, Hashable]) -> None:
+        self._clock += 1
+        self._stamps[what] = self._clock
+        self._stamps.move_to_end(what)
+        if len(self._stamps) > self.maxsize:
+            _, evicted = self._stamps.popitem(last=False)
+            self._floor = max(self._floor, evicted)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._forget_client(key, entry)
+
+    def _forget_client(self, key: str, entry: Tuple[float, Dict[str, Any]]) -> None:
+        client = entry[1].get("client")
+        if client and self._phone_by_client.get(client[0]) == key:
+            del self._phone_by_client[client[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+guest_cache = GuestContextCache()
+reference_cache.subscribe("guests", guest_cache.apply_notification, guest_cache.clear)
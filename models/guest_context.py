@@ -0,0 +1,60 @@
+from typing import Any, Dict, Optional, Tuple
+
+from database.connection import connect
+from models.client_profile import PROFILE_COLUMNS, PROFILE_WIDTH, row_to_profile
+from models.guest_cache import guest_cache
+from models.reservations import row_to_reservation, upcoming_window
+
+# Client row + profile + soonest upcoming reservation in one round trip. The
+# client columns come first so the client part is row[:-(PROFILE_WIDTH + 5)]
+# whatever Clients looks like.
+GUEST_CONTEXT_SQL = f"""
+    SELECT c.*, {PROFILE_COLUMNS},
+           r.reservation_id, r.client_id, r.reservation_time, r.covers, r.notes_json
+    FROM Clients c
+    LEFT JOIN client_profile p ON p.client_id = c.client_id
+    LEFT JOIN LATERAL (
+        SELECT reservation_id, client_id, reservation_time, covers, notes_json
+        FROM Reservations
+        WHERE client_id = c.client_id
+          AND reservation_time BETWEEN %s AND %s
+        ORDER BY reservation_time ASC
+        LIMIT 1
+    ) r ON TRUE
+    WHERE c.phone_number = %s
+"""
+
+
+def split_guest_row(row: Optional[Tuple]) -> Dict[str, Any]:
+    """Turn a GUEST_CONTEXT_SQL row into {"client", "profile", "upcoming"} (``None`` when unknown)."""
+    if not row:
+        return {"client": None, "profile": None, "upcoming": None}
+    client_end = len(row) - PROFILE_WIDTH - 5
+    reservation = row[-5:]
+    upcoming = row_to_reservation(reservation) if reservation[0] is not None else None
+    return {
+        "client": tuple(row[:client_end]),
+        "profile": row_to_profile(tuple(row[client_end:-5])),
+        "upcoming": upcoming,
+    }
+
+
+def get_guest_context(phone_number: str) -> Dict[str, Any]:
+    """Return the cached guest context for a phone, querying on a miss.
+
+    ``client`` is the same tuple ``get_client_by_phone`` returns,
+    ``profile`` the same dict as ``get_client_profile`` (without ``client``)
+    and ``upcoming`` the same dict as ``get_upcoming_reservation``.
+    """
+    cached = guest_cache.get(phone_number)
+    if cached is not None:
+        return cached
+
+    version = guest_cache.version
+    now, window_end = upcoming_window()
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute(GUEST_CONTEXT_SQL, (now, window_end, phone_number))
+        context = split_guest_row(cur.fetchone())
+    guest_cache.put(phone_number, context, version)
+    return context
@@ -1,5 +1,7 @@
+from datetime import datetime
 from typing import List, Tuple, Optional
 from database.connection import connect
+from models.guest_cache import guest_cache
 
 """
 CREATE TABLE IF NOT EXISTS History (
@@ -15,22 +17,31 @@ CREATE TABLE IF NOT EXISTS History (
 );
 """
 
-def get_client_history (client_id: int) -> list[Tuple]:
+def get_client_history(client_id: int, since: Optional[datetime] = None) -> List[Tuple]:
+    """Visits (with their notes) for a client, newest first.
+
+    ``since`` limits it to visits on or after that time. History and Notes
+    are partitioned by month, so a recent window only reads recent partitions
+    (a visit's notes are written after the visit, hence the Notes bound).
+    """
+    window = "AND History.visit_date >= %(since)s" if since else ""
+    notes_window = "AND Notes.created_at >= %(since)s" if since else ""
     with connect() as conn:
         cur = conn.cursor()
-        cur.execute("""
-            SELECT 
+        cur.execute(f"""
+            SELECT
                 History.history_id,
                 History.visit_date,
-                Histoy.employee_id
+                History.employee_id,
                 Notes.note_text,
                 Notes.created_at
             FROM History
-            LEFT JOIN Notes ON History.history_id = Notes.history_id
-            WHERE History.client_id = %s
+            LEFT JOIN Notes ON History.history_id = Notes.history_id {notes_window}
+            WHERE History.client_id = %(client_id)s {window}
             ORDER BY History.visit_date DESC
-        """(client_id,))    
-    return cur.fetchall()
+        """, {"client_id": client_id, "since": since})
+        # fetch before the connection goes back to the pool
+        return cur.fetchall()
 
 def add_visit(client_id: int, employee_id: int, items_ordered: str, note_text: Optional[str] = None):
     with connect() as conn:
@@ -51,4 +62,6 @@ def add_visit(client_id: int, employee_id: int, items_ordered: str, note_text: O
                 VALUES (%s, %s, %s, %s)
             """, (client_id, history_id, employee_id, note_text))
 
-        conn.commit()
\ No newline at end of file
+        conn.commit()
+        # client_profile changed (trigger), so drop the cached guest context
+        guest_cache.invalidate_client(client_id)
@@ -1,30 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.engine import URL
-from sqlalchemy.orm import declarative_base, sessionmaker
-from decouple import config
-
-url = URL.create(
-    drivername ="postgresql",
-    username=config("DB_USER"),
-    password=config("DB_PASSWORD"),
-    host="localhost",
-    database="mydb",
-    port=5432
-)
-
-engine = create_engine(url)
-SessionLocal = sessionmaker(bind=engine)
-Base = declarative_base()
-
-class Conversation(Base):
-    __tablename__ = "conversations"
-
-    id = Column(Integer, primary_key=True, index=True)
-    sender = Column(String)
-    message = Column(String)
-    response = Column(String)
-
-
-Base.metadata.create_all(engine)
+# Old copy of models/conversation.py - kept so existing imports keep working.
+from models.conversation import Base, Conversation, SessionLocal, engine, url  # noqa: F401
 
 ## saved as conversations.py in MaitreD'
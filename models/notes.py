@@ -1,5 +1,7 @@
+from datetime import datetime
 from typing import List, Tuple, Optional
 from database.connection import connect
+from models.guest_cache import guest_cache
 
 """
 CREATE TABLE IF NOT EXISTS Notes (
@@ -40,6 +42,8 @@ def add_note(
         )
         note_id = cur.fetchone()[0]
         conn.commit()
+        # the note shows up in client_profile.recent_notes
+        guest_cache.invalidate_client(client_id)
         return note_id
 
 
@@ -51,24 +55,31 @@ def get_note(note_id: int) -> Optional[Tuple]:
         return cur.fetchone()
 
 
-def get_notes_by_client(client_id: int) -> List[Tuple]:
-    """Return every note that belongs to a given client."""
+def get_notes_by_client(client_id: int, since: Optional[datetime] = None) -> List[Tuple]:
+    """Return every note that belongs to a given client (only those written
+    on or after ``since`` if given, which skips older Notes partitions)."""
+    window = "AND created_at >= %s" if since else ""
     with connect() as conn:
         cur = conn.cursor()
         cur.execute(
-            "SELECT * FROM Notes WHERE client_id = %s ORDER BY created_at DESC",
-            (client_id,),
+            f"SELECT * FROM Notes WHERE client_id = %s {window} ORDER BY created_at DESC",
+            (client_id, since) if since else (client_id,),
         )
         return cur.fetchall()
 
 
-def get_notes_by_history(history_id: int) -> List[Tuple]:
-    """Return every note attached to a specific visit (history record)."""
+def get_notes_by_history(history_id: int, visit_date: Optional[datetime] = None) -> List[Tuple]:
+    """Return every note attached to a specific visit (history record).
+
+    Pass the visit's ``visit_date`` when known: notes are written after the
+    visit, so Notes partitions before it are skipped.
+    """
+    window = "AND created_at >= %s" if visit_date else ""
     with connect() as conn:
         cur = conn.cursor()
         cur.execute(
-            "SELECT * FROM Notes WHERE history_id = %s ORDER BY created_at DESC",
-            (history_id,),
+            f"SELECT * FROM Notes WHERE history_id = %s {window} ORDER BY created_at DESC",
+            (history_id, visit_date) if visit_date else (history_id,),
         )
         return cur.fetchall()
 
@@ -83,15 +94,22 @@ def update_note(note_id: int, new_text: str) -> None:
             SET note_text = %s,
                 created_at = CURRENT_TIMESTAMP
             WHERE note_id = %s
+            RETURNING client_id
             """,
             (new_text, note_id),
         )
+        row = cur.fetchone()
         conn.commit()
+        if row:
+            guest_cache.invalidate_client(row[0])
 
 
 def delete_note(note_id: int) -> None:
     """Remove a note permanently."""
     with connect() as conn:
         cur = conn.cursor()
-        cur.execute("DELETE FROM Notes WHERE note_id = %s", (note_id,))
+        cur.execute("DELETE FROM Notes WHERE note_id = %s RETURNING client_id", (note_id,))
+        row = cur.fetchone()
         conn.commit()
+        if row:
+            guest_cache.invalidate_client(row[0])
@@ -0,0 +1,170 @@
+"""
+Read-through in-process cache for the small reference tables (Employees, Restaurants).
+
+Results of the read helpers in models/employees.py and models/restaurants.py
+(and their async twins) are kept per table until the table changes. Changes
+are pushed by Postgres: statement-level triggers (migration 0008) run
+``pg_notify('maitred_reference', <table>)``, and a daemon thread in every
+process LISTENs on that channel and drops the table's entries as soon as the
+writing transaction commits, whichever worker or tool made the change.
+
+While the listener is not connected (not started yet, or reconnecting after
+the connection dropped) nothing is cached, so a missed notification can never
+leave a stale entry behind.
+
+Other caches share the listener: a ``<topic>:<data>`` payload goes to whoever
+``subscribe``d to the topic (the guest context cache, migration 0009).
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import psycopg
+
+from database.connection import DB_URL
+
+REFERENCE_CACHE_ENABLED = os.getenv("REFERENCE_CACHE", "1") not in ("0", "false", "False", "")
+CHANNEL = "maitred_reference"
+TABLES = ("employees", "restaurants")
+
+_log = logging.getLogger(__name__)
+
+
+class ReferenceCache:
+    def __init__(self, enabled: bool = REFERENCE_CACHE_ENABLED):
+        self.enabled = enabled
+        self._entries: Dict[str, Dict[Hashable, Any]] = {table: {} for table in TABLES}
+        self._lock = threading.Lock()
+        # bumped per table on every invalidation so a load that started before
+        # a change does not put its (now stale) result back afterwards
+        self._versions: Dict[str, int] = {table: 0 for table in TABLES}
+        self._stats: Dict[str, Dict[str, int]] = {
+            table: {"hits": 0, "misses": 0, "invalidations": 0} for table in TABLES
+        }
+        # topic -> (on_notify(data), on_reset()); see subscribe
+        self._topics: Dict[str, Tuple[Callable[[str], None], Callable[[], None]]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.listening = False
+        self.reconnects = 0
+
+    def get(self, table: str, key: Hashable) -> Tuple[bool, Any, int]:
+        """Return ``(hit, value, version)``; pass ``version`` to ``put`` after a miss."""
+        self.start()
+        with self._lock:
+            stats = self._stats[table]
+            entries = self._entries[table]
+            if self.listening and key in entries:
+                stats["hits"] += 1
+                return True, entries[key], self._versions[table]
+            stats["misses"] += 1
+            return False, None, self._versions[table]
+
+    def put(self, table: str, key: Hashable, value: Any, version: int) -> None:
+        with self._lock:
+            if self.listening and version == self._versions[table]:
+                self._entries[table][key] = value
+
+    def invalidate(self, table: str) -> None:
+        table = table.lower()
+        with self._lock:
+            if table not in self._entries:
+                return
+            self._versions[table] += 1
+            self._stats[table]["invalidations"] += 1
+            self._entries[table].clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            for table in TABLES:
+                self._versions[table] += 1
+                self._entries[table].clear()
+
+    # -- listener --------------------------------------------------------- #
+
+    def subscribe(self, topic: str, on_notify: Callable[[str], None],
+                  on_reset: Callable[[], None]) -> None:
+        """Send ``<topic>`` / ``<topic>:<data>`` payloads to ``on_notify(data)``.
+
+        ``on_reset()`` runs whenever the listener connects or drops, since
+        notifications may have been missed around it.
+        """
+        self._topics[topic] = (on_notify, on_reset)
+
+    def _dispatch(self, payload: str) -> None:
+        topic, _, data = payload.partition(":")
+        if topic in self._topics:
+            self._topics[topic][0](data)
+        else:
+            self.invalidate(payload)
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._listen, name="reference-cache", daemon=True)
+            self._thread.start()
+
+    def _set_listening(self, listening: bool) -> None:
+        # entries cached before LISTEN took effect (or across a gap) may have missed a change
+        self.clear()
+        for _, on_reset in list(self._topics.values()):
+            on_reset()
+        with self._lock:
+            self.listening = listening
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                with psycopg.connect(DB_URL, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    self._set_listening(True)
+                    backoff = 1.0
+                    for notify in conn.notifies():
+                        self._dispatch(notify.payload)
+            except Exception as e:  # noqa: BLE001
+                _log.warning("reference cache listener disconnected: %s", e)
+            self._set_listening(False)
+            self.reconnects += 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {"listening": self.listening, "reconnects": self.reconnects}
+            for table, stats in self._stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                out[table] = dict(
+                    stats,
+                    size=len(self._entries[table]),
+                    hit_rate=round(stats["hits"] / lookups, 3) if lookups else 0.0,
+                )
+            return out
+
+
+reference_cache = ReferenceCache()
+
+
+def cached(table: str, key: Hashable, load: Callable[[], Any]) -> Any:
+    """Return the cached result for ``key`` or call ``load()`` and cache it."""
+    hit, value, version = reference_cache.get(table, key)
+    if hit:
+        # callers may sort or append to the lists they get back
+        return list(value) if isinstance(value, list) else value
+    value = load()
+    reference_cache.put(table, key, list(value) if isinstance(value, list) else value, version)
+    return value
+
+
+async def cached_async(table: str, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+    """``cached`` for the async twins."""
+    hit, value, version = reference_cache.get(table, key)
+    if hit:
+        return list(value) if isinstance(value, list) else value
+    value = await load()
+    reference_cache.put(table, key, list(value) if isinstance(value, list) else value, version)
+    return value
@@ -0,0 +1,245 @@
+import json
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database.connection import connect
+from models.client_import import _read_records
+from models.guest_cache import guest_cache
+from models.reservations import build_notes_json, notify_reservation_saved
+from utils import normalize_phones
+
+"""
+Bulk reservation upsert (third-party booking platform syncs -> Reservations).
+
+The batch is parsed and validated in one pass, guests are resolved by phone
+(and created when the record carries a name) with a single query, the rows are
+streamed with COPY into a temp staging table and merged with one
+INSERT ... ON CONFLICT (client_id, reservation_time). Every input record gets
+an outcome: inserted, updated, unchanged or rejected with a reason.
+
+Like ``upsert_reservation`` this is a staff-side write: it does not check
+service capacity (see ``services.availability``).
+"""
+
+# accepted spellings in platform exports
+FIELD_ALIASES = {"phone": "phone_number", "mobile": "phone_number", "party_size": "covers",
+                 "guests": "covers", "time_slot": "time", "datetime": "reservation_time",
+                 "first": "first_name", "last": "last_name", "name": "guest_name"}
+NOTE_FIELDS = ("occasion", "seating", "dietary", "special_requests", "source", "language_guess")
+
+Outcome = Dict[str, Any]  # {"index", "status", "reservation_id", "reason"}
+
+RESOLVE_GUESTS_SQL = """
+    WITH incoming (phone_number, first_name, last_name) AS (
+        SELECT * FROM unnest(%s::text[], %s::text[], %s::text[])
+    ),
+    created AS (
+        INSERT INTO Clients (phone_number, first_name, last_name)
+        SELECT phone_number, first_name, last_name FROM incoming
+        WHERE first_name IS NOT NULL AND last_name IS NOT NULL
+        ON CONFLICT (phone_number) DO NOTHING
+        RETURNING phone_number, client_id
+    )
+    SELECT phone_number, client_id FROM created
+    UNION ALL
+    SELECT c.phone_number, c.client_id FROM Clients c JOIN incoming i USING (phone_number)
+"""
+
+# rows whose covers, notes and restaurant are already current are left alone
+MERGE_SQL = """
+    INSERT INTO Reservations (client_id, reservation_time, covers, notes_json, restaurant_id)
+    SELECT client_id, reservation_time, covers, notes_json, restaurant_id FROM reservations_import
+    ON CONFLICT (client_id, reservation_time)
+    DO UPDATE SET covers = EXCLUDED.covers,
+                  notes_json = EXCLUDED.notes_json,
+                  restaurant_id = COALESCE(EXCLUDED.restaurant_id, Reservations.restaurant_id),
+                  updated_at = CURRENT_TIMESTAMP
+    WHERE (Reservations.covers, Reservations.notes_json, Reservations.restaurant_id)
+          IS DISTINCT FROM
+          (EXCLUDED.covers, EXCLUDED.notes_json, COALESCE(EXCLUDED.restaurant_id, Reservations.restaurant_id))
+    RETURNING reservation_id, client_id, reservation_time, covers, restaurant_id, (xmax = 0) AS inserted
+"""
+
+
+def _clean(record: Dict[str, Any]) -> Dict[str, Any]:
+    out = {}
+    for key, value in record.items():
+        key = (key or "").strip().lower()
+        key = FIELD_ALIASES.get(key, key)
+        if isinstance(value, str):
+            value = value.strip() or None
+        out[key] = value
+    return out
+
+
+def _parse_time(rec: Dict[str, Any]) -> datetime:
+    value = rec.get("reservation_time")
+    if isinstance(value, datetime):
+        return value.replace(second=0, microsecond=0)
+    if value is None:
+        value = f"{rec['date']} {rec['time']}"
+    # fromisoformat is several times cheaper than strptime and also takes "T" and seconds
+    return datetime.fromisoformat(str(value)).replace(second=0, microsecond=0, tzinfo=None)
+
+
+def _rejected(index: int, reason: str) -> Outcome:
+    return {"index": index, "status": "rejected", "reservation_id": None, "reason": reason}
+
+
+Parsed = Tuple[int, Dict[str, Any], Optional[str], datetime, int]  # index, record, phone, time, covers
+
+
+def _parse_batch(records: List[Dict[str, Any]]) -> Tuple[List[Optional[Outcome]], List[Parsed],
+                                                          Dict[str, Tuple[Optional[str], Optional[str]]]]:
+    """Pass 1: everything that doesn't need the database.
+
+    Returns the outcomes so far (rejects, ``None`` for the rest), the records
+    that passed, and the names to create unknown guests with, by phone.
+    """
+    outcomes: List[Optional[Outcome]] = [None] * len(records)
+    phones = normalize_phones([str(r.get("phone_number") or "") for r in records])
+    parsed: List[Parsed] = []
+    guests: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for index, (rec, phone) in enumerate(zip(records, phones)):
+        try:
+            when = _parse_time(rec)
+        except (KeyError, TypeError, ValueError):
+            outcomes[index] = _rejected(index, "invalid or missing date/time")
+            continue
+        try:
+            covers = int(rec.get("covers"))
+        except (TypeError, ValueError):
+            covers = 0
+        if covers < 1:
+            outcomes[index] = _rejected(index, "invalid covers")
+            continue
+        try:
+            for key in ("client_id", "restaurant_id"):
+                if rec.get(key):
+                    rec[key] = int(rec[key])
+        except (TypeError, ValueError):
+            outcomes[index] = _rejected(index, f"invalid {key}")
+            continue
+        if not rec.get("client_id"):
+            if not phone:
+                outcomes[index] = _rejected(index, "no client_id or valid phone number")
+                continue
+            first, last = rec.get("first_name"), rec.get("last_name")
+            if not first and rec.get("guest_name"):
+                first, _, last = rec["guest_name"].rpartition(" ")
+                if not first:  # a single word: keep it as the first name
+                    first, last = last, ""
+            # first name seen wins, even if earlier records for the phone had none
+            if first and guests.get(phone, (None, None))[0] is None:
+                guests[phone] = (first, last or "")
+            guests.setdefault(phone, (None, None))
+        parsed.append((index, rec, phone, when, covers))
+    return outcomes, parsed, guests
+
+
+def upsert_reservations(records: Iterable[Dict[str, Any]], restaurant_id: Optional[int] = None,
+                        source: Optional[str] = None) -> List[Outcome]:
+    """Insert or update many reservations in one transaction.
+
+    Each record has ``client_id`` or ``phone_number`` (plus ``first_name`` /
+    ``last_name`` or ``guest_name`` to create unknown guests), ``date`` and
+    ``time`` or ``reservation_time``, ``covers`` and optionally
+    ``restaurant_id`` and the ``notes_json`` fields (occasion, seating,
+    dietary, special_requests, source, language_guess). ``restaurant_id`` and
+    ``source`` are defaults for records without one.
+
+    Returns one outcome per record, in input order, with ``status`` one of
+    ``inserted``, ``updated``, ``unchanged`` or ``rejected`` (see ``reason``).
+    """
+    outcomes, parsed, guests = _parse_batch([_clean(r) for r in records])
+
+    with closing(connect()) as conn:
+        cur = conn.cursor()
+        client_ids: Dict[str, int] = {}
+        if guests:
+            names = list(guests.values())
+            cur.execute(RESOLVE_GUESTS_SQL, (list(guests), [n[0] for n in names], [n[1] for n in names]))
+            client_ids = dict(cur.fetchall())
+
+        cur.execute("""
+            CREATE TEMP TABLE reservations_import (
+                record_no        INTEGER,
+                client_id        INTEGER,
+                reservation_time TIMESTAMP,
+                covers           INTEGER,
+                notes_json       JSONB,
+                restaurant_id    INTEGER
+            ) ON COMMIT DROP
+        """)
+        staged: Dict[Tuple[int, datetime], int] = {}
+        with cur.copy("COPY reservations_import (record_no, client_id, reservation_time, covers, "
+                      "notes_json, restaurant_id) FROM STDIN") as copy:
+            for index, rec, phone, when, covers in parsed:
+                client_id = rec.get("client_id") or client_ids.get(phone)
+                if client_id is None:
+                    outcomes[index] = _rejected(index, "unknown guest (no name to create one)")
+                    continue
+                if (client_id, when) in staged:
+                    outcomes[index] = _rejected(index, "duplicate guest and time in batch")
+                    continue
+                notes = build_notes_json(**{f: rec.get(f) for f in NOTE_FIELDS})
+                notes["source"] = notes.get("source") or source
+                staged[(client_id, when)] = index
+                copy.write_row((index, client_id, when, covers, json.dumps(notes),
+                                rec.get("restaurant_id") or restaurant_id))
+
+        # ids that don't exist would abort the whole merge on a foreign key
+        cur.execute("""
+            DELETE FROM reservations_import s
+            WHERE NOT EXISTS (SELECT 1 FROM Clients c WHERE c.client_id = s.client_id)
+               OR (s.restaurant_id IS NOT NULL
+                   AND NOT EXISTS (SELECT 1 FROM Restaurants r WHERE r.restaurant_id = s.restaurant_id))
+            RETURNING s.record_no,
+                      EXISTS (SELECT 1 FROM Clients c WHERE c.client_id = s.client_id)
+        """)
+        for index, client_known in cur.fetchall():
+            outcomes[index] = _rejected(index, "unknown restaurant_id" if client_known else "unknown client_id")
+
+        cur.execute(MERGE_SQL)
+        saved = cur.fetchall()
+        conn.commit()
+
+    for reservation_id, client_id, when, covers, saved_restaurant_id, inserted in saved:
+        index = staged.pop((client_id, when))
+        outcomes[index] = {"index": index, "status": "inserted" if inserted else "updated",
+                           "reservation_id": reservation_id, "reason": None}
+        guest_cache.invalidate_client(client_id)
+        notify_reservation_saved({
+            "reservation_id": reservation_id, "client_id": client_id, "restaurant_id": saved_restaurant_id,
+            "reservation_time": when, "covers": covers,
+        })
+    for index in staged.values():
+        if outcomes[index] is None:
+            outcomes[index] = {"index": index, "status": "unchanged", "reservation_id": None, "reason": None}
+    return outcomes
+
+
+def import_reservations(path: str, fmt: Optional[str] = None, restaurant_id: Optional[int] = None,
+                        source: Optional[str] = None) -> Dict[str, Any]:
+    """Run ``upsert_reservations`` over a CSV / NDJSON file; returns counts and the rejects.
+
+    Rejects are (line number, reason, record) like ``client_import``.
+    """
+    start = time.monotonic()
+    lines, raws = [], []
+    for line_no, raw in _read_records(path, fmt):
+        lines.append(line_no)
+        raws.append(raw)
+    outcomes = upsert_reservations(raws, restaurant_id, source)
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "rejected": 0}
+    for outcome in outcomes:
+        counts[outcome["status"]] += 1
+    return {
+        "total": len(outcomes),
+        **counts,
+        "rejects": [(lines[o["index"]], o["reason"], raws[o["index"]])
+                    for o in outcomes if o["status"] == "rejected"],
+        "seconds": round(time.monotonic() - start, 2),
+    }
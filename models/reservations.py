@@ -1,19 +1,55 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 import json
+import logging
 
 from database.connection import connect
+from models.guest_cache import guest_cache
 
 UPCOMING_WINDOW_HOURS = 48
 
+# ON CONFLICT keeps the restaurant when an update doesn't say which one
+UPSERT_RESERVATION_SQL = """
+    INSERT INTO Reservations (client_id, reservation_time, covers, notes_json, restaurant_id)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (client_id, reservation_time)
+    DO UPDATE SET covers = EXCLUDED.covers,
+                  notes_json = EXCLUDED.notes_json,
+                  restaurant_id = COALESCE(EXCLUDED.restaurant_id, Reservations.restaurant_id),
+                  updated_at = CURRENT_TIMESTAMP
+    RETURNING reservation_id, restaurant_id
+"""
 
-def upsert_reservation(
-    client_id: int,
-    date: str,
-    time: str,
-    covers: int,
+# Called with the saved reservation after every committed upsert (sync or
+# async), e.g. by the availability index and the reminder scheduler.
+ReservationListener = Callable[[Dict[str, Any]], None]
+_listeners: List[ReservationListener] = []
+_log = logging.getLogger(__name__)
+
+
+def add_reservation_listener(listener: ReservationListener) -> None:
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def notify_reservation_saved(reservation: Dict[str, Any]) -> None:
+    """Hand a saved reservation to the listeners; their errors never fail the write."""
+    for listener in _listeners:
+        try:
+            listener(reservation)
+        except Exception:  # noqa: BLE001
+            _log.exception("reservation listener %r failed", listener)
+
+
+# Shared with the async twin in models/aio/reservations.py
+def parse_reservation_time(date: str, time: str) -> datetime:
+    """Parse ``YYYY-MM-DD`` + ``HH:MM`` into a naive datetime."""
+    return datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+
+
+def build_notes_json(
     occasion: Optional[str] = None,
     seating: Optional[str] = None,
     dietary: Optional[str] = None,
@@ -24,16 +60,9 @@ def upsert_reservation(
     parsed_date: Optional[str] = None,
     parsed_time: Optional[str] = None,
     created_by_bot: bool = False,
-) -> int:
-    """Insert or update a reservation record.
-
-    The combination of ``client_id`` and ``reservation_time`` is treated as
-    unique.  If a record already exists for that tuple, the entry is updated
-    rather than duplicated.
-    """
-    reservation_time = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
-
-    notes_json: Dict[str, Any] = {
+) -> Dict[str, Any]:
+    """Collect the free-form reservation details stored in ``notes_json``."""
+    return {
         "occasion": occasion,
         "seating": seating,
         "dietary": dietary,
@@ -46,23 +75,69 @@ def upsert_reservation(
         "created_by_bot": created_by_bot,
     }
 
+
+def upcoming_window(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Return the (start, end) of the upcoming-reservation window."""
+    now = now or datetime.utcnow()
+    return now, now + timedelta(hours=UPCOMING_WINDOW_HOURS)
+
+
+def row_to_reservation(row: Tuple) -> Dict[str, Any]:
+    """Turn a (reservation_id, client_id, reservation_time, covers, notes_json) row into a dict."""
+    reservation_id, client_id, reservation_time, covers, notes_json = row
+    return {
+        "reservation_id": reservation_id,
+        "client_id": client_id,
+        "reservation_time": reservation_time,
+        "covers": covers,
+        "notes_json": notes_json,
+    }
+
+
+def upsert_reservation(
+    client_id: int,
+    date: str,
+    time: str,
+    covers: int,
+    occasion: Optional[str] = None,
+    seating: Optional[str] = None,
+    dietary: Optional[str] = None,
+    special_requests: Optional[str] = None,
+    source: Optional[str] = None,
+    language_guess: Optional[str] = None,
+    parsed_party_size: Optional[int] = None,
+    parsed_date: Optional[str] = None,
+    parsed_time: Optional[str] = None,
+    created_by_bot: bool = False,
+    restaurant_id: Optional[int] = None,
+) -> int:
+    """Insert or update a reservation record.
+
+    The combination of ``client_id`` and ``reservation_time`` is treated as
+    unique.  If a record already exists for that tuple, the entry is updated
+    rather than duplicated. No capacity check: this is the staff override,
+    bookings go through ``services.availability.book_reservation``.
+    """
+    reservation_time = parse_reservation_time(date, time)
+    notes_json = build_notes_json(
+        occasion, seating, dietary, special_requests, source,
+        language_guess, parsed_party_size, parsed_date, parsed_time, created_by_bot,
+    )
+
     with connect() as conn:
         cur = conn.cursor()
         cur.execute(
-            """
-            INSERT INTO Reservations (client_id, reservation_time, covers, notes_json)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (client_id, reservation_time)
-            DO UPDATE SET covers = EXCLUDED.covers,
-                          notes_json = EXCLUDED.notes_json,
-                          updated_at = CURRENT_TIMESTAMP
-            RETURNING reservation_id
-            """,
-            (client_id, reservation_time, covers, json.dumps(notes_json)),
+            UPSERT_RESERVATION_SQL,
+            (client_id, reservation_time, covers, json.dumps(notes_json), restaurant_id),
         )
-        reservation_id = cur.fetchone()[0]
+        reservation_id, saved_restaurant_id = cur.fetchone()
         conn.commit()
-        return reservation_id
+        guest_cache.invalidate_client(client_id)
+    notify_reservation_saved({
+        "reservation_id": reservation_id, "client_id": client_id, "restaurant_id": saved_restaurant_id,
+        "reservation_time": reservation_time, "covers": covers,
+    })
+    return reservation_id
 
 
 def get_upcoming_reservation(client_id: int) -> Optional[Dict[str, Any]]:
@@ -75,8 +150,7 @@ def get_upcoming_reservation(client_id: int) -> Optional[Dict[str, Any]]:
         A dictionary with reservation details or ``None`` if no upcoming
         reservation exists for the client.
     """
-    now = datetime.utcnow()
-    window_end = now + timedelta(hours=UPCOMING_WINDOW_HOURS)
+    now, window_end = upcoming_window()
 
     with connect() as conn:
         cur = conn.cursor()
@@ -94,12 +168,4 @@ def get_upcoming_reservation(client_id: int) -> Optional[Dict[str, Any]]:
         row = cur.fetchone()
         if not row:
             return None
-
-        reservation_id, client_id, reservation_time, covers, notes_json = row
-        return {
-            "reservation_id": reservation_id,
-            "client_id": client_id,
-            "reservation_time": reservation_time,
-            "covers": covers,
-            "notes_json": notes_json,
-        }
+        return row_to_reservation(row)
@@ -1,21 +1,26 @@
 from typing import List, Tuple, Optional
 from database.connection import connect
+from models.reference_cache import cached, reference_cache
 
 
 def list_restaurants() -> List[Tuple]:
-    """Return a list of all restaurants."""
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT restaurant_id, name, location FROM Restaurants ORDER BY name")
-        return cur.fetchall()
+    """Return a list of all restaurants (cached until Restaurants changes)."""
+    def load():
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT restaurant_id, name, location FROM Restaurants ORDER BY name")
+            return cur.fetchall()
+    return cached("restaurants", "list", load)
 
 
 def get_restaurant_by_id(restaurant_id: int) -> Optional[Tuple]:
-    """Return a restaurant by ID."""
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM Restaurants WHERE restaurant_id = %s", (restaurant_id,))
-        return cur.fetchone()
+    """Return a restaurant by ID (cached until Restaurants changes)."""
+    def load():
+        with connect() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM Restaurants WHERE restaurant_id = %s", (restaurant_id,))
+            return cur.fetchone()
+    return cached("restaurants", ("id", restaurant_id), load)
 
 
 def create_restaurant(name: str, location: Optional[str] = None) -> int:
@@ -28,7 +33,8 @@ def create_restaurant(name: str, location: Optional[str] = None) -> int:
         )
         new_id = cur.fetchone()[0]
         conn.commit()
-        return new_id
+    reference_cache.invalidate("restaurants")
+    return new_id
 
 
 def update_restaurant(restaurant_id: int, name: str, location: Optional[str]) -> bool:
@@ -40,7 +46,9 @@ def update_restaurant(restaurant_id: int, name: str, location: Optional[str]) ->
             (name, location, restaurant_id)
         )
         conn.commit()
-        return cur.rowcount > 0
+        changed = cur.rowcount > 0
+    reference_cache.invalidate("restaurants")
+    return changed
 
 
 def delete_restaurant(restaurant_id: int) -> bool:
@@ -49,5 +57,7 @@ def delete_restaurant(restaurant_id: int) -> bool:
         cur = conn.cursor()
         cur.execute("DELETE FROM Restaurants WHERE restaurant_id = %s", (restaurant_id,))
         conn.commit()
-        return cur.rowcount > 0
+        changed = cur.rowcount > 0
+    reference_cache.invalidate("restaurants")
+    return changed
 
@@ -0,0 +1,58 @@
+from datetime import time
+from typing import List, Optional, Sequence, Tuple
+
+from database.connection import connect
+
+SERVICE_PERIOD_COLUMNS = (
+    "service_id, restaurant_id, name, weekdays, first_seating, last_seating, "
+    "turn_minutes, max_covers, max_party"
+)
+
+LIST_SERVICE_PERIODS_SQL = f"""
+    SELECT {SERVICE_PERIOD_COLUMNS} FROM ServicePeriods
+    WHERE active AND (%(rid)s::int IS NULL OR restaurant_id = %(rid)s)
+    ORDER BY restaurant_id, first_seating
+"""
+
+
+def list_service_periods(restaurant_id: Optional[int] = None) -> List[Tuple]:
+    """Active service periods, for one restaurant or all of them."""
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute(LIST_SERVICE_PERIODS_SQL, {"rid": restaurant_id})
+        return cur.fetchall()
+
+
+def create_service_period(
+    restaurant_id: int,
+    name: str,
+    first_seating: time,
+    last_seating: time,
+    max_covers: int,
+    turn_minutes: int = 120,
+    max_party: int = 12,
+    weekdays: Sequence[int] = (0, 1, 2, 3, 4, 5, 6),
+) -> int:
+    """Add a service (e.g. dinner 19:00-22:30, 80 covers) and return its id."""
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO ServicePeriods (restaurant_id, name, weekdays, first_seating, last_seating,
+                                        turn_minutes, max_covers, max_party)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING service_id
+            """,
+            (restaurant_id, name, list(weekdays), first_seating, last_seating,
+             turn_minutes, max_covers, max_party),
+        )
+        service_id = cur.fetchone()[0]
+        conn.commit()
+        return service_id
+
+
+def deactivate_service_period(service_id: int) -> None:
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute("UPDATE ServicePeriods SET active = FALSE WHERE service_id = %s", (service_id,))
+        conn.commit()
@@ -0,0 +1,4 @@
+"""
+Services Package: in-process runtime pieces of the message pipeline
+(LLM access, queues, caches) used by webapp.py
+"""
@@ -0,0 +1,114 @@
+"""Answer cache in front of the completion call for repeat FAQ questions.
+
+Two layers, both keyed on ``utils.normalize_question``:
+
+* staff canned answers from the ``CannedAnswers`` table, reloaded every
+  CANNED_REFRESH_SECONDS;
+* model answers to the FAQ questions listed in ANSWER_CACHE_QUESTIONS
+  (comma-separated, compared after normalizing), kept for ANSWER_CACHE_TTL
+  seconds in a bounded LRU. Any other question goes to the model every time:
+  "are you open tonight?" or "what's on today?" depend on when they're asked.
+
+Neither layer is used when the guest has guest-specific context (an upcoming
+reservation, a visit history in their profile or earlier turns in the
+conversation), because then the right
+answer depends on more than the question text.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import config, logger, normalize_question
+
+ANSWER_CACHE_TTL = float(config("ANSWER_CACHE_TTL", default=3600))
+ANSWER_CACHE_SIZE = int(config("ANSWER_CACHE_SIZE", default=1000))
+CANNED_REFRESH_SECONDS = float(config("CANNED_REFRESH_SECONDS", default=60))
+ANSWER_CACHE_QUESTIONS = str(config("ANSWER_CACHE_QUESTIONS", default=""))
+
+
+class AnswerCache:
+    def __init__(self, maxsize: int = ANSWER_CACHE_SIZE, ttl: float = ANSWER_CACHE_TTL,
+                 canned_refresh: float = CANNED_REFRESH_SECONDS,
+                 questions: str = ANSWER_CACHE_QUESTIONS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.canned_refresh = canned_refresh
+        self.allowed = {normalize_question(q) for q in questions.split(",")} - {""}
+        self._answers: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._canned: Dict[str, str] = {}
+        self._canned_loaded_at = 0.0
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self.canned_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def is_cacheable(upcoming: Optional[Dict[str, Any]], history: List[Dict[str, str]],
+                     profile: Optional[Dict[str, Any]] = None) -> bool:
+        """Only questions with no guest-specific context may share an answer."""
+        return not upcoming and not history and not (profile and profile.get("visit_count"))
+
+    async def refresh_canned(self, force: bool = False) -> None:
+        """Reload CannedAnswers when the copy in memory is older than canned_refresh."""
+        if not force and time.monotonic() - self._canned_loaded_at < self.canned_refresh:
+            return
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            if not force and time.monotonic() - self._canned_loaded_at < self.canned_refresh:
+                return
+            from models.aio.canned_answers import list_active_canned_answers
+            try:
+                rows = await list_active_canned_answers()
+            except Exception as e:  # noqa: BLE001 - keep serving the old copy
+                logger.error(f"Could not reload canned answers: {e}")
+                rows = None
+            if rows is not None:
+                self._canned = {question: answer for question, answer in rows}
+            self._canned_loaded_at = time.monotonic()
+
+    async def lookup(self, question: str) -> Optional[str]:
+        key = normalize_question(question)
+        if not key:
+            return None
+        await self.refresh_canned()
+        canned = self._canned.get(key)
+        if canned is not None:
+            self.canned_hits += 1
+            return canned
+
+        entry = self._answers.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._answers[key]
+            self.misses += 1
+            return None
+        self._answers.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def store(self, question: str, answer: str) -> None:
+        key = normalize_question(question)
+        if key not in self.allowed:
+            return
+        self._answers[key] = (time.monotonic() + self.ttl, answer)
+        self._answers.move_to_end(key)
+        while len(self._answers) > self.maxsize:
+            self._answers.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._answers),
+            "canned": len(self._canned),
+            "allowed": len(self.allowed),
+            "canned_hits": self.canned_hits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+        }
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,394 @@
+"""Table availability: service capacities and an in-memory slot occupancy index.
+
+Each restaurant has service periods (``ServicePeriods``, see
+models/service_periods.py): weekdays, first and last seating, how long a
+table is kept (``turn_minutes``) and how many covers can be seated at once
+(``max_covers``). A booking at 20:00 for 4 with a 120 minute turn adds 4 covers
+to every AVAILABILITY_SLOT_MINUTES slot from 20:00 to 22:00. Services are
+assumed to end by midnight. Days are UTC days, like the naive UTC
+reservation times they hold.
+
+``AvailabilityIndex`` keeps those per-slot cover counts for each
+(restaurant, day) in memory, so "is 20:00 for 6 available, and what's closest
+otherwise" is a handful of list lookups. Days come from ``Reservations`` (the
+next AVAILABILITY_HORIZON_DAYS at startup, others on first use), follow every
+upsert through the reservation listener, and are reloaded after
+AVAILABILITY_TTL seconds to pick up writes made by other processes. Service
+periods are reloaded on the same TTL.
+
+``book_reservation`` is the path that enforces capacity. It takes a Postgres
+advisory lock for the restaurant-day, re-reads the restaurant's service
+periods, recounts that day from the table, and checks and writes in the same
+transaction, so concurrent bookings from any number of workers can't
+overbook, and services set up or changed by staff apply to the next booking.
+The re-reads also refresh the index. Restaurants with no active service
+period are not capacity-checked at all, so existing installs keep booking as
+before until services are set up.
+``upsert_reservation`` stays available as the staff override.
+"""
+
+import json
+import math
+import threading
+import time as _time
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from database.connection import async_connect
+from models.guest_cache import guest_cache
+from models.reservations import (
+    UPSERT_RESERVATION_SQL,
+    add_reservation_listener,
+    build_notes_json,
+    notify_reservation_saved,
+    parse_reservation_time,
+)
+from models.service_periods import LIST_SERVICE_PERIODS_SQL
+from utils import config, logger
+
+SLOT_MINUTES = int(config("AVAILABILITY_SLOT_MINUTES", default=15))
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+HORIZON_DAYS = int(config("AVAILABILITY_HORIZON_DAYS", default=14))
+AVAILABILITY_TTL = float(config("AVAILABILITY_TTL", default=60))
+ALTERNATIVES = int(config("AVAILABILITY_ALTERNATIVES", default=3))
+# reservations without a restaurant (older rows, single-site setups) belong here
+DEFAULT_RESTAURANT_ID = int(config("DEFAULT_RESTAURANT_ID", default=1))
+# turn used for reservations that fall outside every service period
+DEFAULT_TURN_MINUTES = 120
+
+DAY_ROWS_SQL = """
+    SELECT reservation_id, client_id, reservation_time, covers
+    FROM Reservations
+    WHERE (restaurant_id = %(rid)s OR (%(is_default)s AND restaurant_id IS NULL))
+      AND reservation_time >= %(start)s AND reservation_time < %(end)s
+"""
+
+HORIZON_ROWS_SQL = """
+    SELECT COALESCE(restaurant_id, %(default_rid)s), reservation_id, reservation_time, covers
+    FROM Reservations
+    WHERE reservation_time >= %(start)s AND reservation_time < %(end)s
+"""
+
+
+@dataclass(frozen=True)
+class ServicePeriod:
+    service_id: int
+    restaurant_id: int
+    name: str
+    weekdays: FrozenSet[int]
+    first_seating: time
+    last_seating: time
+    turn_minutes: int
+    max_covers: int
+    max_party: int
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "ServicePeriod":
+        service_id, restaurant_id, name, weekdays, first, last, turn, max_covers, max_party = row
+        return cls(service_id, restaurant_id, name, frozenset(weekdays), first, last,
+                   turn, max_covers, max_party)
+
+    def serves(self, when: datetime) -> bool:
+        return when.weekday() in self.weekdays and self.first_seating <= when.time() <= self.last_seating
+
+    def seatings(self, day: date) -> Iterator[datetime]:
+        if day.weekday() not in self.weekdays:
+            return
+        when = datetime.combine(day, self.first_seating)
+        last = datetime.combine(day, self.last_seating)
+        while when <= last:
+            yield when
+            when += timedelta(minutes=SLOT_MINUTES)
+
+
+def slot_of(when: datetime) -> int:
+    return (when.hour * 60 + when.minute) // SLOT_MINUTES
+
+
+def slot_count(minutes: int) -> int:
+    return max(1, math.ceil(minutes / SLOT_MINUTES))
+
+
+class DayOccupancy:
+    """Covers seated per slot for one restaurant-day, plus what each reservation adds."""
+
+    __slots__ = ("covers", "entries", "loaded_at")
+
+    def __init__(self) -> None:
+        self.covers = [0] * SLOTS_PER_DAY
+        self.entries: Dict[int, Tuple[int, int, int]] = {}  # reservation_id -> (slot, length, covers)
+        self.loaded_at = _time.monotonic()
+
+    def add(self, reservation_id: int, start: int, length: int, covers: int) -> None:
+        self.remove(reservation_id)
+        for slot in range(start, min(start + length, SLOTS_PER_DAY)):
+            self.covers[slot] += covers
+        self.entries[reservation_id] = (start, length, covers)
+
+    def remove(self, reservation_id: int) -> None:
+        entry = self.entries.pop(reservation_id, None)
+        if entry:
+            start, length, covers = entry
+            for slot in range(start, min(start + length, SLOTS_PER_DAY)):
+                self.covers[slot] -= covers
+
+    def peak(self, start: int, length: int, ignore: Optional[int] = None) -> int:
+        """Most covers seated in any slot of [start, start + length), leaving out ``ignore``."""
+        own_start, own_length, own_covers = self.entries.get(ignore, (0, 0, 0))
+        peak = 0
+        for slot in range(start, min(start + length, SLOTS_PER_DAY)):
+            seated = self.covers[slot]
+            if own_start <= slot < own_start + own_length:
+                seated -= own_covers
+            peak = max(peak, seated)
+        return peak
+
+
+class AvailabilityIndex:
+    def __init__(self) -> None:
+        self._services: Dict[int, List[ServicePeriod]] = {}
+        self._days: Dict[Tuple[int, date], DayOccupancy] = {}
+        self._lock = threading.Lock()
+        self.services_loaded_at: Optional[float] = None
+        self.checks = 0
+        self.full = 0
+        self.day_loads = 0
+        self.updates = 0
+
+    # -- setup ----------------------------------------------------------- #
+
+    def set_services(self, periods: Iterable[ServicePeriod], restaurant_id: Optional[int] = None) -> None:
+        """Replace every restaurant's service periods, or only ``restaurant_id``'s."""
+        by_restaurant: Dict[int, List[ServicePeriod]] = {}
+        for period in periods:
+            by_restaurant.setdefault(period.restaurant_id, []).append(period)
+        with self._lock:
+            if restaurant_id is None:
+                self._services = by_restaurant
+                self.services_loaded_at = _time.monotonic()
+            elif by_restaurant.get(restaurant_id):
+                self._services[restaurant_id] = by_restaurant[restaurant_id]
+            else:
+                self._services.pop(restaurant_id, None)
+
+    def services_fresh(self) -> bool:
+        loaded_at = self.services_loaded_at
+        return loaded_at is not None and _time.monotonic() - loaded_at < AVAILABILITY_TTL
+
+    def restaurants(self) -> List[int]:
+        return list(self._services)
+
+    def has_services(self, restaurant_id: int) -> bool:
+        return bool(self._services.get(restaurant_id))
+
+    def service_for(self, restaurant_id: int, when: datetime) -> Optional[ServicePeriod]:
+        for period in self._services.get(restaurant_id, ()):
+            if period.serves(when):
+                return period
+        return None
+
+    def _length(self, restaurant_id: int, when: datetime) -> int:
+        period = self.service_for(restaurant_id, when)
+        return slot_count(period.turn_minutes if period else DEFAULT_TURN_MINUTES)
+
+    # -- occupancy ------------------------------------------------------- #
+
+    def is_fresh(self, restaurant_id: int, day: date) -> bool:
+        occupancy = self._days.get((restaurant_id, day))
+        return occupancy is not None and _time.monotonic() - occupancy.loaded_at < AVAILABILITY_TTL
+
+    def build_day(self, restaurant_id: int, day: date,
+                  rows: Iterable[Tuple[int, datetime, int]]) -> DayOccupancy:
+        """Replace a day's occupancy with (reservation_id, reservation_time, covers) rows."""
+        occupancy = DayOccupancy()
+        for reservation_id, when, covers in rows:
+            occupancy.add(reservation_id, slot_of(when), self._length(restaurant_id, when), covers)
+        with self._lock:
+            self._days[(restaurant_id, day)] = occupancy
+            self.day_loads += 1
+            # days that are over are never asked about again
+            yesterday = datetime.utcnow().date() - timedelta(days=1)
+            for key in [k for k in self._days if k[1] < yesterday]:
+                del self._days[key]
+        return occupancy
+
+    def apply(self, reservation: Dict[str, Any]) -> None:
+        """Reservation listener: move a saved reservation into its day, if that day is loaded."""
+        restaurant_id = reservation.get("restaurant_id") or DEFAULT_RESTAURANT_ID
+        when = reservation["reservation_time"]
+        with self._lock:
+            occupancy = self._days.get((restaurant_id, when.date()))
+            if occupancy is not None:
+                occupancy.add(reservation["reservation_id"], slot_of(when),
+                              self._length(restaurant_id, when), reservation["covers"])
+                self.updates += 1
+
+    # -- queries --------------------------------------------------------- #
+
+    def _fits(self, occupancy: DayOccupancy, period: ServicePeriod, when: datetime, covers: int,
+              ignore: Optional[int] = None) -> bool:
+        peak = occupancy.peak(slot_of(when), slot_count(period.turn_minutes), ignore)
+        return peak + covers <= period.max_covers
+
+    def check(self, restaurant_id: int, when: datetime, covers: int,
+              ignore: Optional[int] = None) -> Dict[str, Any]:
+        """Can ``covers`` be seated at ``when``? The day must be loaded.
+
+        Returns ``{"available", "reason", "alternatives"}``; ``reason`` is
+        ``closed``, ``party_too_large`` or ``full`` and the alternatives are the
+        nearest bookable times that day.
+        """
+        with self._lock:
+            self.checks += 1
+            occupancy = self._days.get((restaurant_id, when.date()))
+            if occupancy is None:
+                raise LookupError(f"day {when.date()} of restaurant {restaurant_id} is not loaded")
+            period = self.service_for(restaurant_id, when)
+            if period is None:
+                reason = "closed"
+            elif covers > period.max_party:
+                reason = "party_too_large"
+            elif not self._fits(occupancy, period, when, covers, ignore):
+                reason = "full"
+            else:
+                return {"available": True, "reason": None, "alternatives": []}
+            self.full += 1
+            return {"available": False, "reason": reason,
+                    "alternatives": self._alternatives(restaurant_id, occupancy, when, covers)}
+
+    def _alternatives(self, restaurant_id: int, occupancy: DayOccupancy, when: datetime,
+                      covers: int, limit: int = ALTERNATIVES) -> List[datetime]:
+        candidates = [
+            (abs((seating - when).total_seconds()), seating, period)
+            for period in self._services.get(restaurant_id, ())
+            if covers <= period.max_party
+            for seating in period.seatings(when.date())
+            if seating != when
+        ]
+        found = []
+        for _, seating, period in sorted(candidates, key=lambda c: c[:2]):
+            if self._fits(occupancy, period, seating, covers):
+                found.append(seating)
+                if len(found) == limit:
+                    break
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "restaurants": len(self._services),
+            "days_loaded": len(self._days),
+            "checks": self.checks,
+            "unavailable": self.full,
+            "day_loads": self.day_loads,
+            "updates": self.updates,
+        }
+
+
+index = AvailabilityIndex()
+add_reservation_listener(index.apply)
+
+
+def _day_params(restaurant_id: int, day: date) -> Dict[str, Any]:
+    start = datetime.combine(day, time.min)
+    return {"rid": restaurant_id, "is_default": restaurant_id == DEFAULT_RESTAURANT_ID,
+            "start": start, "end": start + timedelta(days=1)}
+
+
+async def load_services() -> None:
+    from models.aio.service_periods import list_service_periods
+
+    index.set_services(ServicePeriod.from_row(row) for row in await list_service_periods())
+
+
+async def warm(horizon_days: int = HORIZON_DAYS) -> None:
+    """Load services and the next ``horizon_days`` of every restaurant in one query."""
+    await load_services()
+    today = datetime.utcnow().date()
+    start = datetime.combine(today, time.min)
+    rows_by_day: Dict[Tuple[int, date], List[Tuple[int, datetime, int]]] = {}
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(HORIZON_ROWS_SQL, {"default_rid": DEFAULT_RESTAURANT_ID, "start": start,
+                                             "end": start + timedelta(days=horizon_days)})
+        for restaurant_id, reservation_id, when, covers in await cur.fetchall():
+            rows_by_day.setdefault((restaurant_id, when.date()), []).append((reservation_id, when, covers))
+    for restaurant_id in index.restaurants():
+        for offset in range(horizon_days):
+            day = today + timedelta(days=offset)
+            index.build_day(restaurant_id, day, rows_by_day.get((restaurant_id, day), ()))
+    logger.info(f"Availability index warmed: {index.stats()}")
+
+
+async def _ensure_day(restaurant_id: int, day: date) -> None:
+    if not index.services_fresh():
+        await load_services()
+    if index.is_fresh(restaurant_id, day):
+        return
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        await cur.execute(DAY_ROWS_SQL, _day_params(restaurant_id, day))
+        rows = await cur.fetchall()
+    index.build_day(restaurant_id, day, [(r[0], r[2], r[3]) for r in rows])
+
+
+def _format(result: Dict[str, Any]) -> Dict[str, Any]:
+    result["alternatives"] = [alt.strftime("%Y-%m-%d %H:%M") for alt in result["alternatives"]]
+    return result
+
+
+async def check_availability(date_str: str, time_str: str, covers: int,
+                             restaurant_id: Optional[int] = None) -> Dict[str, Any]:
+    """``{"available", "reason", "alternatives"}`` for a party at ``YYYY-MM-DD`` ``HH:MM``."""
+    when = parse_reservation_time(date_str, time_str)
+    restaurant_id = restaurant_id or DEFAULT_RESTAURANT_ID
+    if not index.services_fresh():
+        await load_services()
+    if not index.has_services(restaurant_id):
+        # no capacity configured for this restaurant: nothing to check against
+        return {"available": True, "reason": None, "alternatives": []}
+    await _ensure_day(restaurant_id, when.date())
+    return _format(index.check(restaurant_id, when, covers))
+
+
+async def book_reservation(client_id: int, date: str, time: str, covers: int,
+                           restaurant_id: Optional[int] = None, **details: Any) -> Dict[str, Any]:
+    """Create or change a reservation only if the service has room for it.
+
+    ``details`` are the ``build_notes_json`` fields. Returns
+    ``{"booked": True, "reservation_id", "reservation_time"}`` or
+    ``{"booked": False, "reason", "alternatives"}``. Restaurants without any
+    active service period are booked unchecked, as before availability existed.
+    """
+    when = parse_reservation_time(date, time)
+    rid = restaurant_id or DEFAULT_RESTAURANT_ID
+    day = when.date()
+    async with async_connect() as conn:
+        cur = conn.cursor()
+        # serializes bookings for this restaurant-day across every worker and process
+        await cur.execute("SELECT pg_advisory_xact_lock(%s, %s)", (rid, day.toordinal()))
+        # read under the lock, so a service set up or changed since the last load applies now
+        await cur.execute(LIST_SERVICE_PERIODS_SQL, {"rid": rid})
+        index.set_services((ServicePeriod.from_row(row) for row in await cur.fetchall()), rid)
+        if index.has_services(rid):
+            await cur.execute(DAY_ROWS_SQL, _day_params(rid, day))
+            rows = await cur.fetchall()
+            index.build_day(rid, day, [(r[0], r[2], r[3]) for r in rows])
+            # changing an existing booking: its own covers don't count against it
+            own = next((r[0] for r in rows if r[1] == client_id and r[2] == when), None)
+            result = index.check(rid, when, covers, ignore=own)
+            if not result["available"]:
+                return dict(_format(result), booked=False)
+        # the default restaurant is stored as NULL: there may be no Restaurants row for it
+        await cur.execute(
+            UPSERT_RESERVATION_SQL,
+            (client_id, when, covers, json.dumps(build_notes_json(**details)), restaurant_id),
+        )
+        reservation_id, saved_restaurant_id = await cur.fetchone()
+    guest_cache.invalidate_client(client_id)
+    notify_reservation_saved({
+        "reservation_id": reservation_id, "client_id": client_id, "restaurant_id": saved_restaurant_id,
+        "reservation_time": when, "covers": covers,
+    })
+    return {"booked": True, "reservation_id": reservation_id,
+            "reservation_time": when.strftime("%Y-%m-%d %H:%M")}
@@ -0,0 +1,123 @@
+"""Per-sender message coalescing (debounce) in front of the model.
+
+"hi" / "table for 4" / "tomorrow 8pm" sent within a few seconds become one
+merged message, so one completion and one reply. A sender's burst is flushed
+once nothing new has arrived for DEBOUNCE_WINDOW seconds, or at the latest
+DEBOUNCE_MAX_WAIT seconds after its first message.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils import config, logger
+
+DEBOUNCE_WINDOW = float(config("DEBOUNCE_WINDOW", default=0))  # 0 disables coalescing
+DEBOUNCE_MAX_WAIT = float(config("DEBOUNCE_MAX_WAIT", default=5))
+
+# flush(sender, merged_text, conversation_id of the burst's last message,
+#       conversation_ids claimed by its earlier messages)
+Flush = Callable[[str, str, Optional[int], List[int]], Awaitable[Any]]
+
+
+class _Burst:
+    __slots__ = ("texts", "conversation_ids", "first_at", "timer")
+
+    def __init__(self) -> None:
+        self.texts: List[str] = []
+        self.conversation_ids: List[int] = []
+        self.first_at = time.monotonic()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MessageCoalescer:
+    def __init__(self, flush: Flush, window: float = DEBOUNCE_WINDOW,
+                 max_wait: float = DEBOUNCE_MAX_WAIT):
+        self.flush = flush
+        self.window = window
+        self.max_wait = max_wait
+        self._bursts: Dict[str, _Burst] = {}
+        # one flush at a time per sender so merged batches keep their order
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # flushes holding or waiting for each lock; a woken waiter hasn't
+        # acquired it yet, so lock.locked() alone can't tell when it's free to drop
+        self._lock_users: Dict[str, int] = {}
+        self._tasks: set = set()
+        self.messages_in = 0
+        self.batches_out = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def add(self, sender: str, text: str, conversation_id: Optional[int] = None) -> None:
+        """Add a message to the sender's burst and (re)arm its flush timer."""
+        self.messages_in += 1
+        burst = self._bursts.get(sender)
+        if burst is None:
+            burst = self._bursts[sender] = _Burst()
+        burst.texts.append(text)
+        if conversation_id is not None:
+            burst.conversation_ids.append(conversation_id)
+        if burst.timer is not None:
+            burst.timer.cancel()
+        remaining = burst.first_at + self.max_wait - time.monotonic()
+        delay = max(0.0, min(self.window, remaining))
+        burst.timer = asyncio.get_running_loop().call_later(delay, self._fire, sender)
+
+    def _fire(self, sender: str) -> None:
+        burst = self._bursts.pop(sender, None)
+        if burst is None:
+            return
+        ids = burst.conversation_ids
+        task = asyncio.create_task(
+            self._flush(sender, "\n".join(burst.texts), ids[-1] if ids else None, ids[:-1])
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, sender: str, text: str, conversation_id: Optional[int],
+                     superseded: List[int]) -> None:
+        lock = self._locks.setdefault(sender, asyncio.Lock())
+        self._lock_users[sender] = self._lock_users.get(sender, 0) + 1
+        try:
+            async with lock:
+                self.batches_out += 1
+                await self.flush(sender, text, conversation_id, superseded)
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Failed to process coalesced messages from {sender}: {e}")
+        finally:
+            self._lock_users[sender] -= 1
+            if not self._lock_users[sender]:
+                del self._lock_users[sender]
+                self._locks.pop(sender, None)
+
+    async def flush_all(self) -> None:
+        """Flush every pending burst now and wait for them (used on shutdown)."""
+        for sender, burst in list(self._bursts.items()):
+            if burst.timer is not None:
+                burst.timer.cancel()
+            self._fire(sender)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_s": self.window,
+            "pending_senders": len(self._bursts),
+            "messages_in": self.messages_in,
+            "batches_out": self.batches_out,
+            "completions_saved": max(0, self.messages_in - self.batches_out - sum(
+                len(b.texts) for b in self._bursts.values())),
+        }
+
+
+_coalescer: Optional[MessageCoalescer] = None
+
+
+def get_coalescer(flush: Optional[Flush] = None) -> Optional[MessageCoalescer]:
+    """Return the process-wide coalescer, creating it with ``flush`` on first call."""
+    global _coalescer
+    if _coalescer is None and flush is not None:
+        _coalescer = MessageCoalescer(flush)
+    return _coalescer
@@ -0,0 +1,141 @@
+"""Idempotent webhook handling keyed on Twilio's MessageSid.
+
+Twilio retries /message when we are slow, and each retry carries the same
+MessageSid. The first delivery *claims* the SID by inserting its
+``conversations`` row up front, together with a ``conversation_sids`` row
+keyed on the SID, so a retry that
+lands on any worker fails the insert and is answered with the recorded
+outcome instead of running the model again. A bounded in-memory map of recent
+SIDs answers most retries without touching the database.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from utils import config
+
+DEDUPE_RECENT_SIDS = int(config("DEDUPE_RECENT_SIDS", default=10000))
+DEDUPE_KEEP_DAYS = int(config("DEDUPE_KEEP_DAYS", default=7))
+
+PROCESSING = "processing"
+QUEUED = "queued"
+DONE = "ok"
+
+
+class RecentSids:
+    """LRU of MessageSid -> outcome ("processing" until the reply has been handed off)."""
+
+    def __init__(self, maxsize: int = DEDUPE_RECENT_SIDS):
+        self.maxsize = maxsize
+        self._outcomes: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def get(self, sid: str) -> Optional[str]:
+        with self._lock:
+            outcome = self._outcomes.get(sid)
+            if outcome is not None:
+                self._outcomes.move_to_end(sid)
+            return outcome
+
+    def set(self, sid: str, outcome: str) -> None:
+        with self._lock:
+            self._outcomes[sid] = outcome
+            self._outcomes.move_to_end(sid)
+            while len(self._outcomes) > self.maxsize:
+                self._outcomes.popitem(last=False)
+
+    def forget(self, sid: str) -> None:
+        with self._lock:
+            self._outcomes.pop(sid, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"recent": len(self._outcomes), "duplicates": self.duplicates}
+
+
+recent_sids = RecentSids()
+
+
+def claim_message(sender: str, message: str, message_sid: str) -> Optional[int]:
+    """Insert the inbound message's conversation row; ``None`` if the SID was already claimed.
+
+    Runs sync SQLAlchemy, so call it via run_in_threadpool.
+    """
+    from models.conversation import Conversation, ConversationSid, SessionLocal
+
+    db = SessionLocal()
+    try:
+        conversation = Conversation(sender=sender, message=message, message_sid=message_sid)
+        db.add(conversation)
+        db.flush()
+        db.add(ConversationSid(message_sid=message_sid, conversation_id=conversation.id))
+        db.commit()
+        return conversation.id
+    except IntegrityError:
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+
+def release_claim(conversation_id: Optional[int]) -> None:
+    """Delete a claimed row that will not be processed, so Twilio's retry can claim it."""
+    from models.conversation import ConversationSid, SessionLocal, get_recent_conversation
+
+    if conversation_id is None:
+        return
+    db = SessionLocal()
+    try:
+        conversation = get_recent_conversation(db, conversation_id)
+        if conversation is not None:
+            db.delete(conversation)
+        db.query(ConversationSid).filter(ConversationSid.conversation_id == conversation_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def merge_claims(conversation_id: Optional[int], superseded: List[int]) -> None:
+    """Fold the claimed rows of a debounced burst into the one that gets the reply.
+
+    The superseded rows would otherwise stay behind with no response; their
+    SIDs are pointed at ``conversation_id`` so Twilio retries stay deduplicated.
+    """
+    from models.conversation import Conversation, ConversationSid, SessionLocal, CLAIM_WINDOW
+
+    superseded = [cid for cid in superseded if cid != conversation_id]
+    if conversation_id is None or not superseded:
+        return
+    db = SessionLocal()
+    try:
+        db.query(ConversationSid).filter(ConversationSid.conversation_id.in_(superseded)).update(
+            {ConversationSid.conversation_id: conversation_id}, synchronize_session=False
+        )
+        db.query(Conversation).filter(
+            Conversation.id.in_(superseded),
+            Conversation.created_at >= datetime.utcnow() - CLAIM_WINDOW,
+        ).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def prune_claims(older_than: timedelta = timedelta(days=DEDUPE_KEEP_DAYS)) -> int:
+    """Delete SID claims Twilio can no longer retry; returns the number removed."""
+    from models.conversation import ConversationSid, SessionLocal
+
+    db = SessionLocal()
+    try:
+        removed = (
+            db.query(ConversationSid)
+            .filter(ConversationSid.created_at < datetime.utcnow() - older_than)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return removed
+    finally:
+        db.close()
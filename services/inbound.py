@@ -0,0 +1,121 @@
+"""Sender-partitioned worker pool for the fast-ack /message mode.
+
+Every inbound message is routed to the worker that owns ``hash(sender)``, so
+one guest's messages are handled strictly in order while different guests are
+processed in parallel. LLM parallelism is still capped separately by
+``services.llm.limiter``.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils import config, logger
+
+WEBHOOK_MODE = config("WEBHOOK_MODE", default="inline")  # "inline" or "fast_ack"
+INBOUND_WORKERS = int(config("INBOUND_WORKERS", default=16))
+INBOUND_QUEUE_SIZE = int(config("INBOUND_QUEUE_SIZE", default=200))  # per worker
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class PartitionFull(Exception):
+    """The sender's partition has no room; the webhook should ask Twilio to retry."""
+
+
+class SenderPartitionedPool:
+    def __init__(self, handler: Handler, workers: int = INBOUND_WORKERS,
+                 queue_size: int = INBOUND_QUEUE_SIZE):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+        self._lag_total = 0.0
+        self.lag_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Spawn the worker tasks (call from inside the event loop)."""
+        if self._tasks:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._run(q), name=f"inbound-{i}")
+            for i, q in enumerate(self._queues)
+        ]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Finish what is queued (up to ``timeout`` seconds), then stop the workers."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*(q.join() for q in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Inbound pool stopped with messages still queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, sender: str, *args: Any) -> None:
+        """Queue ``handler(sender, *args)`` on the sender's partition."""
+        q = self._queues[hash(sender) % len(self._queues)]
+        try:
+            q.put_nowait((time.monotonic(), sender, args))
+        except asyncio.QueueFull:
+            raise PartitionFull(sender) from None
+
+    async def put(self, sender: str, *args: Any) -> None:
+        """Like ``submit``, but wait for room on the sender's partition instead of raising.
+
+        For messages Twilio won't redeliver: waiting keeps them behind the
+        sender's earlier messages, where handling them inline would not.
+        """
+        q = self._queues[hash(sender) % len(self._queues)]
+        await q.put((time.monotonic(), sender, args))
+
+    async def _run(self, q: asyncio.Queue) -> None:
+        while True:
+            queued_at, sender, args = await q.get()
+            lag = time.monotonic() - queued_at
+            self._lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+            try:
+                await self.handler(sender, *args)
+                self.processed += 1
+            except Exception as e:  # noqa: BLE001 - one bad message must not kill the worker
+                self.failed += 1
+                logger.error(f"Inbound worker failed on message from {sender}: {e}")
+            finally:
+                q.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        depths = [q.qsize() for q in self._queues]
+        handled = self.processed + self.failed
+        return {
+            "mode": WEBHOOK_MODE,
+            "workers": len(self._tasks),
+            "queue_depth": sum(depths),
+            "max_partition_depth": max(depths, default=0),
+            "processed": self.processed,
+            "failed": self.failed,
+            "queue_lag_avg_ms": round(self._lag_total / handled * 1000, 2) if handled else 0.0,
+            "queue_lag_max_ms": round(self.lag_max * 1000, 2),
+        }
+
+
+_pool: Optional[SenderPartitionedPool] = None
+
+
+def get_pool(handler: Optional[Handler] = None) -> Optional[SenderPartitionedPool]:
+    """Return the process-wide pool, creating it with ``handler`` on first call."""
+    global _pool
+    if _pool is None and handler is not None:
+        _pool = SenderPartitionedPool(handler)
+    return _pool
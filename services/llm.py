@@ -0,0 +1,164 @@
+"""Async OpenAI access for the /message path with a bounded concurrency limiter."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from decouple import config
+from openai import AsyncOpenAI
+
+from services import metrics
+
+MODEL = config("OPENAI_MODEL", default="gpt-4o-mini")
+MAX_TOKENS = config("OPENAI_MAX_TOKENS", default=200, cast=int)
+TEMPERATURE = config("OPENAI_TEMPERATURE", default=0.5, cast=float)
+
+# Limiter settings: how many completions run at once, how many may wait for a
+# slot, and how long (seconds) a request waits before we answer "one moment".
+LLM_MAX_IN_FLIGHT = config("LLM_MAX_IN_FLIGHT", default=8, cast=int)
+LLM_MAX_QUEUE = config("LLM_MAX_QUEUE", default=64, cast=int)
+LLM_QUEUE_TIMEOUT = config("LLM_QUEUE_TIMEOUT", default=10.0, cast=float)
+
+BUSY_REPLY = (
+    "One moment please, we're helping a lot of guests right now. "
+    "We'll get back to you shortly."
+)
+
+
+class LimiterBusy(Exception):
+    """Raised when the queue is full or the wait for a slot timed out."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason  # "queue_full" or "timeout"
+
+
+class CompletionLimiter:
+    """Caps in-flight completions and the number of requests waiting for one.
+
+    Usage::
+
+        async with limiter.slot():
+            await client.chat.completions.create(...)
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._sem = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._wait_total = 0.0
+        self._wait_count = 0
+        self.wait_max = 0.0
+        self.last_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Wait for a free slot and yield how long the wait took (seconds)."""
+        if self._sem.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise LimiterBusy("queue_full")
+
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise LimiterBusy("timeout") from None
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self._wait_total += waited
+        self._wait_count += 1
+        self.wait_max = max(self.wait_max, waited)
+        self.last_wait = waited
+
+        self.in_flight += 1
+        try:
+            yield waited
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        avg = self._wait_total / self._wait_count if self._wait_count else 0.0
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_avg_ms": round(avg * 1000, 2),
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "wait_last_ms": round(self.last_wait * 1000, 2),
+        }
+
+
+limiter = CompletionLimiter(LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT)
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def record_usage(usage: Any) -> None:
+    """Add a completion's token usage to the metrics counters."""
+    if usage is None:
+        return
+    metrics.TOKENS.inc(usage.prompt_tokens or 0, kind="prompt")
+    metrics.TOKENS.inc(usage.completion_tokens or 0, kind="completion")
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client (created on first use)."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=config("OPENAI_API_KEY"))
+    return _client
+
+
+async def complete(messages: List[Dict[str, str]]) -> str:
+    """Run one chat completion through the limiter and return the reply text.
+
+    Raises ``LimiterBusy`` when no slot frees up in time; OpenAI errors are
+    left to the caller.
+    """
+    async with limiter.slot():
+        response = await get_client().chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
+        )
+    record_usage(response.usage)
+    return response.choices[0].message.content.strip()
+
+
+async def stream(messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    """Like ``complete`` but yields the reply text as it is generated.
+
+    The limiter slot is held until the stream is fully consumed.
+    """
+    async with limiter.slot():
+        response = await get_client().chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in response:
+            if chunk.usage is not None:
+                record_usage(chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
@@ -0,0 +1,135 @@
+"""Multi-turn conversation memory for the prompt.
+
+Recent (message, response) turns per sender are kept in a bounded in-memory
+ring buffer. On a miss (first message since the worker started, or the sender
+was evicted) they are loaded once from the ``conversations`` table, using the
+(sender, created_at) index. The turns are then trimmed, newest first, to a
+token budget before they go into the prompt.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from utils import config
+
+try:  # pragma: no cover - simple import guard
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:  # noqa: BLE001 - fall back to a rough estimate
+    _encoding = None
+
+MEMORY_TOKEN_BUDGET = int(config("MEMORY_TOKEN_BUDGET", default=800))
+MEMORY_MAX_TURNS = int(config("MEMORY_MAX_TURNS", default=10))
+MEMORY_MAX_SENDERS = int(config("MEMORY_MAX_SENDERS", default=5000))
+MEMORY_MAX_AGE_HOURS = int(config("MEMORY_MAX_AGE_HOURS", default=72))
+
+Turn = Tuple[str, str]  # (guest message, bot response)
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise ~4 characters per token."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def trim_to_budget(turns: List[Turn], budget: int = MEMORY_TOKEN_BUDGET) -> List[Dict[str, str]]:
+    """Keep the newest turns that fit in ``budget`` tokens, returned oldest first as chat messages."""
+    kept: List[Turn] = []
+    used = 0
+    for message, response in reversed(turns):
+        cost = count_tokens(message) + count_tokens(response)
+        if used + cost > budget:
+            break
+        kept.append((message, response))
+        used += cost
+
+    messages: List[Dict[str, str]] = []
+    for message, response in reversed(kept):
+        messages.append({"role": "user", "content": message})
+        messages.append({"role": "assistant", "content": response})
+    return messages
+
+
+def load_recent_turns(sender: str, limit: int = MEMORY_MAX_TURNS) -> List[Turn]:
+    """Read the sender's last ``limit`` turns (oldest first) from ``conversations``."""
+    from models.conversation import Conversation, SessionLocal
+
+    since = datetime.utcnow() - timedelta(hours=MEMORY_MAX_AGE_HOURS)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Conversation.message, Conversation.response)
+            .filter(
+                Conversation.sender == sender,
+                Conversation.created_at >= since,
+                # rows claimed by the webhook but not answered yet (the current
+                # message, or earlier parts of a merged burst) are not turns
+                Conversation.response.isnot(None),
+            )
+            .order_by(Conversation.created_at.desc(), Conversation.id.desc())
+            .limit(limit)
+            .all()
+        )
+    finally:
+        db.close()
+    return [(m or "", r or "") for m, r in reversed(rows)]
+
+
+class ConversationMemory:
+    """LRU of per-sender ring buffers, filled lazily from the database."""
+
+    def __init__(self, max_senders: int = MEMORY_MAX_SENDERS, max_turns: int = MEMORY_MAX_TURNS):
+        self.max_senders = max_senders
+        self.max_turns = max_turns
+        self._buffers: "OrderedDict[str, Deque[Turn]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sender: str) -> Optional[List[Turn]]:
+        with self._lock:
+            buf = self._buffers.get(sender)
+            if buf is None:
+                self.misses += 1
+                return None
+            self._buffers.move_to_end(sender)
+            self.hits += 1
+            return list(buf)
+
+    def load(self, sender: str, turns: List[Turn]) -> None:
+        with self._lock:
+            self._buffers[sender] = deque(turns, maxlen=self.max_turns)
+            self._buffers.move_to_end(sender)
+            while len(self._buffers) > self.max_senders:
+                self._buffers.popitem(last=False)
+
+    def remember(self, sender: str, message: str, response: str) -> None:
+        """Append a turn, but only to a buffer already loaded from the DB.
+
+        A sender we have no buffer for gets the new row on the next DB load
+        anyway, and starting a buffer here would hide their older turns.
+        """
+        with self._lock:
+            buf = self._buffers.get(sender)
+            if buf is not None:
+                buf.append((message, response))
+
+    def stats(self) -> Dict[str, int]:
+        return {"senders": len(self._buffers), "hits": self.hits, "misses": self.misses}
+
+
+memory = ConversationMemory()
+
+
+async def history_messages(sender: str) -> List[Dict[str, str]]:
+    """Chat messages for the sender's recent turns, trimmed to the token budget."""
+    turns = memory.get(sender)
+    if turns is None:
+        turns = await run_in_threadpool(load_recent_turns, sender)
+        memory.load(sender, turns)
+    return trim_to_budget(turns)
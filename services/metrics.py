@@ -0,0 +1,132 @@
+"""Tiny in-process metrics registry rendered in Prometheus text format.
+
+Counters and histograms are thread-safe (the outbound workers observe from
+their own threads). ``span(stage)`` times one stage of the message pipeline
+into ``maitred_stage_seconds``.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', repr(bound))])} {cumulative}")
+                cumulative += counts[-1]
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {total[0]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+MESSAGES = Counter("maitred_messages_total", "Inbound /message requests")
+ERRORS = Counter("maitred_errors_total", "Errors in the message pipeline by type")
+RATE_LIMITS = Counter("maitred_openai_rate_limit_total", "OpenAI RateLimitError responses")
+TOKENS = Counter("maitred_openai_tokens_total", "OpenAI tokens used by kind")
+WEBHOOK_SECONDS = Histogram("maitred_webhook_seconds", "Time until /message answers Twilio")
+PIPELINE_SECONDS = Histogram("maitred_pipeline_seconds", "Time to fully handle one message")
+STAGE_SECONDS = Histogram("maitred_stage_seconds", "Time spent per pipeline stage")
+DELIVERY_SECONDS = Histogram("maitred_delivery_seconds", "Outbound enqueue-to-delivered latency")
+TWILIO_SEND_SECONDS = Histogram("maitred_twilio_send_seconds", "Latency of one Twilio API send")
+FIRST_SEGMENT_SECONDS = Histogram("maitred_first_segment_seconds", "Streaming: time to the first reply segment")
+
+REGISTRY = [MESSAGES, ERRORS, RATE_LIMITS, TOKENS,
+            WEBHOOK_SECONDS, PIPELINE_SECONDS, STAGE_SECONDS, DELIVERY_SECONDS,
+            TWILIO_SEND_SECONDS, FIRST_SEGMENT_SECONDS]
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """``with span("openai_completion"): ...`` records the block's duration."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def render_gauges(stats: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Expose numeric /stats values as gauges, e.g. maitred_llm_queue_depth."""
+    lines: List[str] = []
+    for subsystem, values in stats.items():
+        for key, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"maitred_{subsystem}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return lines
+
+
+def render(stats: Dict[str, Dict[str, Any]]) -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(render_gauges(stats))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,313 @@
+"""Outbound WhatsApp dispatch: an in-process send queue drained by worker threads.
+
+``utils.send_message`` enqueues here instead of calling Twilio inline. Each
+worker owns one partition of recipients (so replies to a guest keep their
+order), takes a token from the per-from-number bucket before every send, and
+retries 429/5xx responses with exponential backoff.
+
+When a partition is full the caller waits for room (up to
+OUTBOUND_ENQUEUE_TIMEOUT seconds) rather than sending around the queue, which
+would overtake that guest's queued messages. Async code therefore calls
+``send_message`` through a thread pool.
+"""
+
+import asyncio
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from services import metrics
+from utils import config, logger
+
+OUTBOUND_WORKERS = int(config("OUTBOUND_WORKERS", default=2))
+OUTBOUND_QUEUE_SIZE = int(config("OUTBOUND_QUEUE_SIZE", default=1000))  # per worker
+OUTBOUND_BATCH_SIZE = int(config("OUTBOUND_BATCH_SIZE", default=10))
+OUTBOUND_RATE = float(config("OUTBOUND_RATE", default=10))  # sends/second per from-number
+OUTBOUND_BURST = int(config("OUTBOUND_BURST", default=20))
+OUTBOUND_MAX_ATTEMPTS = int(config("OUTBOUND_MAX_ATTEMPTS", default=4))
+OUTBOUND_BACKOFF = float(config("OUTBOUND_BACKOFF", default=0.5))  # seconds, doubled per retry
+OUTBOUND_ENQUEUE_TIMEOUT = float(config("OUTBOUND_ENQUEUE_TIMEOUT", default=30))  # wait for room
+
+# transport(from_number, to_number, body) -> provider response; raises on failure
+Transport = Callable[[Optional[str], str, str], Any]
+
+
+class TokenBucket:
+    """Classic token bucket; ``reserve()`` returns how long to sleep before sending."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+@dataclass
+class OutboundMessage:
+    to_number: str
+    body: str
+    from_number: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+
+def is_retryable(exc: Exception) -> bool:
+    """429 and 5xx responses (and dropped connections) are worth retrying."""
+    status = getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+class OutboundDispatcher:
+    """Recipient-partitioned send queue with rate limiting, retries and latency stats."""
+
+    def __init__(
+        self,
+        transport: Transport,
+        workers: int = OUTBOUND_WORKERS,
+        queue_size: int = OUTBOUND_QUEUE_SIZE,
+        batch_size: int = OUTBOUND_BATCH_SIZE,
+        rate: float = OUTBOUND_RATE,
+        burst: int = OUTBOUND_BURST,
+        max_attempts: int = OUTBOUND_MAX_ATTEMPTS,
+        backoff: float = OUTBOUND_BACKOFF,
+        enqueue_timeout: float = OUTBOUND_ENQUEUE_TIMEOUT,
+    ):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.enqueue_timeout = enqueue_timeout
+        self._queues: List["queue.Queue[Optional[OutboundMessage]]"] = [
+            queue.Queue(maxsize=queue_size) for _ in range(max(1, workers))
+        ]
+        self._buckets: Dict[Optional[str], TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.overflowed = 0  # had to wait for room in their partition
+        self.dropped = 0
+        self._latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_last = 0.0
+
+    # -- producer side ---------------------------------------------------- #
+
+    def enqueue(self, to_number: str, body: str, from_number: Optional[str] = None) -> bool:
+        """Queue a message for delivery, blocking while its partition is full.
+
+        Returns ``False`` if there was still no room after ``enqueue_timeout``
+        seconds; the message is dropped then.
+        """
+        self.start()
+        msg = OutboundMessage(to_number=to_number, body=body, from_number=from_number)
+        q = self._queue_for(to_number)
+        try:
+            q.put_nowait(msg)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.overflowed += 1
+        logger.warning(f"Outbound queue full, waiting for room to queue message to {to_number}")
+        try:
+            q.put(msg, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            logger.error(f"Outbound queue still full after {self.enqueue_timeout:.0f}s, "
+                         f"dropped message to {to_number}")
+            return False
+        return True
+
+    def _queue_for(self, to_number: str) -> "queue.Queue[Optional[OutboundMessage]]":
+        return self._queues[hash(to_number) % len(self._queues)]
+
+    # -- lifecycle -------------------------------------------------------- #
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i, q in enumerate(self._queues):
+                t = threading.Thread(target=self._run, args=(q,), name=f"outbound-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Let the workers drain their queues, then stop them."""
+        if not self._threads:
+            return
+        for q in self._queues:
+            q.put(None)
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+        if hasattr(self.transport, "close"):
+            self.transport.close()
+
+    # -- worker side ------------------------------------------------------ #
+
+    def _bucket(self, from_number: Optional[str]) -> TokenBucket:
+        with self._buckets_lock:
+            bucket = self._buckets.get(from_number)
+            if bucket is None:
+                bucket = self._buckets[from_number] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def _run(self, q: "queue.Queue[Optional[OutboundMessage]]") -> None:
+        while True:
+            # pull a batch: block for the first message, then take what's ready
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [msg for msg in batch if msg is not None]
+            if hasattr(self.transport, "send_async"):
+                # async transport: the whole batch is in flight at once on its event loop
+                asyncio.run_coroutine_threadsafe(
+                    self._deliver_batch_async(batch), self.transport.loop
+                ).result()
+            else:
+                for msg in batch:
+                    self._deliver(msg)
+            if stop:
+                return
+
+    def _deliver(self, msg: OutboundMessage) -> None:
+        bucket = self._bucket(msg.from_number)
+        while True:
+            wait = bucket.reserve()
+            if wait:
+                time.sleep(wait)
+            msg.attempts += 1
+            try:
+                self.transport(msg.from_number, msg.to_number, msg.body)
+            except Exception as exc:  # noqa: BLE001
+                delay = self._retry_delay(msg, exc)
+                if delay is None:
+                    return
+                time.sleep(delay)
+                continue
+            self._record_sent(msg)
+            return
+
+    async def _deliver_batch_async(self, batch: List[OutboundMessage]) -> None:
+        # one sequential chain per recipient keeps each guest's messages in order
+        chains: Dict[str, List[OutboundMessage]] = {}
+        for msg in batch:
+            chains.setdefault(msg.to_number, []).append(msg)
+
+        async def run_chain(messages: List[OutboundMessage]) -> None:
+            for msg in messages:
+                await self._deliver_async(msg)
+
+        await asyncio.gather(*(run_chain(chain) for chain in chains.values()))
+
+    async def _deliver_async(self, msg: OutboundMessage) -> None:
+        bucket = self._bucket(msg.from_number)
+        while True:
+            wait = bucket.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            msg.attempts += 1
+            try:
+                await self.transport.send_async(msg.from_number, msg.to_number, msg.body)
+            except Exception as exc:  # noqa: BLE001
+                delay = self._retry_delay(msg, exc)
+                if delay is None:
+                    return
+                await asyncio.sleep(delay)
+                continue
+            self._record_sent(msg)
+            return
+
+    def _retry_delay(self, msg: OutboundMessage, exc: Exception) -> Optional[float]:
+        """Backoff before the next attempt, or ``None`` once the message has failed for good."""
+        if msg.attempts < self.max_attempts and is_retryable(exc):
+            delay = self.backoff * (2 ** (msg.attempts - 1)) * (1 + random.random() / 2)
+            with self._stats_lock:
+                self.retried += 1
+            logger.warning(f"Send to {msg.to_number} failed ({exc}), retry in {delay:.2f}s")
+            return delay
+        with self._stats_lock:
+            self.failed += 1
+        metrics.ERRORS.inc(type="outbound_delivery")
+        logger.error(f"Error sending message to {msg.to_number}: {exc}")
+        return None
+
+    def _record_sent(self, msg: OutboundMessage) -> None:
+        latency = time.monotonic() - msg.enqueued_at
+        metrics.DELIVERY_SECONDS.observe(latency)
+        with self._stats_lock:
+            self.sent += 1
+            self._latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.latency_last = latency
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            avg = self._latency_total / self.sent if self.sent else 0.0
+            return {
+                "queue_depth": sum(q.qsize() for q in self._queues),
+                "workers": len(self._threads),
+                "sent": self.sent,
+                "failed": self.failed,
+                "retried": self.retried,
+                "overflowed": self.overflowed,
+                "dropped": self.dropped,
+                "delivery_latency_avg_ms": round(avg * 1000, 2),
+                "delivery_latency_max_ms": round(self.latency_max * 1000, 2),
+                "delivery_latency_last_ms": round(self.latency_last * 1000, 2),
+            }
+
+
+_dispatcher: Optional[OutboundDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> OutboundDispatcher:
+    """Return the process-wide dispatcher.
+
+    It sends through the pooled Twilio transport when Twilio is configured and
+    through ``utils.deliver_message`` (which simulates) otherwise.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                from services.twilio_transport import get_transport
+                from utils import deliver_message
+                _dispatcher = OutboundDispatcher(get_transport() or deliver_message)
+    return _dispatcher
+
+
+def set_transport(transport: Transport) -> None:
+    """Swap the send function (e.g. ``utils.simulate_send``-style fakes in tests)."""
+    get_dispatcher().transport = transport
@@ -0,0 +1,269 @@
+"""Reservation reminders: a min-heap of due times fed incrementally.
+
+Only reminders due within the next REMINDER_HORIZON_HOURS are held in memory,
+as ``(due_at, reservation_id, offset_minutes)`` entries in a heap. The horizon
+is reloaded from ``Reservations`` every REMINDER_RELOAD_SECONDS (one range scan
+on idx_reservations_time) and every upsert in this process adds its reminders
+straight away through the reservation listener, so nothing ever scans the
+whole table.
+
+A reminder is due REMINDER_OFFSETS_MINUTES before the reservation (default a
+day and two hours before). Due reminders are claimed in batches by inserting
+into ``ReservationReminders`` before sending: a restart, a reload or a second
+worker never sends the same reminder twice, at the price of losing one if the
+process dies between the claim and the send. Reminders more than
+REMINDER_GRACE_MINUTES overdue (downtime, or a booking made after the due
+time) are dropped rather than sent late. Sends go through
+``utils.send_message`` at no more than REMINDER_RATE per second so a busy
+evening's reminders don't crowd out conversation replies.
+
+Reservation times are naive UTC, like ``models.reservations.upcoming_window``.
+"""
+
+import asyncio
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from database.connection import async_connect
+from models.reservations import add_reservation_listener
+from utils import config, logger, send_message
+
+REMINDER_OFFSETS_MINUTES = tuple(
+    int(m) for m in str(config("REMINDER_OFFSETS_MINUTES", default="1440,120")).split(",") if m.strip()
+)
+REMINDER_HORIZON_HOURS = float(config("REMINDER_HORIZON_HOURS", default=6))
+# keep below the grace period: reminders from other processes' writes are only seen on reload
+REMINDER_RELOAD_SECONDS = float(config("REMINDER_RELOAD_SECONDS", default=600))
+REMINDER_GRACE_MINUTES = int(config("REMINDER_GRACE_MINUTES", default=30))
+REMINDER_RATE = float(config("REMINDER_RATE", default=2))  # sends/second
+REMINDER_BATCH_SIZE = int(config("REMINDER_BATCH_SIZE", default=20))
+REMINDER_TEMPLATE = config(
+    "REMINDER_TEMPLATE",
+    default="Hi {first_name}, this is a reminder of your reservation for {covers} on {date} at {time}. "
+            "Reply to this message if your plans change.",
+)
+
+HORIZON_SQL = """
+    SELECT reservation_id, reservation_time FROM Reservations
+    WHERE reservation_time >= %s AND reservation_time < %s
+"""
+
+SENT_SQL = """
+    SELECT reservation_id, offset_minutes FROM ReservationReminders
+    WHERE reservation_id = ANY(%s)
+"""
+
+# claim first, then read what the message needs; claimed rows are the ones to send
+CLAIM_SQL = """
+    WITH due (reservation_id, offset_minutes) AS (
+        SELECT * FROM unnest(%(ids)s::int[], %(offsets)s::int[])
+    ),
+    claimed AS (
+        INSERT INTO ReservationReminders (reservation_id, offset_minutes)
+        SELECT d.reservation_id, d.offset_minutes
+        FROM due d JOIN Reservations r USING (reservation_id)
+        WHERE r.reservation_time > %(now)s
+        ON CONFLICT DO NOTHING
+        RETURNING reservation_id, offset_minutes
+    )
+    SELECT c.reservation_id, r.reservation_time, r.covers, cl.phone_number, cl.first_name, rs.name
+    FROM claimed c
+    JOIN Reservations r ON r.reservation_id = c.reservation_id
+    JOIN Clients cl ON cl.client_id = r.client_id
+    LEFT JOIN Restaurants rs ON rs.restaurant_id = r.restaurant_id
+"""
+
+Key = Tuple[int, int]  # (reservation_id, offset_minutes)
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        offsets: Sequence[int] = REMINDER_OFFSETS_MINUTES,
+        horizon_hours: float = REMINDER_HORIZON_HOURS,
+        reload_seconds: float = REMINDER_RELOAD_SECONDS,
+        grace_minutes: int = REMINDER_GRACE_MINUTES,
+        rate: float = REMINDER_RATE,
+        batch_size: int = REMINDER_BATCH_SIZE,
+    ):
+        self.offsets = tuple(sorted(set(offsets)))
+        self.horizon = timedelta(hours=horizon_hours)
+        self.reload_seconds = reload_seconds
+        self.grace = timedelta(minutes=grace_minutes)
+        self.rate = rate
+        self.batch_size = batch_size
+        self._heap: List[Tuple[datetime, int, int]] = []
+        self._due: Dict[Key, datetime] = {}  # live entries; heap entries not in here are stale
+        self._lock = threading.Lock()
+        self._horizon_end = datetime.min
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.loads = 0
+        self.sent = 0
+        self.already_sent = 0
+        self.too_late = 0
+        self.failed = 0
+
+    # -- scheduling ------------------------------------------------------- #
+
+    def schedule(self, reservation_id: int, reservation_time: datetime,
+                 now: Optional[datetime] = None, sent: Sequence[int] = ()) -> int:
+        """Queue the reminders of one reservation that fall due inside the horizon."""
+        now = now or datetime.utcnow()
+        added = 0
+        with self._lock:
+            earliest = self._heap[0][0] if self._heap else None
+            for offset in self.offsets:
+                due_at = reservation_time - timedelta(minutes=offset)
+                key = (reservation_id, offset)
+                if (offset in sent or reservation_time <= now or due_at < now - self.grace
+                        or due_at > self._horizon_end or self._due.get(key) == due_at):
+                    continue
+                self._due[key] = due_at
+                heapq.heappush(self._heap, (due_at, reservation_id, offset))
+                added += 1
+            moved_up = added and (earliest is None or self._heap[0][0] < earliest)
+        if moved_up:
+            self._wake_up()
+        return added
+
+    def apply(self, reservation: Dict[str, Any]) -> None:
+        """Reservation listener: schedule a saved reservation while the scheduler runs."""
+        if self._task is not None:
+            self.schedule(reservation["reservation_id"], reservation["reservation_time"])
+
+    async def load(self) -> int:
+        """(Re)load the reminders due between now - grace and now + horizon."""
+        now = datetime.utcnow()
+        with self._lock:
+            self._horizon_end = now + self.horizon
+        start = now - self.grace + timedelta(minutes=self.offsets[0])
+        end = now + self.horizon + timedelta(minutes=self.offsets[-1])
+        async with async_connect() as conn:
+            cur = conn.cursor()
+            await cur.execute(HORIZON_SQL, (start, end))
+            rows = await cur.fetchall()
+            sent: Dict[int, List[int]] = {}
+            if rows:
+                await cur.execute(SENT_SQL, ([r[0] for r in rows],))
+                for reservation_id, offset in await cur.fetchall():
+                    sent.setdefault(reservation_id, []).append(offset)
+        added = sum(self.schedule(rid, when, now, sent.get(rid, ())) for rid, when in rows)
+        self.loads += 1
+        return added
+
+    def _pop_due(self, now: datetime) -> List[Key]:
+        batch: List[Key] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                due_at, reservation_id, offset = heapq.heappop(self._heap)
+                key = (reservation_id, offset)
+                if self._due.get(key) != due_at:
+                    continue
+                del self._due[key]
+                if due_at < now - self.grace:
+                    self.too_late += 1
+                    continue
+                batch.append(key)
+        return batch
+
+    def _next_due(self) -> Optional[datetime]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    # -- sending ---------------------------------------------------------- #
+
+    async def _send_batch(self, batch: List[Key]) -> None:
+        async with async_connect() as conn:
+            cur = conn.cursor()
+            await cur.execute(CLAIM_SQL, {"ids": [k[0] for k in batch], "offsets": [k[1] for k in batch],
+                                          "now": datetime.utcnow()})
+            rows = await cur.fetchall()
+        self.already_sent += len(batch) - len(rows)
+        loop = asyncio.get_running_loop()
+        for reservation_id, when, covers, phone, first_name, restaurant in rows:
+            body = REMINDER_TEMPLATE.format(
+                first_name=first_name, covers=covers, date=when.strftime("%A %d %B"),
+                time=when.strftime("%H:%M"), restaurant=restaurant or "",
+            )
+            try:
+                if await loop.run_in_executor(None, send_message, phone, body):
+                    self.sent += 1
+                else:
+                    # send_message logged why (e.g. an invalid phone number)
+                    self.failed += 1
+            except Exception as e:  # noqa: BLE001
+                self.failed += 1
+                logger.error(f"Reminder for reservation {reservation_id} failed: {e}")
+            await asyncio.sleep(1 / self.rate)
+
+    async def _run(self) -> None:
+        next_reload = 0.0
+        while True:
+            try:
+                self._wake.clear()
+                if time.monotonic() >= next_reload:
+                    await self.load()
+                    next_reload = time.monotonic() + self.reload_seconds
+                batch = self._pop_due(datetime.utcnow())
+                if batch:
+                    await self._send_batch(batch)
+                    continue
+                timeout = next_reload - time.monotonic()
+                next_due = self._next_due()
+                if next_due is not None:
+                    timeout = min(timeout, (next_due - datetime.utcnow()).total_seconds())
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max(timeout, 0.01))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Reminder scheduler error: {e}")
+                await asyncio.sleep(5)
+
+    def _wake_up(self) -> None:
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    # -- lifecycle -------------------------------------------------------- #
+
+    def start(self) -> None:
+        """Start the scheduler task on the running event loop (no-op without offsets)."""
+        if self._task is not None or not self.offsets:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._due)
+        return {
+            "running": self._task is not None,
+            "pending": pending,
+            "loads": self.loads,
+            "sent": self.sent,
+            "already_sent": self.already_sent,
+            "too_late": self.too_late,
+            "failed": self.failed,
+        }
+
+
+scheduler = ReminderScheduler()
+add_reservation_listener(scheduler.apply)
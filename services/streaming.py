@@ -0,0 +1,95 @@
+"""Streaming replies: send the completion in sentence-sized WhatsApp messages.
+
+The OpenAI stream is cut at sentence/paragraph boundaries once a segment is
+at least STREAM_MIN_SEGMENT characters long. No segment is ever longer than
+WHATSAPP_MAX_CHARS; overlong text is split at the last space before the limit.
+"""
+
+import re
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from services import llm, metrics
+from utils import config
+
+STREAM_REPLIES = str(config("STREAM_REPLIES", default="0")).lower() in ("1", "true", "yes")
+STREAM_MIN_SEGMENT = int(config("STREAM_MIN_SEGMENT", default=80))
+WHATSAPP_MAX_CHARS = int(config("WHATSAPP_MAX_CHARS", default=1600))
+# sent instead of the error reply when the stream fails after segments went out
+INTERRUPTED_REPLY = config(
+    "STREAM_INTERRUPTED_REPLY", default="Sorry, I got cut off there. Could you ask me again?"
+)
+
+# end of a sentence followed by whitespace, or a line break
+_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+
+class SentenceSegmenter:
+    def __init__(self, min_chars: int = STREAM_MIN_SEGMENT, max_chars: int = WHATSAPP_MAX_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Add streamed text and return the segments that are ready to send."""
+        self._buffer += delta
+        ready: List[str] = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:].lstrip()
+            if segment:
+                ready.append(segment)
+        return ready
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended."""
+        rest, self._buffer = self._buffer.strip(), ""
+        segments = []
+        while len(rest) > self.max_chars:
+            cut = rest.rfind(" ", 0, self.max_chars)
+            cut = cut if cut > 0 else self.max_chars
+            segments.append(rest[:cut].strip())
+            rest = rest[cut:].strip()
+        if rest:
+            segments.append(rest)
+        return segments
+
+    def _find_cut(self):
+        # last boundary that keeps the segment within the WhatsApp limit
+        best = None
+        for match in _BOUNDARY.finditer(self._buffer):
+            if match.start() > self.max_chars:
+                break
+            if match.start() >= self.min_chars:
+                best = match.end()
+        if best is not None:
+            return best
+        if len(self._buffer) > self.max_chars:
+            cut = self._buffer.rfind(" ", 0, self.max_chars)
+            return cut if cut > 0 else self.max_chars
+        return None
+
+
+async def stream_reply(messages: List[Dict[str, str]], send: Callable[[str], Awaitable[None]]) -> str:
+    """Stream a completion, ``send`` each segment as soon as it is complete, return the full text."""
+    segmenter = SentenceSegmenter()
+    parts: List[str] = []
+    start = time.perf_counter()
+    first = True
+
+    async def emit(segment: str) -> None:
+        nonlocal first
+        if first:
+            metrics.FIRST_SEGMENT_SECONDS.observe(time.perf_counter() - start)
+            first = False
+        await send(segment)
+
+    async for delta in llm.stream(messages):
+        parts.append(delta)
+        for segment in segmenter.feed(delta):
+            await emit(segment)
+    for segment in segmenter.flush():
+        await emit(segment)
+    return "".join(parts).strip()
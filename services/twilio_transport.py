@@ -0,0 +1,160 @@
+"""Pooled keep-alive HTTP transports for Twilio sends.
+
+* ``SyncTwilioTransport``: one ``twilio.rest.Client`` whose requests.Session
+  keeps up to TWILIO_POOL_SIZE connections alive, shared by the outbound
+  worker threads.
+* ``AsyncTwilioTransport`` (TWILIO_ASYNC=1): aiohttp-based
+  ``AsyncTwilioHttpClient`` on a dedicated event loop thread. The outbound
+  workers then keep a whole batch of sends in flight instead of one per thread.
+
+Both record per-send latency (``maitred_twilio_send_seconds`` and ``stats()``).
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from services import metrics
+from utils import account_sid, auth_token, config, logger, twilio_number
+
+try:  # pragma: no cover - simple import guard
+    from requests.adapters import HTTPAdapter
+    from twilio.http.http_client import TwilioHttpClient
+    from twilio.rest import Client
+except Exception:  # noqa: BLE001
+    Client = None  # type: ignore[assignment]
+
+TWILIO_ASYNC = str(config("TWILIO_ASYNC", default="0")).lower() in ("1", "true", "yes")
+TWILIO_POOL_SIZE = int(config("TWILIO_POOL_SIZE", default=20))
+TWILIO_TIMEOUT = float(config("TWILIO_TIMEOUT", default=10))  # seconds per request
+TWILIO_MAX_RETRIES = int(config("TWILIO_MAX_RETRIES", default=0))  # outbound queue retries already
+
+
+class _SendStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.sends = 0
+        self.errors = 0
+        self._total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float, ok: bool) -> None:
+        metrics.TWILIO_SEND_SECONDS.observe(seconds, outcome="ok" if ok else "error")
+        with self._lock:
+            self.sends += 1
+            self.errors += 0 if ok else 1
+            self._total += seconds
+            self.max = max(self.max, seconds)
+
+    def as_dict(self, kind: str) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "async": kind == "async",
+                "pool_size": TWILIO_POOL_SIZE,
+                "sends": self.sends,
+                "errors": self.errors,
+                "send_latency_avg_ms": round(self._total / self.sends * 1000, 2) if self.sends else 0.0,
+                "send_latency_max_ms": round(self.max * 1000, 2),
+            }
+
+
+class SyncTwilioTransport:
+    def __init__(self, pool_size: int = TWILIO_POOL_SIZE, timeout: float = TWILIO_TIMEOUT):
+        http_client = TwilioHttpClient(pool_connections=True, timeout=timeout,
+                                       max_retries=TWILIO_MAX_RETRIES)
+        # default adapter keeps 10 sockets; size it to the number of concurrent senders
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        http_client.session.mount("https://", adapter)
+        self.client = Client(account_sid, auth_token, http_client=http_client)
+        self._stats = _SendStats()
+
+    def __call__(self, from_number: Optional[str], to_number: str, body: str) -> Any:
+        start = time.perf_counter()
+        ok = False
+        try:
+            message = self.client.messages.create(
+                from_=f"whatsapp:{from_number or twilio_number}",
+                body=body,
+                to=f"whatsapp:{to_number}",
+            )
+            ok = True
+            logger.info(f"Message sent to {to_number}: {message.sid}")
+            return message
+        finally:
+            self._stats.record(time.perf_counter() - start, ok)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats.as_dict("sync")
+
+
+class AsyncTwilioTransport:
+    def __init__(self, pool_size: int = TWILIO_POOL_SIZE, timeout: float = TWILIO_TIMEOUT):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="twilio-async", daemon=True)
+        self._thread.start()
+        # the semaphore and the aiohttp session must be created on the loop that uses them
+        self._slots, self.client = asyncio.run_coroutine_threadsafe(
+            self._setup(pool_size, timeout), self.loop
+        ).result()
+        self._stats = _SendStats()
+
+    @staticmethod
+    async def _setup(pool_size: int, timeout: float) -> Tuple[asyncio.Semaphore, Any]:
+        from twilio.http.async_http_client import AsyncTwilioHttpClient
+
+        http_client = AsyncTwilioHttpClient(pool_connections=True, timeout=timeout,
+                                            max_retries=TWILIO_MAX_RETRIES)
+        # caps concurrent sends to the keep-alive pool size
+        return asyncio.Semaphore(pool_size), Client(account_sid, auth_token, http_client=http_client)
+
+    async def send_async(self, from_number: Optional[str], to_number: str, body: str) -> Any:
+        async with self._slots:
+            start = time.perf_counter()
+            ok = False
+            try:
+                message = await self.client.messages.create_async(
+                    from_=f"whatsapp:{from_number or twilio_number}",
+                    body=body,
+                    to=f"whatsapp:{to_number}",
+                )
+                ok = True
+                logger.info(f"Message sent to {to_number}: {message.sid}")
+                return message
+            finally:
+                self._stats.record(time.perf_counter() - start, ok)
+
+    def __call__(self, from_number: Optional[str], to_number: str, body: str) -> Any:
+        # blocking form for callers outside the outbound workers
+        return asyncio.run_coroutine_threadsafe(
+            self.send_async(from_number, to_number, body), self.loop
+        ).result()
+
+    def close(self) -> None:
+        http_client = self.client.http_client
+        if hasattr(http_client, "close"):
+            asyncio.run_coroutine_threadsafe(http_client.close(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats.as_dict("async")
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Shared transport for the configured mode, or ``None`` when Twilio isn't set up."""
+    global _transport
+    if Client is None or not (account_sid and auth_token and twilio_number):
+        return None
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = AsyncTwilioTransport() if TWILIO_ASYNC else SyncTwilioTransport()
+    return _transport
+
+
+def transport_stats() -> Dict[str, Any]:
+    return _transport.stats() if _transport is not None else {}
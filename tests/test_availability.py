@@ -0,0 +1,202 @@
+"""Tests for the in-memory availability index (services/availability.py).
+
+Nothing here touches the database: days are built from rows passed in.
+"""
+
+from datetime import datetime, time, timedelta
+
+import pytest
+
+pytest.importorskip("psycopg")
+
+from services.availability import (  # noqa: E402
+    AVAILABILITY_TTL,
+    SLOT_MINUTES,
+    SLOTS_PER_DAY,
+    AvailabilityIndex,
+    DayOccupancy,
+    ServicePeriod,
+    slot_count,
+    slot_of,
+)
+
+RID = 1
+EVERY_DAY = frozenset(range(7))
+DAY = datetime.utcnow().date() + timedelta(days=1)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(DAY, time(hour, minute))
+
+
+def dinner(**overrides) -> ServicePeriod:
+    fields = dict(service_id=1, restaurant_id=RID, name="dinner", weekdays=EVERY_DAY,
+                  first_seating=time(18, 0), last_seating=time(22, 0),
+                  turn_minutes=120, max_covers=10, max_party=6)
+    fields.update(overrides)
+    return ServicePeriod(**fields)
+
+
+def make_index(rows=(), *periods: ServicePeriod) -> AvailabilityIndex:
+    index = AvailabilityIndex()
+    index.set_services(periods or (dinner(),))
+    index.build_day(RID, DAY, rows)
+    return index
+
+
+# -- DayOccupancy ---------------------------------------------------------- #
+
+def test_add_and_remove_update_every_slot_of_the_turn():
+    occupancy = DayOccupancy()
+    start, length = slot_of(at(20)), slot_count(120)
+    occupancy.add(7, start, length, 4)
+    assert occupancy.covers[start - 1] == 0
+    assert occupancy.covers[start:start + length] == [4] * length
+    assert occupancy.covers[start + length] == 0
+    occupancy.remove(7)
+    assert occupancy.covers == [0] * SLOTS_PER_DAY
+    assert occupancy.entries == {}
+
+
+def test_add_again_moves_the_reservation():
+    occupancy = DayOccupancy()
+    occupancy.add(7, slot_of(at(18)), slot_count(120), 4)
+    occupancy.add(7, slot_of(at(21)), slot_count(120), 2)
+    assert occupancy.peak(slot_of(at(18)), slot_count(120)) == 0
+    assert occupancy.peak(slot_of(at(21)), slot_count(120)) == 2
+
+
+def test_turn_past_midnight_is_clamped():
+    occupancy = DayOccupancy()
+    start = slot_of(at(23, 30))
+    occupancy.add(7, start, slot_count(120), 3)
+    assert occupancy.covers[start:] == [3] * (SLOTS_PER_DAY - start)
+    assert occupancy.peak(start, slot_count(120)) == 3
+    occupancy.remove(7)
+    assert occupancy.covers == [0] * SLOTS_PER_DAY
+
+
+def test_peak_ignores_only_the_given_reservation():
+    occupancy = DayOccupancy()
+    occupancy.add(1, slot_of(at(19)), slot_count(120), 4)
+    occupancy.add(2, slot_of(at(20)), slot_count(120), 3)
+    window = (slot_of(at(19)), slot_count(180))
+    assert occupancy.peak(*window) == 7
+    assert occupancy.peak(*window, ignore=1) == 3
+    assert occupancy.peak(*window, ignore=2) == 4
+    assert occupancy.peak(*window, ignore=99) == 7
+
+
+# -- check ----------------------------------------------------------------- #
+
+def test_check_available():
+    index = make_index([(1, at(20), 4)])
+    assert index.check(RID, at(20), 6) == {"available": True, "reason": None, "alternatives": []}
+
+
+def test_check_closed_outside_every_service():
+    result = make_index().check(RID, at(12), 2)
+    assert result["available"] is False
+    assert result["reason"] == "closed"
+
+
+def test_check_party_too_large():
+    result = make_index().check(RID, at(20), 7)
+    assert result["reason"] == "party_too_large"
+    assert result["alternatives"] == []
+
+
+def test_check_full_counts_overlapping_turns():
+    # 18:30 for 6 is still seated at 20:00
+    index = make_index([(1, at(18, 30), 6)])
+    assert index.check(RID, at(20), 5)["reason"] == "full"
+    assert index.check(RID, at(20), 4)["available"] is True
+    assert index.check(RID, at(20, 30), 6)["available"] is True
+
+
+def test_check_ignore_lets_a_booking_change_its_own_party_size():
+    index = make_index([(1, at(20), 6), (2, at(20), 4)])
+    assert index.check(RID, at(20), 6)["reason"] == "full"
+    assert index.check(RID, at(20), 6, ignore=1)["available"] is True
+    assert index.check(RID, at(20), 6, ignore=2)["reason"] == "full"
+
+
+def test_check_needs_the_day_loaded():
+    with pytest.raises(LookupError):
+        make_index().check(RID, at(20) + timedelta(days=1), 2)
+
+
+# -- alternatives ---------------------------------------------------------- #
+
+def test_alternatives_are_the_nearest_times_that_fit():
+    # 19:45 for 10 fills 19:45-21:45; nothing before 18:00 is a seating
+    index = make_index([(1, at(19, 45), 10)])
+    result = index.check(RID, at(20), 2)
+    assert result["reason"] == "full"
+    assert result["alternatives"] == [at(21, 45), at(22)]
+
+
+def test_alternatives_skip_the_requested_time_and_respect_the_limit():
+    index = make_index([(1, at(20), 10)], dinner(last_seating=time(23)))
+    alternatives = index._alternatives(RID, index._days[(RID, DAY)], at(20), 2, limit=2)
+    # equally far apart: earlier first
+    assert alternatives == [at(18), at(22)]
+
+
+def test_alternatives_leave_out_services_the_party_is_too_large_for():
+    lunch = dinner(service_id=2, name="lunch", first_seating=time(12), last_seating=time(14),
+                   max_party=2)
+    index = make_index([(1, at(20), 10)], dinner(), lunch)
+    assert index.check(RID, at(20), 4)["alternatives"] == [at(18), at(22)]
+    assert index.check(RID, at(20), 2)["alternatives"][0] == at(18)
+
+
+def test_alternatives_near_midnight():
+    late = dinner(first_seating=time(22), last_seating=time(23, 45), turn_minutes=60, max_covers=4)
+    index = make_index([(1, at(22), 4)], late)
+    result = index.check(RID, at(22), 2)
+    assert result["reason"] == "full"
+    assert result["alternatives"] == [at(23), at(23, 15), at(23, 30)]
+    # a turn running past midnight only counts until the end of the day
+    assert index.check(RID, at(23, 45), 4)["available"] is True
+
+
+# -- build_day ------------------------------------------------------------- #
+
+def test_build_day_purges_days_before_yesterday_utc():
+    index = make_index()
+    today = datetime.utcnow().date()
+    index.build_day(RID, today - timedelta(days=1), ())
+    index.build_day(RID, today - timedelta(days=2), ())
+    index.build_day(RID, today, ())
+    assert (RID, today - timedelta(days=2)) not in index._days
+    assert (RID, today - timedelta(days=1)) in index._days
+    assert (RID, DAY) in index._days
+
+
+def test_slot_length_follows_the_service_turn():
+    index = make_index([(1, at(20), 4)], dinner(turn_minutes=60))
+    assert index._days[(RID, DAY)].entries[1] == (slot_of(at(20)), 60 // SLOT_MINUTES, 4)
+
+
+# -- services -------------------------------------------------------------- #
+
+def test_set_services_for_one_restaurant_keeps_the_others():
+    index = make_index((), dinner(), dinner(service_id=2, restaurant_id=2))
+    index.set_services([dinner(service_id=3, max_covers=4)], RID)
+    assert index.service_for(RID, at(20)).max_covers == 4
+    assert index.has_services(2)
+    index.set_services([], RID)
+    assert not index.has_services(RID)
+    assert index.has_services(2)
+
+
+def test_services_go_stale_after_the_ttl():
+    index = AvailabilityIndex()
+    assert not index.services_fresh()
+    index.set_services([dinner()])
+    assert index.services_fresh()
+    # a restaurant-only refresh doesn't count as a full load
+    index.services_loaded_at -= AVAILABILITY_TTL + 1
+    index.set_services([dinner()], RID)
+    assert not index.services_fresh()
@@ -0,0 +1,151 @@
+"""Tests for per-sender coalescing (services/debounce.py) and the inbound pool's put.
+
+Each test drives its own event loop with ``asyncio.run``.
+"""
+
+import asyncio
+
+from services.debounce import MessageCoalescer
+from services.inbound import SenderPartitionedPool
+
+WINDOW = 0.02
+
+
+def make_coalescer(**kwargs):
+    flushed = []
+
+    async def flush(sender, text, conversation_id, superseded):
+        flushed.append((sender, text, conversation_id, superseded))
+
+    kwargs.setdefault("window", WINDOW)
+    return MessageCoalescer(flush, **kwargs), flushed
+
+
+# -- MessageCoalescer ------------------------------------------------------ #
+
+def test_burst_is_merged_and_earlier_claims_are_superseded():
+    async def scenario():
+        coalescer, flushed = make_coalescer()
+        coalescer.add("+1", "hi", 10)
+        coalescer.add("+1", "table for 4", 11)
+        coalescer.add("+1", "tomorrow 8pm", 12)
+        await asyncio.sleep(WINDOW * 5)
+        return coalescer, flushed
+
+    coalescer, flushed = asyncio.run(scenario())
+    assert flushed == [("+1", "hi\ntable for 4\ntomorrow 8pm", 12, [10, 11])]
+    assert coalescer.stats()["completions_saved"] == 2
+
+
+def test_messages_without_a_claim_are_merged_too():
+    async def scenario():
+        coalescer, flushed = make_coalescer()
+        coalescer.add("+1", "hi")
+        coalescer.add("+1", "there")
+        await asyncio.sleep(WINDOW * 5)
+        return flushed
+
+    assert asyncio.run(scenario()) == [("+1", "hi\nthere", None, [])]
+
+
+def test_senders_are_flushed_separately():
+    async def scenario():
+        coalescer, flushed = make_coalescer()
+        coalescer.add("+1", "a", 1)
+        coalescer.add("+2", "b", 2)
+        await asyncio.sleep(WINDOW * 5)
+        return flushed
+
+    assert sorted(asyncio.run(scenario())) == [("+1", "a", 1, []), ("+2", "b", 2, [])]
+
+
+def test_max_wait_caps_a_burst_that_keeps_going():
+    async def scenario():
+        coalescer, flushed = make_coalescer(window=1.0, max_wait=0.05)
+        coalescer.add("+1", "one", 1)
+        await asyncio.sleep(0.03)
+        coalescer.add("+1", "two", 2)  # would push the flush to ~1s without the cap
+        await asyncio.sleep(0.1)
+        return flushed
+
+    assert asyncio.run(scenario()) == [("+1", "one\ntwo", 2, [1])]
+
+
+def test_batches_from_one_sender_flush_in_order():
+    order = []
+
+    async def scenario():
+        first_started = asyncio.Event()
+
+        async def flush(sender, text, conversation_id, superseded):
+            if text == "first":
+                first_started.set()
+                await asyncio.sleep(WINDOW * 5)  # the second batch arrives meanwhile
+            order.append(text)
+
+        coalescer = MessageCoalescer(flush, window=WINDOW)
+        coalescer.add("+1", "first", 1)
+        await first_started.wait()
+        coalescer.add("+1", "second", 2)
+        await asyncio.sleep(WINDOW * 10)
+        return coalescer
+
+    coalescer = asyncio.run(scenario())
+    assert order == ["first", "second"]
+    # the per-sender lock goes away once no flush holds or waits for it
+    assert coalescer._locks == {} and coalescer._lock_users == {}
+
+
+def test_a_failing_flush_does_not_leak_its_lock():
+    async def scenario():
+        async def flush(*args):
+            raise RuntimeError("boom")
+
+        coalescer = MessageCoalescer(flush, window=WINDOW)
+        coalescer.add("+1", "hi", 1)
+        await asyncio.sleep(WINDOW * 5)
+        return coalescer
+
+    coalescer = asyncio.run(scenario())
+    assert coalescer.batches_out == 1
+    assert coalescer._locks == {} and coalescer._lock_users == {}
+
+
+def test_flush_all_flushes_pending_bursts_now():
+    async def scenario():
+        coalescer, flushed = make_coalescer(window=10)
+        coalescer.add("+1", "hi", 1)
+        await coalescer.flush_all()
+        return coalescer, flushed
+
+    coalescer, flushed = asyncio.run(scenario())
+    assert flushed == [("+1", "hi", 1, [])]
+    assert coalescer.stats()["pending_senders"] == 0
+
+
+# -- SenderPartitionedPool.put --------------------------------------------- #
+
+def test_put_waits_for_room_behind_the_senders_earlier_messages():
+    handled = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(sender, text):
+            await release.wait()
+            handled.append(text)
+
+        pool = SenderPartitionedPool(handler, workers=1, queue_size=1)
+        pool.start()
+        pool.submit("+1", "a")
+        await asyncio.sleep(0)  # the worker takes "a"
+        pool.submit("+1", "b")  # fills the partition
+        waiting = asyncio.create_task(pool.put("+1", "c"))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        release.set()
+        await waiting
+        await pool.stop()
+
+    asyncio.run(scenario())
+    assert handled == ["a", "b", "c"]
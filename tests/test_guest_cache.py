@@ -0,0 +1,104 @@
+"""Tests for the per-phone guest context cache (models/guest_cache.py)."""
+
+import json
+
+import pytest
+
+pytest.importorskip("psycopg")
+
+from models.guest_cache import GuestContextCache  # noqa: E402
+
+ANA = "+15551230001"
+BOB = "+15551230002"
+
+
+def context(client_id=None):
+    return {"client": (client_id, "phone") if client_id else None, "profile": None, "upcoming": None}
+
+
+def test_put_then_get():
+    cache = GuestContextCache()
+    cache.put(ANA, context(1), cache.version)
+    assert cache.get("(555) 123-0001") == context(1)
+    assert cache.get(BOB) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lookup_that_raced_a_write_to_the_same_guest_is_not_cached():
+    cache = GuestContextCache()
+    version = cache.version
+    cache.invalidate_phone(ANA)  # a write lands while the lookup is running
+    cache.put(ANA, context(1), version)
+    assert cache.get(ANA) is None
+
+
+def test_lookup_that_raced_a_write_by_client_id_is_not_cached():
+    cache = GuestContextCache()
+    version = cache.version
+    cache.invalidate_client(1)
+    cache.put(ANA, context(1), version)
+    assert cache.get(ANA) is None
+
+
+def test_writes_to_other_guests_do_not_discard_a_lookup():
+    cache = GuestContextCache()
+    version = cache.version
+    cache.invalidate_phone(BOB)
+    cache.invalidate_client(2)
+    cache.put(ANA, context(1), version)
+    assert cache.get(ANA) == context(1)
+
+
+def test_invalidate_client_drops_its_phone():
+    cache = GuestContextCache()
+    cache.put(ANA, context(1), cache.version)
+    cache.put(BOB, context(2), cache.version)
+    cache.invalidate_client(1)
+    assert cache.get(ANA) is None
+    assert cache.get(BOB) == context(2)
+
+
+def test_evicted_stamps_turn_away_older_lookups():
+    cache = GuestContextCache(maxsize=2)
+    version = cache.version
+    for client_id in (7, 8, 9):  # the stamp for 7 is evicted
+        cache.invalidate_client(client_id)
+    cache.put(ANA, context(7), version)
+    assert cache.get(ANA) is None
+    cache.put(ANA, context(7), cache.version)
+    assert cache.get(ANA) == context(7)
+
+
+def test_clear_turns_away_every_lookup_in_flight():
+    cache = GuestContextCache()
+    version = cache.version
+    cache.clear()
+    cache.put(ANA, context(1), version)
+    assert cache.get(ANA) is None
+
+
+def test_lru_eviction():
+    cache = GuestContextCache(maxsize=1)
+    cache.put(ANA, context(1), cache.version)
+    cache.put(BOB, context(2), cache.version)
+    assert cache.get(ANA) is None
+    assert cache.get(BOB) == context(2)
+    assert cache.stats()["size"] == 1
+
+
+def test_notifications_drop_the_listed_guests():
+    cache = GuestContextCache()
+    cache.put(ANA, context(1), cache.version)
+    cache.put(BOB, context(2), cache.version)
+    cache.apply_notification(json.dumps({"clients": [1], "phones": []}))
+    assert cache.get(ANA) is None
+    assert cache.get(BOB) == context(2)
+    cache.apply_notification(json.dumps({"clients": [], "phones": [BOB]}))
+    assert cache.get(BOB) is None
+
+
+def test_bare_notification_clears_everything():
+    cache = GuestContextCache()
+    cache.put(ANA, context(1), cache.version)
+    cache.apply_notification("")
+    assert cache.stats()["size"] == 0
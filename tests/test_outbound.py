@@ -0,0 +1,112 @@
+"""Tests for the outbound send queue (services/outbound.py).
+
+The dispatcher runs with fake transports; nothing talks to Twilio.
+"""
+
+import threading
+import time
+
+import pytest
+
+from services.outbound import OutboundDispatcher, TokenBucket, is_retryable
+
+
+class HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+# -- TokenBucket ----------------------------------------------------------- #
+
+def test_bucket_allows_the_burst_then_spaces_sends_by_the_rate():
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_bucket_refills_but_not_past_capacity():
+    bucket = TokenBucket(rate=10, capacity=2)
+    bucket.reserve(), bucket.reserve()
+    bucket.updated -= 10  # as if ten seconds went by
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() > 0
+
+
+# -- is_retryable ---------------------------------------------------------- #
+
+@pytest.mark.parametrize("exc, expected", [
+    (HttpError(429), True),
+    (HttpError(500), True),
+    (HttpError(503), True),
+    (HttpError(400), False),
+    (HttpError(404), False),
+    (ConnectionError("reset"), True),
+    (TimeoutError(), True),
+    (ValueError("bad number"), False),
+])
+def test_is_retryable(exc, expected):
+    assert is_retryable(exc) is expected
+
+
+# -- OutboundDispatcher ---------------------------------------------------- #
+
+def test_retries_then_sends():
+    calls = []
+
+    def flaky(from_number, to_number, body):
+        calls.append(body)
+        if len(calls) < 3:
+            raise HttpError(503)
+
+    dispatcher = OutboundDispatcher(flaky, workers=1, backoff=0.001)
+    assert dispatcher.enqueue("+15550001", "hello")
+    dispatcher.stop()
+    stats = dispatcher.stats()
+    assert calls == ["hello"] * 3
+    assert (stats["sent"], stats["retried"], stats["failed"]) == (1, 2, 0)
+
+
+def test_full_queue_waits_for_room_and_keeps_order():
+    release = threading.Event()
+    sent = []
+
+    def slow(from_number, to_number, body):
+        release.wait()
+        sent.append(body)
+
+    dispatcher = OutboundDispatcher(slow, workers=1, queue_size=1, batch_size=1)
+    # "a" is taken by the worker (stuck in slow), "b" fills the queue
+    assert dispatcher.enqueue("+15550001", "a")
+    time.sleep(0.05)
+    assert dispatcher.enqueue("+15550001", "b")
+
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(dispatcher.enqueue("+15550001", "c")))
+    waiter.start()
+    time.sleep(0.05)
+    assert waiter.is_alive()  # blocked on the full partition, not sent around it
+    release.set()
+    waiter.join(1)
+    dispatcher.stop()
+
+    assert result == [True]
+    assert sent == ["a", "b", "c"]
+    stats = dispatcher.stats()
+    assert (stats["overflowed"], stats["dropped"]) == (1, 0)
+
+
+def test_drops_when_the_queue_stays_full():
+    release = threading.Event()
+    dispatcher = OutboundDispatcher(lambda *args: release.wait(), workers=1, queue_size=1,
+                                    batch_size=1, enqueue_timeout=0.01)
+    dispatcher.enqueue("+15550001", "a")
+    time.sleep(0.05)
+    dispatcher.enqueue("+15550001", "b")
+    assert dispatcher.enqueue("+15550001", "c") is False
+    release.set()
+    dispatcher.stop()
+    stats = dispatcher.stats()
+    assert (stats["overflowed"], stats["dropped"], stats["sent"]) == (1, 1, 2)
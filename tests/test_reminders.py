@@ -0,0 +1,104 @@
+"""Tests for the reminder heap (services/reminders.py).
+
+Only scheduling and popping are exercised; nothing is claimed or sent.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("psycopg")
+
+from services.reminders import ReminderScheduler  # noqa: E402
+
+NOW = datetime(2026, 3, 14, 18, 0)
+
+
+def make_scheduler(**kwargs) -> ReminderScheduler:
+    kwargs.setdefault("offsets", (60, 120))
+    kwargs.setdefault("horizon_hours", 6)
+    kwargs.setdefault("grace_minutes", 30)
+    scheduler = ReminderScheduler(**kwargs)
+    scheduler._horizon_end = NOW + scheduler.horizon  # as load() would set it
+    return scheduler
+
+
+def hours(n: float) -> timedelta:
+    return timedelta(hours=n)
+
+
+# -- schedule -------------------------------------------------------------- #
+
+def test_schedules_each_offset_inside_the_horizon():
+    scheduler = make_scheduler()
+    assert scheduler.schedule(1, NOW + hours(3), NOW) == 2
+    assert sorted(scheduler._heap) == [(NOW + hours(1), 1, 120), (NOW + hours(2), 1, 60)]
+
+
+def test_skips_reminders_past_the_horizon():
+    scheduler = make_scheduler()
+    # the 60 minute reminder is due at +6.5h, past the horizon
+    assert scheduler.schedule(1, NOW + hours(7.5), NOW) == 1
+    assert scheduler._due == {(1, 120): NOW + hours(5.5)}
+
+
+def test_skips_reminders_already_sent_and_past_reservations():
+    scheduler = make_scheduler()
+    assert scheduler.schedule(1, NOW + hours(3), NOW, sent=(60, 120)) == 0
+    assert scheduler.schedule(2, NOW - hours(1), NOW) == 0
+    assert scheduler._heap == []
+
+
+def test_skips_reminders_overdue_by_more_than_the_grace():
+    scheduler = make_scheduler()
+    # 120 minutes before is 90 minutes ago; 60 minutes before is 30 minutes ago
+    assert scheduler.schedule(1, NOW + timedelta(minutes=30), NOW) == 1
+    assert list(scheduler._due) == [(1, 60)]
+
+
+def test_scheduling_twice_is_a_no_op():
+    scheduler = make_scheduler()
+    scheduler.schedule(1, NOW + hours(3), NOW)
+    assert scheduler.schedule(1, NOW + hours(3), NOW) == 0
+    assert len(scheduler._heap) == 2
+
+
+# -- _pop_due -------------------------------------------------------------- #
+
+def test_pops_due_reminders_in_order():
+    scheduler = make_scheduler()
+    scheduler.schedule(1, NOW + hours(4), NOW)
+    scheduler.schedule(2, NOW + hours(3), NOW)
+    assert scheduler._pop_due(NOW + hours(0.5)) == []
+    assert scheduler._pop_due(NOW + hours(1)) == [(2, 120)]
+    assert scheduler._pop_due(NOW + hours(2)) == [(1, 120), (2, 60)]
+    assert scheduler._pop_due(NOW + hours(3)) == [(1, 60)]
+    assert scheduler._heap == [] and scheduler._due == {}
+
+
+def test_pops_at_most_a_batch():
+    scheduler = make_scheduler(offsets=(60,), batch_size=2)
+    for rid in range(5):
+        scheduler.schedule(rid, NOW + hours(2), NOW)
+    now = NOW + hours(1)
+    assert len(scheduler._pop_due(now)) == 2
+    assert len(scheduler._pop_due(now)) == 2
+    assert len(scheduler._pop_due(now)) == 1
+
+
+def test_moved_reservation_leaves_a_stale_entry_that_is_skipped():
+    scheduler = make_scheduler(offsets=(60,))
+    scheduler.schedule(1, NOW + hours(2), NOW)
+    scheduler.schedule(1, NOW + hours(4), NOW)  # moved two hours later
+    assert len(scheduler._heap) == 2
+    assert scheduler._pop_due(NOW + hours(1)) == []  # the old due time is stale
+    assert scheduler._pop_due(NOW + hours(3)) == [(1, 60)]
+
+
+def test_reminders_popped_after_the_grace_are_dropped():
+    scheduler = make_scheduler(offsets=(60,))
+    scheduler.schedule(1, NOW + hours(2), NOW)
+    scheduler.schedule(2, NOW + hours(3), NOW)
+    # downtime: by now the first reminder is 90 minutes overdue
+    assert scheduler._pop_due(NOW + hours(2.5)) == [(2, 60)]
+    assert scheduler.too_late == 1
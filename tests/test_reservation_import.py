@@ -0,0 +1,108 @@
+"""Tests for parsing and validating bulk reservation records (models/reservation_import.py).
+
+Only pass 1 is exercised; guest resolution and the merge need the database.
+"""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("psycopg")
+
+from models.reservation_import import _clean, _parse_batch, _parse_time  # noqa: E402
+
+PHONE = "+15551234567"
+
+
+def parse(*records):
+    return _parse_batch([_clean(r) for r in records])
+
+
+def reasons(outcomes):
+    return [o and o["reason"] for o in outcomes]
+
+
+# -- _clean / _parse_time -------------------------------------------------- #
+
+def test_clean_maps_aliases_and_blanks():
+    assert _clean({" Mobile ": " 555 ", "Party_Size": 4, "occasion": "  "}) == {
+        "phone_number": "555", "covers": 4, "occasion": None,
+    }
+
+
+@pytest.mark.parametrize("record, expected", [
+    ({"date": "2026-03-14", "time": "20:30"}, datetime(2026, 3, 14, 20, 30)),
+    ({"reservation_time": "2026-03-14T20:30:45"}, datetime(2026, 3, 14, 20, 30)),
+    ({"reservation_time": "2026-03-14 20:30+01:00"}, datetime(2026, 3, 14, 20, 30)),
+    ({"reservation_time": datetime(2026, 3, 14, 20, 30, 15)}, datetime(2026, 3, 14, 20, 30)),
+])
+def test_parse_time(record, expected):
+    assert _parse_time(record) == expected
+
+
+# -- _parse_batch ---------------------------------------------------------- #
+
+def test_valid_record_passes():
+    outcomes, parsed, guests = parse(
+        {"phone": "(555) 123-4567", "date": "2026-03-14", "time": "20:00", "guests": "4",
+         "first": "Ana", "last": "Diaz", "restaurant_id": "2"}
+    )
+    assert outcomes == [None]
+    [(index, rec, phone, when, covers)] = parsed
+    assert (index, phone, when, covers) == (0, PHONE, datetime(2026, 3, 14, 20), 4)
+    assert rec["restaurant_id"] == 2
+    assert guests == {PHONE: ("Ana", "Diaz")}
+
+
+def test_rejects_with_reasons_and_keeps_input_order():
+    outcomes, parsed, guests = parse(
+        {"phone": PHONE, "date": "2026-03-14", "covers": 2},                       # no time
+        {"phone": PHONE, "reservation_time": "tomorrow", "covers": 2},
+        {"phone": PHONE, "reservation_time": "2026-03-14 20:00", "covers": "two"},
+        {"phone": PHONE, "reservation_time": "2026-03-14 20:00", "covers": 0},
+        {"client_id": "abc", "reservation_time": "2026-03-14 20:00", "covers": 2},
+        {"client_id": 7, "restaurant_id": "x", "reservation_time": "2026-03-14 20:00", "covers": 2},
+        {"phone": "12", "reservation_time": "2026-03-14 20:00", "covers": 2},
+        {"client_id": 7, "reservation_time": "2026-03-14 20:00", "covers": 2},
+    )
+    assert reasons(outcomes) == [
+        "invalid or missing date/time",
+        "invalid or missing date/time",
+        "invalid covers",
+        "invalid covers",
+        "invalid client_id",
+        "invalid restaurant_id",
+        "no client_id or valid phone number",
+        None,
+    ]
+    assert all(o["index"] == i and o["status"] == "rejected" for i, o in enumerate(outcomes[:-1]))
+    assert [p[0] for p in parsed] == [7]
+    assert guests == {}
+
+
+def test_guest_name_is_split_on_the_last_space():
+    _, _, guests = parse(
+        {"phone": PHONE, "name": "Maria del Carmen Ruiz", "reservation_time": "2026-03-14 20:00",
+         "covers": 2},
+        {"phone": "+15550000001", "name": "Prince", "reservation_time": "2026-03-14 20:00",
+         "covers": 2},
+    )
+    assert guests == {PHONE: ("Maria del Carmen", "Ruiz"), "+15550000001": ("Prince", "")}
+
+
+def test_first_name_seen_wins_for_a_phone():
+    _, parsed, guests = parse(
+        {"phone": PHONE, "reservation_time": "2026-03-14 19:00", "covers": 2},
+        {"phone": PHONE, "first_name": "Ana", "last_name": "Diaz",
+         "reservation_time": "2026-03-15 19:00", "covers": 2},
+        {"phone": PHONE, "first_name": "Anna", "last_name": "Dias",
+         "reservation_time": "2026-03-16 19:00", "covers": 2},
+    )
+    assert len(parsed) == 3
+    assert guests == {PHONE: ("Ana", "Diaz")}
+
+
+def test_phone_without_a_name_is_still_looked_up():
+    _, parsed, guests = parse({"phone": PHONE, "reservation_time": "2026-03-14 19:00", "covers": 2})
+    assert len(parsed) == 1
+    assert guests == {PHONE: (None, None)}
@@ -0,0 +1,95 @@
+"""Tests for cutting streamed completions into WhatsApp messages (services/streaming.py)."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("openai")
+
+from services import streaming  # noqa: E402
+from services.streaming import SentenceSegmenter  # noqa: E402
+
+
+def feed_all(segmenter, *deltas):
+    segments = []
+    for delta in deltas:
+        segments.extend(segmenter.feed(delta))
+    return segments
+
+
+def test_waits_for_a_boundary_past_the_minimum_length():
+    segmenter = SentenceSegmenter(min_chars=10, max_chars=50)
+    assert segmenter.feed("Hello. ") == []  # boundary, but the segment would be too short
+    assert segmenter.feed("How are you today? I") == ["Hello. How are you today?"]
+    assert segmenter.flush() == ["I"]
+
+
+def test_cuts_at_the_last_boundary_within_the_limit():
+    segmenter = SentenceSegmenter(min_chars=5, max_chars=30)
+    segments = segmenter.feed("First sentence. Second sentence here. Third")
+    assert segments == ["First sentence.", "Second sentence here."]
+    assert segmenter.flush() == ["Third"]
+
+
+def test_line_breaks_are_boundaries():
+    segmenter = SentenceSegmenter(min_chars=5, max_chars=100)
+    assert segmenter.feed("Our hours:\n\nMon-Fri 12-23") == ["Our hours:"]
+    assert segmenter.flush() == ["Mon-Fri 12-23"]
+
+
+def test_text_split_across_deltas():
+    segmenter = SentenceSegmenter(min_chars=5, max_chars=100)
+    segments = feed_all(segmenter, "We open at 7", "pm. We", " close at", " midnight.")
+    assert segments == ["We open at 7pm."]
+    assert segmenter.flush() == ["We close at midnight."]
+
+
+def test_overlong_text_without_a_boundary_is_split_at_a_space():
+    segmenter = SentenceSegmenter(min_chars=5, max_chars=20)
+    assert segmenter.feed("aaaa bbbb cccc dddd eeee ffff") == ["aaaa bbbb cccc dddd"]
+    assert segmenter.flush() == ["eeee ffff"]
+
+
+def test_overlong_word_is_split_at_the_limit():
+    segmenter = SentenceSegmenter(min_chars=5, max_chars=20)
+    assert segmenter.feed("x" * 45) == ["x" * 20, "x" * 20]
+    assert segmenter.flush() == ["x" * 5]
+
+
+def test_flush_splits_an_overlong_remainder():
+    segmenter = SentenceSegmenter(min_chars=100, max_chars=12)
+    segmenter._buffer = "one two three four five"  # as if fed without reaching a cut
+    segments = segmenter.flush()
+    assert segments == ["one two", "three four", "five"]
+    assert all(len(s) <= 12 for s in segments)
+    assert segmenter.flush() == []
+
+
+def test_flush_of_whitespace_sends_nothing():
+    segmenter = SentenceSegmenter()
+    segmenter.feed("  \n ")
+    assert segmenter.flush() == []
+
+
+FIRST = "Yes, we still have a table for four on the terrace tomorrow at eight in the evening."
+SECOND = "Shall I book it for you?"
+
+
+def test_stream_reply_sends_each_segment_and_returns_the_full_text(monkeypatch):
+    async def fake_stream(messages):
+        for delta in FIRST.split(" "):
+            yield delta + " "
+        yield SECOND
+
+    monkeypatch.setattr(streaming.llm, "stream", fake_stream)
+    sent = []
+
+    async def send(segment):
+        sent.append(segment)
+
+    async def scenario():
+        return await streaming.stream_reply([], send)
+
+    text = asyncio.run(scenario())
+    assert text == f"{FIRST} {SECOND}"
+    assert sent == [FIRST, SECOND]
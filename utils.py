@@ -3,7 +3,7 @@
 # Standard library imports
 import logging
 import re
-from typing import Optional
+from typing import Iterable, List, Optional
 
 # Third-party imports are optional so tests can run without them
 try:  # pragma: no cover - simple import guard
@@ -14,8 +14,11 @@ except Exception:  # noqa: BLE001 - broad to avoid hard dependency during tests
 try:  # pragma: no cover - simple import guard
     from decouple import config
 except Exception:  # noqa: BLE001
-    def config(*args, **kwargs):  # type: ignore[override]
-        return None
+    import os
+
+    def config(key, default=None, cast=None):  # type: ignore[override]
+        value = os.getenv(key, default)
+        return cast(value) if cast and value is not None else value
 
 
 # Attempt to configure a Twilio client if credentials are available
@@ -61,6 +64,28 @@ def normalize_phone(raw: str) -> Optional[str]:
     return None
 
 
+def normalize_phones(raws: Iterable[str]) -> List[Optional[str]]:
+    """Batch form of ``normalize_phone`` for bulk imports."""
+
+    return [normalize_phone(raw) for raw in raws]
+
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace.
+
+    "What are your HOURS??" and "what are your hours" map to the same key,
+    which is what the answer cache and CannedAnswers.question are keyed on.
+    """
+
+    if not text:
+        return ""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+
 def mask_phone(e164: str) -> str:
     """Mask an E.164 phone number leaving country code and last two digits."""
 
@@ -79,23 +104,34 @@ def simulate_send(sender_id: str, text: str) -> None:
 
 
 # Sending message logic through Twilio Messaging API
-def send_message(to_number: str, body_text: str) -> None:
-    """Send a message via Twilio if configured, otherwise simulate."""
+def deliver_message(from_number: Optional[str], to_number: str, body_text: str) -> None:
+    """Send one already-normalized message right now (used by the outbound workers).
+
+    Raises on provider errors so the caller can decide whether to retry.
+    """
+
+    if twilio_client and twilio_number:
+        # pooled keep-alive client (services/twilio_transport.py)
+        from services.twilio_transport import get_transport
+        get_transport()(from_number or twilio_number, to_number, body_text)
+    else:
+        simulate_send(to_number, body_text)
+
+
+def send_message(to_number: str, body_text: str) -> bool:
+    """Queue a message for delivery via Twilio if configured, otherwise simulate.
+
+    Delivery happens on the outbound workers (services/outbound.py). While the
+    recipient's queue is full this blocks until there is room, so call it
+    through a thread pool from async code. Returns ``False`` when the message
+    was dropped (invalid number, queue still full after the timeout).
+    """
 
     normalized = normalize_phone(to_number)
     if not normalized:
         logger.error(f"Invalid phone number: {to_number}")
-        return
+        return False
 
-    if twilio_client and twilio_number:
-        try:
-            message = twilio_client.messages.create(
-                from_=f"whatsapp:{twilio_number}",
-                body=body_text,
-                to=f"whatsapp:{normalized}",
-            )
-            logger.info(f"Message sent to {normalized}: {message.body}")
-        except Exception as exc:  # noqa: BLE001
-            logger.error(f"Error sending message to {normalized}: {exc}")
-    else:
-        simulate_send(normalized, body_text)
+    from services.outbound import get_dispatcher  # local import: outbound imports utils
+
+    return get_dispatcher().enqueue(normalized, body_text, from_number=twilio_number)
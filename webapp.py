@@ -1,18 +1,34 @@
-from openai import OpenAI, OpenAIError, RateLimitError
-from fastapi import FastAPI, Form, Depends, Request
-from decouple import config
+import asyncio
+import time
+from typing import List, Optional
+
+from openai import OpenAIError, RateLimitError
+from fastapi import FastAPI, Form, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
 
 # Internal imports
-from models import Conversation, SessionLocal
-from models import client as client_model
-from models import reservations as reservation_model
+from database import partitions
+from database.connection import async_pool_stats, close_async_pool
+from models.conversation import Conversation, SessionLocal, get_recent_conversation
+from models.aio.guest_context import get_guest_context
+from models.guest_cache import guest_cache
+from models.reference_cache import reference_cache
+from services import availability, debounce, dedupe, inbound, llm, memory, metrics, reminders, streaming
+from services.metrics import span
+from services.answer_cache import answer_cache
+from services.dedupe import claim_message, recent_sids, release_claim
+from services.outbound import get_dispatcher
+from services.twilio_transport import transport_stats
 from utils import send_message, logger
 
 app = FastAPI()
-# Set up the OpenAI API client
-client = OpenAI(api_key=config("OPENAI_API_KEY"))
+
+SYSTEM_PROMPT = (
+    "You're a receptionist and in charge of customer experience at a high end argentinean "
+    "restaurant called garufa, you make reservations and answer customer questions."
+)
 
 # Dependency
 def get_db():
@@ -23,13 +39,277 @@ def get_db():
         db.close()
 
 
+def store_conversation(sender: str, message: str, response: str,
+                       conversation_id: Optional[int] = None) -> None:
+    """Insert a Conversation row (sync SQLAlchemy, so call it via run_in_threadpool).
+
+    When the webhook already claimed a row for the MessageSid, ``conversation_id``
+    points at it and the (possibly merged) message and the response are filled in.
+    """
+    db = SessionLocal()
+    try:
+        conversation = get_recent_conversation(db, conversation_id) if conversation_id else None
+        if conversation is None:
+            conversation = Conversation(sender=sender)
+            db.add(conversation)
+        conversation.message = message
+        conversation.response = response
+        db.commit()
+        logger.info(f"Conversation #{conversation.id} stored in database")
+        memory.memory.remember(sender, message, response)
+    except SQLAlchemyError as e:
+        db.rollback()
+        metrics.ERRORS.inc(type="conversation_store")
+        logger.error(f"Database error storing conversation: {e}")
+    finally:
+        db.close()
+
+
+async def handle_message(whatsapp_number: str, body_text: str,
+                         conversation_id: Optional[int] = None) -> None:
+    """Full pipeline for one inbound message: context, completion, store, reply."""
+    start = time.perf_counter()
+    try:
+        await _handle_message(whatsapp_number, body_text, conversation_id)
+    finally:
+        metrics.PIPELINE_SECONDS.observe(time.perf_counter() - start)
+
+
+async def _handle_message(whatsapp_number: str, body_text: str,
+                          conversation_id: Optional[int] = None) -> None:
+    print(f"Sending the ChatGPT response to this number: {whatsapp_number}")
+
+    # Prepare messages for OpenAI
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+
+    # Prepend FYI lines for an upcoming reservation and the guest's profile (cached per phone)
+    # (one query since the guest cache, so guest and reservation lookup share a span)
+    with span("guest_lookup"):
+        guest = await get_guest_context(whatsapp_number)
+    upcoming = guest["upcoming"]
+    if upcoming:
+        res_time = upcoming["reservation_time"].strftime("%Y-%m-%d %H:%M")
+        fyi_line = f"FYI: You have a reservation on {res_time} for {upcoming['covers']} people."
+        messages.append({"role": "system", "content": fyi_line})
+    profile = guest["profile"]
+    if profile and profile["visit_count"]:
+        favourites = ", ".join(item["item"] for item in profile["top_items"][:3])
+        profile_line = (f"Returning guest: {profile['visit_count']} visit(s), "
+                        f"last on {profile['last_visit']:%Y-%m-%d}")
+        if favourites:
+            profile_line += f", usually orders {favourites}"
+        messages.append({"role": "system", "content": profile_line + "."})
+
+    # Earlier turns with this guest, trimmed to MEMORY_TOKEN_BUDGET
+    history = []
+    try:
+        with span("history_lookup"):
+            history = await memory.history_messages(whatsapp_number)
+    except SQLAlchemyError as e:
+        metrics.ERRORS.inc(type="history_lookup")
+        logger.error(f"Could not load conversation history for {whatsapp_number}: {e}")
+    messages.extend(history)
+
+    messages.append({"role": "user", "content": body_text})
+
+    # Repeat FAQ questions from guests without personal context skip the model
+    cacheable = answer_cache.is_cacheable(upcoming, history, profile)
+    cached_answer = None
+    if cacheable:
+        with span("answer_cache"):
+            cached_answer = await answer_cache.lookup(body_text)
+    if not cacheable:
+        answer_cache.bypassed += 1
+
+    # with STREAM_REPLIES the reply goes out sentence by sentence while it is generated
+    streamed = False
+    sent_segments: List[str] = []
+
+    async def send_segment(segment: str) -> None:
+        # send_message waits for room in the outbound queue: keep it off the loop
+        if await run_in_threadpool(send_message, whatsapp_number, segment):
+            sent_segments.append(segment)
+
+    try:
+        if cached_answer is not None:
+            chatgpt_response = cached_answer
+        elif streaming.STREAM_REPLIES:
+            streamed = True
+            with span("openai_completion"):
+                chatgpt_response = await streaming.stream_reply(messages, send_segment)
+            if cacheable:
+                answer_cache.store(body_text, chatgpt_response)
+        else:
+            with span("openai_completion"):
+                chatgpt_response = await llm.complete(messages)
+            if cacheable:
+                answer_cache.store(body_text, chatgpt_response)
+    except llm.LimiterBusy as e:
+        chatgpt_response = llm.BUSY_REPLY
+        streamed = False
+        metrics.ERRORS.inc(type=f"limiter_{e.reason}")
+        logger.warning(f"Completion limiter busy ({e.reason}), sent hold reply")
+    except RateLimitError:
+        chatgpt_response = "⚠ Sorry, I'm currently overloaded. Please try again later."
+        streamed = False
+        metrics.RATE_LIMITS.inc()
+        metrics.ERRORS.inc(type="openai_rate_limit")
+        logger.warning("OpenAI RateLimitError: quota exceeded")
+    except OpenAIError as e:
+        chatgpt_response = f"⚠ OpenAI error: {str(e)}"
+        streamed = False
+        metrics.ERRORS.inc(type="openai_error")
+        logger.error(f"OpenAI API error: {e}")
+    except Exception as e:
+        chatgpt_response = f"⚠ Unexpected server error."
+        streamed = False
+        metrics.ERRORS.inc(type="unexpected")
+        logger.error(f"Unexpected error during OpenAI call: {e}")
+
+    # A stream that failed midway: store what the guest actually got and follow
+    # up with a short apology instead of the error message
+    outgoing = chatgpt_response
+    if sent_segments and not streamed:
+        chatgpt_response = "\n".join(sent_segments)
+        outgoing = streaming.INTERRUPTED_REPLY
+
+    # Store conversation in the database (off the event loop)
+    with span("conversation_insert"):
+        await run_in_threadpool(
+            store_conversation, whatsapp_number, body_text, chatgpt_response, conversation_id
+        )
+
+    # Send reply back to user (already sent segment by segment when streamed)
+    if streamed:
+        return
+    try:
+        with span("twilio_send"):
+            await run_in_threadpool(send_message, whatsapp_number, outgoing)
+    except Exception as e:
+        metrics.ERRORS.inc(type="twilio_send")
+        logger.error(f"Failed to send message to {whatsapp_number}: {e}")
+
+
+async def dispatch_message(whatsapp_number: str, body_text: str,
+                           conversation_id: Optional[int] = None,
+                           superseded: Optional[List[int]] = None) -> None:
+    """Run a (possibly merged) message on the ordered pool if there is one, else inline.
+
+    ``superseded`` are the rows claimed by the earlier messages of a merged
+    burst; they are folded into ``conversation_id``, which gets the reply.
+    """
+    if superseded:
+        await run_in_threadpool(dedupe.merge_claims, conversation_id, superseded)
+    pool = inbound.get_pool()
+    if pool and pool.running:
+        # Twilio already got its 200 for these messages and won't retry them,
+        # so wait for room behind the sender's earlier messages
+        await pool.put(whatsapp_number, body_text, conversation_id)
+        return
+    await handle_message(whatsapp_number, body_text, conversation_id)
+
+
+def maintain_partitions() -> None:
+    """Keep next months' partitions of History/Notes/conversations in place and
+    drop expired SID claims (archiving runs from `manage.py partitions --archive`)."""
+    try:
+        report = partitions.maintain()
+        created = [name for table in report.values() for name in table["created"]]
+        if created:
+            logger.info(f"Created partitions: {', '.join(created)}")
+    except Exception as e:  # noqa: BLE001
+        metrics.ERRORS.inc(type="partition_maintenance")
+        logger.error(f"Partition maintenance failed: {e}")
+    try:
+        dedupe.prune_claims()
+    except Exception as e:  # noqa: BLE001
+        metrics.ERRORS.inc(type="claim_pruning")
+        logger.error(f"Pruning message claims failed: {e}")
+
+
+async def _maintenance_loop() -> None:
+    while True:
+        await asyncio.sleep(24 * 3600)
+        await run_in_threadpool(maintain_partitions)
+
+
+@app.on_event("startup")
+async def startup():
+    await run_in_threadpool(maintain_partitions)
+    app.state.maintenance = asyncio.create_task(_maintenance_loop())
+    # the LISTEN thread also carries guest context invalidations from other workers
+    reference_cache.start()
+    try:
+        await availability.warm()
+    except Exception as e:  # noqa: BLE001
+        # days load on first use instead
+        logger.error(f"Warming the availability index failed: {e}")
+    reminders.scheduler.start()
+    if inbound.WEBHOOK_MODE == "fast_ack":
+        inbound.get_pool(handle_message).start()
+    if debounce.DEBOUNCE_WINDOW > 0:
+        debounce.get_coalescer(dispatch_message)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.maintenance.cancel()
+    coalescer = debounce.get_coalescer()
+    if coalescer:
+        await coalescer.flush_all()
+    pool = inbound.get_pool()
+    if pool:
+        await pool.stop()
+    await reminders.scheduler.stop()
+    await close_async_pool()
+    # flush queued WhatsApp replies before the worker exits
+    await run_in_threadpool(get_dispatcher().stop)
+
+
 @app.get("/")
 async def index():
     return {"msg": "working"}
 
 
+def collect_stats() -> dict:
+    """Snapshot of every subsystem's counters (queue depths, cache hits, pool sizes)."""
+    pool = inbound.get_pool()
+    coalescer = debounce.get_coalescer()
+    return {
+        "llm": llm.limiter.stats(),
+        "inbound": pool.stats() if pool else {"mode": inbound.WEBHOOK_MODE},
+        "debounce": coalescer.stats() if coalescer else {"window_s": 0},
+        "outbound": get_dispatcher().stats(),
+        "twilio": transport_stats(),
+        "memory": memory.memory.stats(),
+        "guest_cache": guest_cache.stats(),
+        "reference_cache": reference_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "dedupe": recent_sids.stats(),
+        "availability": availability.index.stats(),
+        "reminders": reminders.scheduler.stats(),
+        "db_pool": async_pool_stats(),
+    }
+
+
+@app.get("/stats")
+async def stats():
+    # queue depth / wait time of the completion limiter and DB pool counters
+    return collect_stats()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    # latency histograms + counters, plus every numeric /stats value as a gauge
+    return PlainTextResponse(metrics.render(collect_stats()), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/message")
-async def reply(request: Request, Body: str = Form(), db: Session = Depends(get_db)):
+async def reply(request: Request, Body: str = Form()):
+    metrics.MESSAGES.inc()
+    start = time.perf_counter()
+    message_sid = None
+    conversation_id = None
     try:
         # Extract form data
         form_data = await request.form()
@@ -38,72 +318,67 @@ async def reply(request: Request, Body: str = Form(), db: Session = Depends(get_
 
         if not whatsapp_number or not body_text:
             logger.error("Missing 'From' or 'Body' in incoming request")
+            metrics.ERRORS.inc(type="invalid_request")
             return {"error": "Invalid request: missing sender or message body"}
 
-        print(f"Sending the ChatGPT response to this number: {whatsapp_number}")
-
-        # Prepare messages for OpenAI
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You're a receptionist and in charge of customer experience at a high end argentinean "
-                    "restaurant called garufa, you make reservations and answer customer questions."
-                ),
-            },
-        ]
-
-        # Prepend FYI line if an upcoming reservation exists
-        client_row = client_model.get_client_by_phone(whatsapp_number)
-        if client_row:
-            upcoming = reservation_model.get_upcoming_reservation(client_row[0])
-            if upcoming:
-                res_time = upcoming["reservation_time"].strftime("%Y-%m-%d %H:%M")
-                fyi_line = f"FYI: You have a reservation on {res_time} for {upcoming['covers']} people."
-                messages.append({"role": "system", "content": fyi_line})
-
-        messages.append({"role": "user", "content": body_text})
-
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                max_tokens=200,
-                temperature=0.5
-            )
-            chatgpt_response = response.choices[0].message.content.strip()
-        except RateLimitError:
-            chatgpt_response = "⚠ Sorry, I'm currently overloaded. Please try again later."
-            logger.warning("OpenAI RateLimitError: quota exceeded")
-        except OpenAIError as e:
-            chatgpt_response = f"⚠ OpenAI error: {str(e)}"
-            logger.error(f"OpenAI API error: {e}")
-        except Exception as e:
-            chatgpt_response = f"⚠ Unexpected server error."
-            logger.error(f"Unexpected error during OpenAI call: {e}")
-
-        # Store conversation in the database
-        try:
-            conversation = Conversation(
-                sender=whatsapp_number,
-                message=body_text,
-                response=chatgpt_response
-            )
-            db.add(conversation)
-            db.commit()
-            logger.info(f"Conversation #{conversation.id} stored in database")
-        except SQLAlchemyError as e:
-            db.rollback()
-            logger.error(f"Database error storing conversation: {e}")
-
-        # Send reply back to user
-        try:
-            send_message(whatsapp_number, chatgpt_response)
-        except Exception as e:
-            logger.error(f"Failed to send message to {whatsapp_number}: {e}")
+        # Twilio retries carry the same MessageSid: answer them with the first outcome
+        message_sid = form_data.get('MessageSid')
+        conversation_id = None
+        if message_sid:
+            outcome = recent_sids.get(message_sid)
+            if outcome is None:
+                conversation_id = await run_in_threadpool(
+                    claim_message, whatsapp_number, body_text, message_sid
+                )
+                outcome = dedupe.DONE if conversation_id is None else None
+            if outcome is not None:
+                recent_sids.duplicates += 1
+                recent_sids.set(message_sid, outcome)
+                logger.info(f"Duplicate webhook for {message_sid} ({outcome}), skipping")
+                return {"status": "duplicate", "outcome": outcome}
+            recent_sids.set(message_sid, dedupe.PROCESSING)
+
+        # Debounce: merge a burst from this sender into one model call, answer Twilio now
+        coalescer = debounce.get_coalescer()
+        if coalescer and coalescer.enabled:
+            coalescer.add(whatsapp_number, body_text, conversation_id)
+            if message_sid:
+                recent_sids.set(message_sid, dedupe.QUEUED)
+            return {"status": "queued"}
 
+        # Fast-ack mode: hand off to the per-sender worker pool and answer Twilio now
+        pool = inbound.get_pool()
+        if pool and pool.running:
+            try:
+                pool.submit(whatsapp_number, body_text, conversation_id)
+            except inbound.PartitionFull:
+                logger.warning(f"Inbound queue full for {whatsapp_number}, asking Twilio to retry")
+                metrics.ERRORS.inc(type="inbound_queue_full")
+                if message_sid:
+                    # let the retry through: forget the claim so it is processed then
+                    await run_in_threadpool(release_claim, conversation_id)
+                    recent_sids.forget(message_sid)
+                return JSONResponse({"error": "busy"}, status_code=503)
+            if message_sid:
+                recent_sids.set(message_sid, dedupe.QUEUED)
+            return {"status": "queued"}
+
+        await handle_message(whatsapp_number, body_text, conversation_id)
+        if message_sid:
+            recent_sids.set(message_sid, dedupe.DONE)
         return {"status": "ok"}
 
     except Exception as e:
         logger.error(f"Critical error in /message endpoint: {e}")
-        return {"error": "Critical server error."}
+        metrics.ERRORS.inc(type="critical")
+        if message_sid:
+            # nothing was answered: drop the claim so Twilio's retry is processed
+            try:
+                await run_in_threadpool(release_claim, conversation_id)
+            except Exception as release_error:  # noqa: BLE001
+                logger.error(f"Could not release claim for {message_sid}: {release_error}")
+            recent_sids.forget(message_sid)
+        return JSONResponse({"error": "Critical server error."}, status_code=500)
+    finally:
+        metrics.WEBHOOK_SECONDS.observe(time.perf_counter() - start)
+